@@ -1,5 +1,5 @@
 # ПЛАТЕЖНЫЕ РЕСУРСЫ ПРОВАЙДЕРА GAREX
-from typing import List, Dict
+from typing import List, Dict, FrozenSet
 
 
 class TransactionResources:
@@ -23,6 +23,18 @@ class TransactionResources:
         STATUS_FAILED
     ]
 
+    # Допустимые переходы между статусами платежа: событие со статусом не из списка
+    # для текущего статуса заказа пришло не по порядку и отбрасывается
+    STATUS_TRANSITIONS: Dict[str, FrozenSet[str]] = {
+        STATUS_CREATED: frozenset((STATUS_PENDING, STATUS_PAID, STATUS_FINISHED, STATUS_CANCELED, STATUS_FAILED)),
+        STATUS_PENDING: frozenset((STATUS_PAID, STATUS_FINISHED, STATUS_CANCELED, STATUS_FAILED, STATUS_DISPUTE)),
+        STATUS_PAID: frozenset((STATUS_FINISHED, STATUS_CANCELED, STATUS_DISPUTE)),
+        STATUS_FINISHED: frozenset((STATUS_CANCELED, STATUS_DISPUTE)),
+        STATUS_CANCELED: frozenset((STATUS_DISPUTE,)),
+        STATUS_DISPUTE: frozenset((STATUS_PAID, STATUS_FINISHED, STATUS_CANCELED)),
+        STATUS_FAILED: frozenset()
+    }
+
     # Типы поддерживаемых платежных методов
     PAYMENT_METHODS_CARD: List[str] = [
         "c2c"
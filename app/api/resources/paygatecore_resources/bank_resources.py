@@ -1 +1,33 @@
-# БАНКОВСКИЕ РЕСУРСЫ
\ No newline at end of file
+# БАНКОВСКИЕ РЕСУРСЫ
+from typing import Dict
+
+
+class BankResources:
+    # Идентификаторы участников СБП (справочник НСПК) -> код банка у провайдера
+    SBP_BANK_IDS: Dict[int, str] = {
+        100000000001: "gazprombank",  # Газпромбанк
+        100000000004: "t-bank",  # Т-Банк
+        100000000005: "vtb",  # ВТБ
+        100000000006: "ak-bars",  # АК Барс Банк
+        100000000007: "raiffeisen",  # Райффайзен Банк
+        100000000008: "alfa-bank",  # Альфа-Банк
+        100000000010: "psbank",  # Промсвязьбанк
+        100000000011: "rncb",  # РНКБ
+        100000000012: "rosbank",  # Росбанк
+        100000000013: "sovcombank",  # Совкомбанк
+        100000000014: "rsb",  # Банк Русский Стандарт
+        100000000015: "open",  # Открытие
+        100000000016: "pochtabank",  # Почта Банк
+        100000000017: "mts-bank",  # МТС Банк
+        100000000018: "otp-bank",  # ОТП Банк
+        100000000020: "rshb",  # Россельхозбанк
+        100000000022: "yoomoney",  # ЮMoney
+        100000000025: "mkb",  # Московский кредитный банк
+        100000000026: "uralsib",  # Уралсиб
+        100000000111: "sber",  # Сбербанк
+        100000000150: "yandex-bank",  # Яндекс Банк
+        100000000273: "ozonbank",  # Ozon Банк
+    }
+
+
+bank_res = BankResources
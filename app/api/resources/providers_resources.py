@@ -1,10 +1,14 @@
 # ПЕРЕНАПРВЛЕНИЕ ПРОВАЙДЕРОВ
-from app.api.services.provider_services.garex_service.garex import garex
+from typing import Dict
 
 
 class ProvidersResource:
-    PROVIDERS = {
-        "garex": garex
+    # Значение Provider-data для выбора провайдера шлюзом
+    AUTO = "auto"
+
+    # Встроенные адаптеры: провайдер -> "модуль:класс" (импорт при первом обращении)
+    ADAPTERS: Dict[str, str] = {
+        "garex": "app.api.services.provider_services.garex_service.garex:GarexService"
     }
 
 
@@ -4,16 +4,15 @@ import logging
 
 from fastapi import Request, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.core.config import settings
+from app.api.security.merchants import Merchant, merchant_registry
 
 
 logger = logging.getLogger(__name__)
 
 
-# Проверка токена
-def verify_token(token: str) -> bool:
-    logger.info(f"Verifying token. Expected: {settings.merchant_token}, Received: {token}")
-    return token == settings.merchant_token
+# Проверка токена: мерчант по токену или None
+def verify_token(token: str) -> Optional[Merchant]:
+    return merchant_registry.authenticate(token)
 
 
 # Создание ответа об ошибке
@@ -40,7 +39,6 @@ class JWTBearer(HTTPBearer):
     async def __call__(self, request: Request):
         try:
             credentials: HTTPAuthorizationCredentials = await super().__call__(request)
-            logger.info(f"Received credentials: {credentials}")
 
             # Проверка на отсутствие учетных данных
             if not credentials:
@@ -65,7 +63,8 @@ class JWTBearer(HTTPBearer):
                 )
 
             # Проверка валидности токена
-            if not verify_token(credentials.credentials):
+            merchant = verify_token(credentials.credentials)
+            if merchant is None:
                 logger.warning("Token verification failed")
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -75,13 +74,12 @@ class JWTBearer(HTTPBearer):
                     )
                 )
 
-            logger.info("Token verification successful")
-            return credentials.credentials
+            request.state.merchant = merchant
+            return merchant.id
 
         # Проброс уже созданных HTTPException
-        except HTTPException as e:
-            logger.error(f"HTTPException in auth: {e.detail}")
-            raise e
+        except HTTPException:
+            raise
 
         except Exception as e:
             logger.error(f"Unexpected error in auth: {str(e)}")
@@ -0,0 +1,147 @@
+# РЕЕСТР МЕРЧАНТОВ И ПРОВЕРКА ТОКЕНОВ
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+
+class Merchant(NamedTuple):
+    id: str
+    settings: Dict[str, Any]  # Настройки мерчанта (всё, кроме секретов)
+    jwt_secret: Optional[bytes] = None
+
+
+# Хэш токена: в памяти не хранится сам токен, поиск - по словарю
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+class MerchantRegistry:
+    """Мерчанты по хэшу статического токена и проверка JWT (HS256) с кэшем claims.
+
+    Проверенный JWT хранится в кэше до своего exp, поэтому повторные запросы
+    с тем же токеном не разбирают и не подписывают его заново.
+    """
+
+    def __init__(self, merchants: Dict[str, Dict[str, Any]], leeway: float, cache_ttl: float, cache_max_size: int):
+        self.leeway = leeway
+        self.cache_ttl = cache_ttl
+        self._by_id: Dict[str, Merchant] = {}
+        self._by_token_hash: Dict[str, Merchant] = {}
+        self._claims = TTLCache(max_size=cache_max_size, ttl=cache_ttl)
+        self.jwt_rejected = 0
+
+        for merchant_id, config in merchants.items():
+            config = dict(config)
+            token_hash = config.pop("token_sha256", None)
+            jwt_secret = config.pop("jwt_secret", None)
+            merchant = Merchant(
+                id=merchant_id,
+                settings=config,
+                jwt_secret=jwt_secret.encode("utf-8") if jwt_secret else None
+            )
+            self._by_id[merchant_id] = merchant
+            if token_hash:
+                self._by_token_hash[token_hash.lower()] = merchant
+
+
+    def get(self, merchant_id: str) -> Optional[Merchant]:
+        return self._by_id.get(merchant_id)
+
+
+    # Мерчант по токену (статическому или JWT); None - токен недействителен
+    def authenticate(self, token: str) -> Optional[Merchant]:
+        merchant = self._by_token_hash.get(hash_token(token))
+        if merchant is not None:
+            return merchant
+        if token.count(".") == 2:
+            return self._authenticate_jwt(token)
+        return None
+
+
+    def _authenticate_jwt(self, token: str) -> Optional[Merchant]:
+        merchant = self._claims.get(token)
+        if merchant is not None:
+            return merchant
+
+        claims = self._verify_jwt(token)
+        if claims is None:
+            self.jwt_rejected += 1
+            return None
+
+        merchant = self._by_id[claims["sub"]]
+        exp = claims.get("exp")
+        ttl = self.cache_ttl if exp is None else min(self.cache_ttl, exp - time.time())
+        if ttl > 0:
+            self._claims.set(token, merchant, ttl=ttl)
+        return merchant
+
+
+    # Разбор и проверка подписи HS256; None - токен недействителен
+    def _verify_jwt(self, token: str) -> Optional[Dict[str, Any]]:
+        header_segment, payload_segment, signature_segment = token.split(".")
+        try:
+            header = json.loads(_b64decode(header_segment))
+            claims = json.loads(_b64decode(payload_segment))
+            signature = _b64decode(signature_segment)
+        except (ValueError, binascii.Error):
+            return None
+
+        if not isinstance(header, dict) or header.get("alg") != "HS256" or not isinstance(claims, dict):
+            return None
+
+        sub = claims.get("sub")
+        merchant = self._by_id.get(sub) if isinstance(sub, str) else None
+        if merchant is None or merchant.jwt_secret is None:
+            return None
+
+        expected = hmac.new(
+            merchant.jwt_secret,
+            f"{header_segment}.{payload_segment}".encode("ascii"),
+            hashlib.sha256
+        ).digest()
+        if not hmac.compare_digest(expected, signature):
+            return None
+
+        now = time.time()
+        exp = claims.get("exp")
+        nbf = claims.get("nbf")
+        if exp is not None and (not isinstance(exp, (int, float)) or exp + self.leeway <= now):
+            return None
+        if nbf is not None and (not isinstance(nbf, (int, float)) or nbf - self.leeway > now):
+            return None
+        return claims
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "merchants": len(self._by_id),
+            "jwt_cache": self._claims.stats(),
+            "jwt_rejected": self.jwt_rejected
+        }
+
+
+# Конфигурация по умолчанию - один мерчант с токеном из merchant_token
+def _merchants_config() -> Dict[str, Dict[str, Any]]:
+    if settings.merchants:
+        return settings.merchants
+    return {"default": {"token_sha256": hash_token(settings.merchant_token)}}
+
+
+# Создание объекта класса MerchantRegistry
+merchant_registry = MerchantRegistry(
+    merchants=_merchants_config(),
+    leeway=settings.jwt_leeway,
+    cache_ttl=settings.jwt_cache_ttl,
+    cache_max_size=settings.jwt_cache_max_size
+)
@@ -0,0 +1,64 @@
+# ТЕСТЫ РЕЕСТРА МЕРЧАНТОВ
+import base64
+import hashlib
+import hmac
+import json
+import time
+import unittest
+
+from app.api.security.merchants import MerchantRegistry, hash_token
+
+
+SECRET = "merchant-secret"
+
+
+def _segment(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def _jwt(claims: dict, secret: str = SECRET, alg: str = "HS256") -> str:
+    signing_input = f"{_segment({'alg': alg, 'typ': 'JWT'})}.{_segment(claims)}"
+    signature = hmac.new(secret.encode("utf-8"), signing_input.encode("ascii"), hashlib.sha256).digest()
+    return f"{signing_input}.{base64.urlsafe_b64encode(signature).rstrip(b'=').decode('ascii')}"
+
+
+class MerchantRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = MerchantRegistry(
+            merchants={
+                "shop": {"token_sha256": hash_token("static-token"), "jwt_secret": SECRET, "name": "Shop"},
+                "other": {"token_sha256": hash_token("other-token")}
+            },
+            leeway=0,
+            cache_ttl=60,
+            cache_max_size=100
+        )
+
+    def test_static_token(self):
+        self.assertEqual(self.registry.authenticate("static-token").id, "shop")
+        self.assertEqual(self.registry.authenticate("other-token").id, "other")
+        self.assertIsNone(self.registry.authenticate("unknown"))
+        self.assertEqual(self.registry.get("shop").settings, {"name": "Shop"})
+
+    def test_valid_jwt_is_cached(self):
+        token = _jwt({"sub": "shop", "exp": time.time() + 60})
+        self.assertEqual(self.registry.authenticate(token).id, "shop")
+        self.assertEqual(self.registry.authenticate(token).id, "shop")
+        self.assertEqual(self.registry.stats()["jwt_cache"]["hits"], 1)
+
+    def test_invalid_jwt_is_rejected(self):
+        for token in (
+            _jwt({"sub": "shop"}, secret="wrong"),
+            _jwt({"sub": "shop", "exp": time.time() - 1}),
+            _jwt({"sub": "shop", "nbf": time.time() + 60}),
+            _jwt({"sub": "shop"}, alg="none"),
+            _jwt({"sub": "other"}),
+            "a.b.c",
+        ):
+            with self.subTest(token=token):
+                self.assertIsNone(self.registry.authenticate(token))
+        self.assertEqual(self.registry.jwt_rejected, 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,298 @@
+# ОЧЕРЕДЬ ДОСТАВКИ КОЛБЭКОВ МЕРЧАНТУ
+import asyncio
+import logging
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.http_clients import http_clients
+from app.utils.metrics import LatencyRecorder
+
+
+logger = logging.getLogger(__name__)
+
+
+STATUS_PENDING = "pending"  # ожидает доставки
+STATUS_DEAD = "dead"  # исчерпаны попытки доставки
+
+
+class CallbackQueue:
+    def __init__(self,
+                 db_path: str,
+                 workers: int,
+                 max_attempts: int,
+                 backoff_base: float,
+                 backoff_max: float,
+                 timeout: float,
+                 dead_retention: float,
+                 prune_interval: float):
+        self.db_path = db_path
+        self.workers_count = workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.dead_retention = dead_retention
+        self.prune_interval = prune_interval
+
+        self._db: Optional[sqlite3.Connection] = None
+        # Все обращения к SQLite идут через один поток
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="callbacks-db")
+        self._ready: "asyncio.Queue[int]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+        self._pruner: Optional[asyncio.Task] = None
+
+        # Статистика
+        self.pending = 0
+        self.in_flight = 0
+        self.delivered = 0
+        self.retried = 0
+        self.dead = 0
+        self.errors = 0
+        self.pruned = 0
+        self.latency = LatencyRecorder()
+
+
+    async def _db_call(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_executor, func, *args)
+
+
+    def _open_db(self) -> List[Tuple[int, float]]:
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS callbacks ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "url TEXT NOT NULL, "
+            "payload TEXT NOT NULL, "
+            "status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, "
+            "next_attempt_at REAL NOT NULL, "
+            "last_error TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS callbacks_status ON callbacks (status)")
+        rows = self._db.execute(
+            "SELECT id, next_attempt_at FROM callbacks WHERE status = ?",
+            (STATUS_PENDING,)
+        ).fetchall()
+        return rows
+
+
+    def _insert(self, url: str, payload: str, now: float) -> int:
+        cursor = self._db.execute(
+            "INSERT INTO callbacks (url, payload, status, created_at, next_attempt_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (url, payload, STATUS_PENDING, now, now)
+        )
+        return cursor.lastrowid
+
+
+    def _load(self, callback_id: int) -> Optional[Tuple[str, str, int, float]]:
+        return self._db.execute(
+            "SELECT url, payload, attempts, created_at FROM callbacks WHERE id = ? AND status = ?",
+            (callback_id, STATUS_PENDING)
+        ).fetchone()
+
+
+    def _delete(self, callback_id: int) -> None:
+        self._db.execute("DELETE FROM callbacks WHERE id = ?", (callback_id,))
+
+
+    def _reschedule(self, callback_id: int, attempts: int, next_attempt_at: float, error: str) -> None:
+        self._db.execute(
+            "UPDATE callbacks SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+            (attempts, next_attempt_at, error, callback_id)
+        )
+
+
+    def _mark_dead(self, callback_id: int, attempts: int, error: str) -> None:
+        self._db.execute(
+            "UPDATE callbacks SET status = ?, attempts = ?, last_error = ? WHERE id = ?",
+            (STATUS_DEAD, attempts, error, callback_id)
+        )
+
+
+    # Удаление недоставленных (dead) колбэков старше срока хранения
+    def _prune_dead(self, created_before: float) -> int:
+        cursor = self._db.execute(
+            "DELETE FROM callbacks WHERE status = ? AND created_at < ?",
+            (STATUS_DEAD, created_before)
+        )
+        return cursor.rowcount
+
+
+    async def prune(self) -> int:
+        removed = await self._db_call(self._prune_dead, time.time() - self.dead_retention)
+        self.pruned += removed
+        if removed:
+            logger.info(f"Pruned dead callbacks: {removed}")
+        return removed
+
+
+    async def _prune_loop(self):
+        while True:
+            try:
+                await self.prune()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Dead callbacks pruning error: {str(e)}")
+            await asyncio.sleep(self.prune_interval)
+
+
+    # Постановка в очередь с задержкой
+    def _schedule(self, callback_id: int, delay: float) -> None:
+        if delay <= 0:
+            self._ready.put_nowait(callback_id)
+            return
+
+        def _release():
+            self._timers.pop(callback_id, None)
+            self._ready.put_nowait(callback_id)
+
+        self._timers[callback_id] = asyncio.get_running_loop().call_later(delay, _release)
+
+
+    # Экспоненциальная задержка с полным джиттером
+    def _backoff(self, attempts: int) -> float:
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+        return random.uniform(self.backoff_base, max(self.backoff_base, ceiling))
+
+
+    async def start(self):
+        rows = await self._db_call(self._open_db)
+
+        # Восстановление недоставленных колбэков после перезапуска
+        now = time.time()
+        for callback_id, next_attempt_at in rows:
+            self._schedule(callback_id, next_attempt_at - now)
+        self.pending = len(rows)
+        if rows:
+            logger.info(f"Restored pending callbacks: {len(rows)}")
+
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"callback-worker-{i}")
+            for i in range(self.workers_count)
+        ]
+        self._pruner = asyncio.create_task(self._prune_loop(), name="callback-pruner")
+
+
+    async def stop(self):
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+
+        tasks = self._workers + ([self._pruner] if self._pruner is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._pruner = None
+
+        if self._db is not None:
+            await self._db_call(self._db.close)
+            self._db = None
+
+
+    # Сохранение колбэка (до подтверждения вебхука провайдеру)
+    async def enqueue(self, url: str, payload: BaseModel) -> int:
+        callback_id = await self._db_call(self._insert, url, payload.model_dump_json(), time.time())
+        self.pending += 1
+        self._ready.put_nowait(callback_id)
+        return callback_id
+
+
+    async def _worker(self):
+        while True:
+            callback_id = await self._ready.get()
+            self.in_flight += 1
+            try:
+                await self._deliver(callback_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Сбой обработки (например, базы): запись остаётся pending и будет
+                # взята повторно, а не зависнет до перезапуска
+                self.errors += 1
+                logger.error(f"Callback {callback_id} processing error: {str(e)}")
+                self._schedule(callback_id, self._backoff(1))
+            finally:
+                self.in_flight -= 1
+
+
+    async def _deliver(self, callback_id: int):
+        row = await self._db_call(self._load, callback_id)
+        if row is None:
+            self.pending -= 1
+            return
+        url, payload, attempts, created_at = row
+        attempts += 1
+
+        try:
+            response = await http_clients.get(url).post(
+                url,
+                content=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout
+            )
+            error = None if response.is_success else f"HTTP {response.status_code}"
+        # Любая ошибка отправки (сеть, некорректный URL мерчанта и т.д.) - повтор или dead
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+
+        if error is None:
+            await self._db_call(self._delete, callback_id)
+            self.pending -= 1
+            self.delivered += 1
+            self.latency.record(time.time() - created_at)
+            logger.info(f"Webhook sent successfully to: {url}")
+            return
+
+        if attempts >= self.max_attempts:
+            await self._db_call(self._mark_dead, callback_id, attempts, error)
+            self.pending -= 1
+            self.dead += 1
+            logger.error(f"Webhook delivery gave up after {attempts} attempts: {url} ({error})")
+            return
+
+        delay = self._backoff(attempts)
+        await self._db_call(self._reschedule, callback_id, attempts, time.time() + delay, error)
+        self.retried += 1
+        logger.info(f"Webhook sent failed: {error}, retry in {delay:.1f}s")
+        self._schedule(callback_id, delay)
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.pending,
+            "ready": self._ready.qsize(),
+            "in_flight": self.in_flight,
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "dead": self.dead,
+            "errors": self.errors,
+            "pruned": self.pruned,
+            "delivery_latency": self.latency.stats()
+        }
+
+
+# Создание объекта класса CallbackQueue
+callback_queue = CallbackQueue(
+    db_path=settings.callback_db_path,
+    workers=settings.callback_workers,
+    max_attempts=settings.callback_max_attempts,
+    backoff_base=settings.callback_backoff_base,
+    backoff_max=settings.callback_backoff_max,
+    timeout=settings.callback_timeout,
+    dead_retention=settings.callback_dead_retention,
+    prune_interval=settings.callback_prune_interval
+)
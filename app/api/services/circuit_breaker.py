@@ -0,0 +1,148 @@
+# CIRCUIT BREAKER ДЛЯ ЗАПРОСОВ К ПРОВАЙДЕРАМ
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+STATE_CLOSED = "closed"  # запросы проходят
+STATE_OPEN = "open"  # запросы отклоняются сразу
+STATE_HALF_OPEN = "half_open"  # пропускаются пробные запросы
+
+
+class CircuitBreaker:
+    def __init__(self,
+                 name: str,
+                 window_size: int,
+                 min_calls: int,
+                 failure_rate_threshold: float,
+                 slow_call_threshold: float,
+                 open_duration: float,
+                 half_open_max_calls: int):
+        self.name = name
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = STATE_CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)  # True - сбой или медленный ответ
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.rejected = 0
+
+
+    @property
+    def failure_rate(self) -> float:
+        return self._failures / len(self._outcomes) if self._outcomes else 0.0
+
+
+    def _transition(self, state: str):
+        if state != self.state:
+            logger.warning(f"Circuit breaker {self.name}: {self.state} -> {state}")
+        self.state = state
+        self._probes = 0
+        if state == STATE_OPEN:
+            self._opened_at = time.monotonic()
+        elif state == STATE_CLOSED:
+            self._outcomes.clear()
+            self._failures = 0
+
+
+    # Разрешение на вызов (иначе - быстрый отказ с 503)
+    def acquire(self):
+        if self.state == STATE_OPEN and time.monotonic() - self._opened_at >= self.open_duration:
+            self._transition(STATE_HALF_OPEN)
+
+        if self.state == STATE_OPEN or (
+                self.state == STATE_HALF_OPEN and self._probes >= self.half_open_max_calls):
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail={
+                    "code": "503",
+                    "message": "Провайдер временно недоступен, повторите запрос позже"
+                }
+            )
+
+        if self.state == STATE_HALF_OPEN:
+            self._probes += 1
+
+
+    # Вызов отменён (клиент ушёл) - на состояние провайдера не влияет
+    def release(self):
+        if self.state == STATE_HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+
+    def record(self, success: bool, duration: float):
+        failed = not success or duration >= self.slow_call_threshold
+
+        if self.state == STATE_HALF_OPEN:
+            self._transition(STATE_OPEN if failed else STATE_CLOSED)
+            return
+
+        if len(self._outcomes) == self._outcomes.maxlen and self._outcomes[0]:
+            self._failures -= 1
+        self._outcomes.append(failed)
+        self._failures += failed
+
+        if (self.state == STATE_CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and self.failure_rate >= self.failure_rate_threshold):
+            self._transition(STATE_OPEN)
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate, 4),
+            "calls": len(self._outcomes),
+            "rejected": self.rejected
+        }
+
+
+class CircuitBreakerRegistry:
+    def __init__(self):
+        self._breakers: Dict[Tuple[str, str, str], CircuitBreaker] = {}
+
+
+    # Breaker на (провайдер, эндпоинт, метод), создаётся при первом обращении
+    def get(self, provider_name: str, endpoint: str, method: str) -> CircuitBreaker:
+        key = (provider_name, endpoint, method)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name="/".join(key),
+                window_size=settings.breaker_window_size,
+                min_calls=settings.breaker_min_calls,
+                failure_rate_threshold=settings.breaker_failure_rate,
+                slow_call_threshold=settings.breaker_slow_call_threshold,
+                open_duration=settings.breaker_open_duration,
+                half_open_max_calls=settings.breaker_half_open_max_calls
+            )
+            self._breakers[key] = breaker
+        return breaker
+
+
+    @property
+    def any_open(self) -> bool:
+        return any(breaker.state != STATE_CLOSED for breaker in self._breakers.values())
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {breaker.name: breaker.stats() for breaker in self._breakers.values()}
+
+
+# Создание объекта класса CircuitBreakerRegistry
+circuit_breakers = CircuitBreakerRegistry()
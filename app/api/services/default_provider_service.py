@@ -7,6 +7,8 @@ from typing import Dict, Any, Optional, List
 
 from app.models.paygatecore.other_models import BalanceResponse, LimitsResponse, LimitItem
 from app.core.config import settings
+from app.core.http_clients import http_clients
+from app.utils.cache import AsyncLoadingCache
 
 
 logger = logging.getLogger(__name__)
@@ -187,6 +189,13 @@ def _transform_limits_response(provider_data: dict) -> LimitsResponse:
         raise _transform_provider_error(e)
 
 
+# Тестовые лимиты для режима отладки
+DEBUG_LIMITS = LimitsResponse(
+    card=LimitItem(min_amount="100", max_amount="200000"),
+    sbp=LimitItem(min_amount="100", max_amount="200000")
+)
+
+
 # Получаем конфигурацию провайдера
 def _get_provider_config(provider_name: str):
     if provider_name not in settings.providers:
@@ -195,17 +204,53 @@ def _get_provider_config(provider_name: str):
 
 
 class ProviderService:
-    def __init__(self):
-        self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(30.0, connect=5.0),
-            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    def __init__(self, provider_name: str = "garex"):
+        self.config = _get_provider_config(provider_name)
+
+        # Баланс и лимиты меняются редко - отдаём из кэша
+        self.cache = AsyncLoadingCache(
+            ttl=settings.provider_cache_ttl,
+            stale_ttl=settings.provider_cache_stale_ttl
         )
 
+    # Общий пул соединений к провайдеру
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return http_clients.get(self.config["base_url"])
+
     # Получение баланса
     async def get_balance(self) -> BalanceResponse:
+        return await self.cache.get("balance", self._fetch_balance)
+
+    # Получение лимитов
+    async def get_limits(self,
+                         currency_code: str
+                         ) -> LimitsResponse:
+        # В режиме отладки - заглушка (не кэшируется и не используется для проверки сумм)
+        if settings.debug:
+            logger.info("Режим DEBUG - возвращаем тестовые данные лимитов")
+            return DEBUG_LIMITS
+        return await self.cache.get(("limits", currency_code), lambda: self._fetch_limits(currency_code))
+
+    # Лимиты из кэша без обращения к провайдеру (None, если от провайдера ещё не получены)
+    def peek_limits(self, currency_code: str) -> Optional[LimitsResponse]:
+        return self.cache.peek(("limits", currency_code))
+
+    # Обновление лимитов в кэше (None - в режиме отладки лимиты у провайдера не запрашиваются)
+    async def refresh_limits(self, currency_code: str) -> Optional[LimitsResponse]:
+        if settings.debug:
+            return None
+        return await self.cache.refresh(("limits", currency_code), lambda: self._fetch_limits(currency_code))
+
+    # Статистика кэша
+    def stats(self):
+        return self.cache.stats()
+
+    # Запрос баланса у провайдера
+    async def _fetch_balance(self) -> BalanceResponse:
         try:
             headers = {
-                "Authorization": f"Bearer {settings.provider_api_key}",
+                "Authorization": f"Bearer {self.config['api_key']}",
                 "Content-Type": "application/json"
             }
 
@@ -220,7 +265,7 @@ class ProviderService:
 
             # Реальный запрос к провайдеру
             response = await self.client.get(
-                f"{settings.provider_base_url}/api/v1/balance",
+                f"{self.config['base_url']}/api/v1/balance",
                 headers=headers
             )
 
@@ -240,35 +285,21 @@ class ProviderService:
             logger.error(f"Ошибка при получении баланса: {str(e)}")
             raise _transform_provider_error(e)
 
-    # Получение лимитов
-    async def get_limits(self,
-                         currency_code: str
-                         ) -> LimitsResponse:
+    # Запрос лимитов у провайдера
+    async def _fetch_limits(self,
+                            currency_code: str
+                            ) -> LimitsResponse:
         try:
             headers = {
-                "Authorization": f"Bearer {settings.provider_api_key}",
+                "Authorization": f"Bearer {self.config['api_key']}",
                 "Content-Type": "application/json"
             }
 
             logger.info(f"Запрос лимитов для валюты: {currency_code}")
 
-            # В режиме отладки возвращаем заглушку
-            if settings.debug:
-                logger.info("Режим DEBUG - возвращаем тестовые данные лимитов")
-                return _transform_limits_response({
-                    "card": {
-                        "min_amount": "100",
-                        "max_amount": "200000"
-                    },
-                    "sbp": {
-                        "min_amount": "100",
-                        "max_amount": "200000"
-                    }
-                })
-
             # Реальный запрос к провайдеру
             response = await self.client.get(
-                f"{settings.provider_base_url}/api/v1/limits/{currency_code}",
+                f"{self.config['base_url']}/api/v1/limits/{currency_code}",
                 headers=headers
             )
 
@@ -286,10 +317,5 @@ class ProviderService:
             raise _transform_provider_error(e)
 
 
-    # Выход из приложения
-    async def close(self):
-        await self.client.aclose()
-
-
 # Создание объекта класса ProviderService
 provider_service = ProviderService()
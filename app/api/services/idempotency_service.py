@@ -0,0 +1,86 @@
+# СЕРВИС ИДЕМПОТЕНТНОСТИ СОЗДАНИЯ ТРАНЗАКЦИЙ
+import logging
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.api.resources.providers_resources import providers_res
+from app.utils.cache import TTLCache, SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyService:
+    def __init__(self):
+        # Ключ: (мерчант, метод, merchant_transaction_id) - заказ один, через какого бы
+        # провайдера он ни был создан. Значение: (отпечаток запроса, провайдер, ответ провайдера)
+        self.responses = TTLCache(
+            max_size=settings.idempotency_max_size,
+            ttl=settings.idempotency_ttl
+        )
+        self.in_flight = SingleFlight()
+
+
+    # Повторный запрос с тем же ключом, но другими данными
+    @staticmethod
+    def _raise_conflict():
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "code": "422",
+                "message": "Оффер с таким orderId уже существует"
+            }
+        )
+
+
+    # Повтор допустим с теми же данными и тем же провайдером (или в режиме auto)
+    @staticmethod
+    def _matches(stored: Tuple[Dict[str, Any], str, Any], provider_name: str, fingerprint: Dict[str, Any]) -> bool:
+        stored_fingerprint, stored_provider, _ = stored
+        return stored_fingerprint == fingerprint and provider_name in (stored_provider, providers_res.AUTO)
+
+
+    # call возвращает (провайдер, обработавший запрос, ответ): в режиме auto он
+    # известен только после выбора
+    async def execute(self,
+                      merchant: str,
+                      provider_name: str,
+                      method: str,
+                      request: BaseModel,
+                      call: Callable[[], Awaitable[Tuple[str, Any]]]) -> Any:
+        key = (merchant, method, request.merchant_transaction_id)
+        fingerprint = request.model_dump()
+
+        cached = self.responses.get(key)
+        if cached is not None:
+            if not self._matches(cached, provider_name, fingerprint):
+                self._raise_conflict()
+            logger.info(f"Idempotent replay: {request.merchant_transaction_id} via method: {method}")
+            return cached[2]
+
+        async def _call_and_store() -> Tuple[Dict[str, Any], str, Any]:
+            resolved_provider, response = await call()
+            stored = (fingerprint, resolved_provider, response)
+            self.responses.set(key, stored)
+            return stored
+
+        # Одновременные дубликаты ждут один вызов провайдера
+        stored = await self.in_flight.do(key, _call_and_store)
+        if not self._matches(stored, provider_name, fingerprint):
+            self._raise_conflict()
+        return stored[2]
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.responses.stats(),
+            "in_flight": len(self.in_flight),
+            "joined": self.in_flight.joined
+        }
+
+
+# Создание объекта класса IdempotencyService
+idempotency_service = IdempotencyService()
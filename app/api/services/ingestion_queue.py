@@ -0,0 +1,117 @@
+# ОГРАНИЧЕННАЯ ОЧЕРЕДЬ ОБРАБОТКИ ВХОДЯЩИХ СОБЫТИЙ
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.utils.metrics import LatencyRecorder
+
+
+class IngestionQueue:
+    """Очередь фиксированной глубины с пулом воркеров.
+
+    Если очередь заполнена, событие не принимается (503 + Retry-After),
+    и провайдер доставит его повторно позже.
+    """
+
+    def __init__(self, name: str, max_depth: int, workers: int, retry_after: int):
+        self.name = name
+        self.max_depth = max_depth
+        self.workers_count = workers
+        self.retry_after = retry_after
+        self._queue: "asyncio.Queue[Tuple[Callable[[], Awaitable[Any]], asyncio.Future, float]]" = (
+            asyncio.Queue(maxsize=max_depth)
+        )
+        self._workers: List[asyncio.Task] = []
+
+        self.in_progress = 0
+        self.processed = 0
+        self.shed = 0
+        self.wait = LatencyRecorder()
+
+
+    def start(self):
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-worker-{i}")
+            for i in range(self.workers_count)
+        ]
+
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        # Необработанные события провайдер доставит повторно
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(self._overloaded())
+
+
+    def _overloaded(self) -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail="Сервис перегружен, повторите запрос позже",
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+
+    # Постановка задачи в очередь и ожидание результата
+    async def submit(self, job: Callable[[], Awaitable[Any]]) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((job, future, time.monotonic()))
+        except asyncio.QueueFull:
+            self.shed += 1
+            raise self._overloaded()
+
+        # shield: если отправитель отключился, принятое событие всё равно обработается
+        return await asyncio.shield(future)
+
+
+    async def _worker(self):
+        while True:
+            job, future, enqueued_at = await self._queue.get()
+            self.wait.record(time.monotonic() - enqueued_at)
+            self.in_progress += 1
+            try:
+                result = await job()
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.set_exception(self._overloaded())
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                    # Отправитель мог уже уйти - не логируем как необработанное
+                    future.exception()
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self.in_progress -= 1
+                self.processed += 1
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self._queue.qsize(),
+            "max_depth": self.max_depth,
+            "in_progress": self.in_progress,
+            "processed": self.processed,
+            "shed": self.shed,
+            "queue_wait": self.wait.stats()
+        }
+
+
+# Создание объекта класса IngestionQueue для вебхуков провайдеров
+webhook_queue = IngestionQueue(
+    name="webhooks",
+    max_depth=settings.webhook_queue_depth,
+    workers=settings.webhook_workers,
+    retry_after=settings.webhook_retry_after
+)
@@ -0,0 +1,94 @@
+# ПРЕДВАРИТЕЛЬНАЯ ПРОВЕРКА ЛИМИТОВ
+import asyncio
+import logging
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.api.resources.garex_resources.valid_resources import valid_res as garex_valid_res
+from app.api.services.default_provider_service import ProviderService, provider_service
+
+
+logger = logging.getLogger(__name__)
+
+
+class LimitsService:
+    def __init__(self, sources: Dict[str, Tuple[ProviderService, List[str]]]):
+        # Провайдер -> (источник лимитов, валюты провайдера)
+        self.sources = sources
+        self._task: Optional[asyncio.Task] = None
+        self.checked = 0
+        self.rejected = 0
+        self.skipped = 0
+
+
+    # Проверка суммы по лимитам из кэша (без обращения к провайдеру)
+    def check_amount(self, provider_name: str, limit_kind: str, currency: str, amount: str):
+        source = self.sources.get(provider_name)
+        limits = source[0].peek_limits(currency) if source else None
+        limit = getattr(limits, limit_kind, None) if limits else None
+
+        # Лимитов от провайдера нет (не загружены или режим отладки) - решение за провайдером
+        if limit is None:
+            self.skipped += 1
+            return
+
+        try:
+            value = Decimal(amount)
+            min_amount = Decimal(limit.min_amount)
+            max_amount = Decimal(limit.max_amount)
+        except InvalidOperation:
+            self.skipped += 1
+            return
+
+        self.checked += 1
+        if value < min_amount or value > max_amount:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "code": "400",
+                    "message": f"Сумма {amount} вне лимитов метода {limit_kind}: "
+                               f"от {limit.min_amount} до {limit.max_amount} {currency}"
+                }
+            )
+
+
+    # Фоновое обновление лимитов по всем валютам провайдеров
+    async def _refresh_loop(self):
+        while True:
+            for provider_name, (source, currencies) in self.sources.items():
+                for currency in currencies:
+                    try:
+                        await source.refresh_limits(currency)
+                    except Exception as e:
+                        logger.error(f"Error with refreshing limits {provider_name}/{currency}: {str(e)}")
+            await asyncio.sleep(settings.limits_refresh_interval)
+
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop(), name="limits-refresh")
+
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "checked": self.checked,
+            "rejected": self.rejected,
+            "skipped": self.skipped
+        }
+
+
+# Создание объекта класса LimitsService
+limits_service = LimitsService({
+    "garex": (provider_service, garex_valid_res.valid_currency)
+})
@@ -0,0 +1,77 @@
+# АДАПТИВНЫЙ ВЫБОР ПОРЯДКА ПЛАТЕЖНЫХ МЕТОДОВ
+import bisect
+from typing import Any, Dict, List, Tuple
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+
+class MethodSelector:
+    """Порядок перебора методов с фолбэком по успешности в диапазоне суммы.
+
+    Успешность - экспоненциальное скользящее среднее. Метод, только что
+    ответивший "нет объявления/реквизита" для диапазона, временно пропускается.
+    """
+
+    def __init__(self, bands: List[int], alpha: float, negative_ttl: float):
+        self.bands = sorted(bands)
+        self.alpha = alpha
+        self._scores: Dict[Tuple[str, int], float] = {}
+        self._negative = TTLCache(max_size=10_000, ttl=negative_ttl)
+        self.skipped = 0
+
+
+    # Номер диапазона суммы
+    def band(self, amount: int) -> int:
+        return bisect.bisect_right(self.bands, amount)
+
+
+    def _update(self, method: str, amount: int, outcome: float):
+        key = (method, self.band(amount))
+        score = self._scores.get(key)
+        # Первое наблюдение заменяет нейтральную оценку целиком
+        self._scores[key] = outcome if score is None else score + self.alpha * (outcome - score)
+
+
+    # Методы в порядке убывания успешности (при равенстве - исходный порядок).
+    # Если недавно отказали все, остаётся лучший: решение за провайдером, а не за кэшем
+    def order(self, methods: List[str], amount: int) -> List[str]:
+        band = self.band(amount)
+        ranked = sorted(methods, key=lambda method: -self._scores.get((method, band), 0.5))
+        available = [method for method in ranked if (method, band) not in self._negative]
+        if not available:
+            available = ranked[:1]
+        self.skipped += len(methods) - len(available)
+        return available
+
+
+    def record_success(self, method: str, amount: int):
+        self._update(method, amount, 1.0)
+        self._negative.pop((method, self.band(amount)))
+
+
+    # Нет объявления или свободного реквизита (404/400)
+    def record_no_offer(self, method: str, amount: int):
+        self._update(method, amount, 0.0)
+        self._negative.set((method, self.band(amount)), True)
+
+
+    # Сбой провайдера (5xx, таймаут, сеть); локальные отказы шлюза сюда не попадают
+    def record_failure(self, method: str, amount: int):
+        self._update(method, amount, 0.0)
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "scores": {f"{method}/{band}": round(score, 4) for (method, band), score in self._scores.items()},
+            "negative": len(self._negative),
+            "skipped": self.skipped
+        }
+
+
+# Создание объекта класса MethodSelector
+method_selector = MethodSelector(
+    bands=settings.method_amount_bands,
+    alpha=settings.method_score_alpha,
+    negative_ttl=settings.method_negative_ttl
+)
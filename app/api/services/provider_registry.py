@@ -0,0 +1,89 @@
+# РЕЕСТР АДАПТЕРОВ ПРОВАЙДЕРОВ
+import importlib
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.api.resources.providers_resources import providers_res
+
+
+logger = logging.getLogger(__name__)
+
+
+# Объект по пути "пакет.модуль:атрибут"
+def _import_target(target: str) -> Any:
+    module_name, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class ProviderRegistry:
+    """Адаптеры провайдеров по имени; модуль импортируется и адаптер создаётся при первом
+    обращении (или при старте приложения), а не при импорте шлюза.
+
+    Путь к адаптеру - settings.providers[<имя>]["adapter"] или встроенный из
+    providers_res.ADAPTERS; провайдер с "enabled": false в развёртывании не загружается.
+    """
+
+    def __init__(self, providers: Dict[str, Dict[str, Any]], adapters: Dict[str, str]):
+        self._targets: Dict[str, str] = {}
+        for name, config in providers.items():
+            if not config.get("enabled", True):
+                continue
+            target = config.get("adapter", adapters.get(name))
+            if target is None:
+                logger.warning(f"Provider {name}: adapter is not configured, skipped")
+                continue
+            self._targets[name] = target
+        self._instances: Dict[str, Any] = {}
+
+
+    # Регистрация адаптера (готовый объект или путь "модуль:класс")
+    def register(self, name: str, adapter: Any):
+        if isinstance(adapter, str):
+            self._targets[name] = adapter
+            self._instances.pop(name, None)
+        else:
+            self._targets[name] = f"{type(adapter).__module__}:{type(adapter).__name__}"
+            self._instances[name] = adapter
+
+
+    # Включённые провайдеры в порядке конфигурации
+    def names(self) -> List[str]:
+        return list(self._targets)
+
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._targets
+
+
+    # Адаптер по имени (None - провайдер неизвестен или выключен)
+    def get(self, name: str) -> Optional[Any]:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        target = self._targets.get(name)
+        if target is None:
+            return None
+
+        factory = _import_target(target)
+        instance = self._instances[name] = factory() if isinstance(factory, type) else factory
+        logger.info(f"Provider {name}: adapter {target} loaded")
+        return instance
+
+
+    # Загрузка всех включённых адаптеров (при старте: ошибка конфигурации видна сразу)
+    def load_all(self):
+        for name in self._targets:
+            self.get(name)
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.names(),
+            "loaded": list(self._instances)
+        }
+
+
+# Создание объекта класса ProviderRegistry
+provider_registry = ProviderRegistry(settings.providers, providers_res.ADAPTERS)
@@ -0,0 +1,200 @@
+# ВЫБОР ПРОВАЙДЕРА В РЕЖИМЕ AUTO
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.api.services.provider_services.errors import ProviderError
+from app.core import deadline
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+OUTCOME_APPROVED = "approved"  # реквизит выдан
+OUTCOME_NO_OFFER = "no_offer"  # нет объявления или свободного реквизита (404/400)
+OUTCOME_FAILED = "failed"  # сбой провайдера (5xx, таймаут, сеть)
+
+# Ответы провайдера, после которых запрос переходит к следующему провайдеру
+NO_OFFER_STATUSES = frozenset((400, 404))
+
+
+class ProviderScore:
+    """Скользящие показатели провайдера по методу; обновление и чтение оценки - O(1).
+
+    p50/p95 - потоковые оценки квантилей (шаг пропорционален средней задержке),
+    доля одобрений и доля сбоев - экспоненциальные скользящие средние.
+    Новый провайдер получает оптимистичную оценку, чтобы на него пошёл трафик.
+    """
+
+    __slots__ = ("alpha", "latency_weight", "count", "mean", "p50", "p95", "approval", "errors", "score")
+
+    def __init__(self, alpha: float, latency_weight: float):
+        self.alpha = alpha
+        self.latency_weight = latency_weight
+        self.count = 0
+        self.mean = 0.0
+        self.p50 = 0.0
+        self.p95 = 0.0
+        self.approval = 1.0
+        self.errors = 0.0
+        self.score = 1.0
+
+
+    def _record_latency(self, duration: float):
+        if self.count == 0:
+            self.mean = self.p50 = self.p95 = duration
+        else:
+            self.mean += self.alpha * (duration - self.mean)
+            step = self.alpha * self.mean
+            self.p50 += step * (0.5 if duration > self.p50 else -0.5)
+            self.p95 += step * (0.95 if duration > self.p95 else -0.05)
+        self.count += 1
+
+
+    def record(self, duration: float, outcome: Optional[str]):
+        self._record_latency(duration)
+        if outcome == OUTCOME_APPROVED:
+            self.approval += self.alpha * (1.0 - self.approval)
+            self.errors -= self.alpha * self.errors
+        elif outcome == OUTCOME_NO_OFFER:
+            self.approval -= self.alpha * self.approval
+            self.errors -= self.alpha * self.errors
+        elif outcome == OUTCOME_FAILED:
+            self.errors += self.alpha * (1.0 - self.errors)
+
+        # Оценка пересчитывается при записи, выбор провайдера её только читает
+        self.score = self.approval * (1.0 - self.errors) - self.latency_weight * (self.p50 + self.p95) / 2
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "p50": round(self.p50, 6),
+            "p95": round(self.p95, 6),
+            "approval": round(self.approval, 4),
+            "errors": round(self.errors, 4),
+            "score": round(self.score, 4)
+        }
+
+
+# Итог вызова по исключению. None - локальный отказ шлюза (срок запроса мерчанта,
+# circuit breaker, лимитер, таблица маршрутов): на оценку провайдера не влияет
+def _outcome(error: BaseException) -> Optional[str]:
+    if isinstance(error, ProviderError):
+        if error.status_code in NO_OFFER_STATUSES:
+            return OUTCOME_NO_OFFER
+        return OUTCOME_FAILED if error.status_code >= 500 else None
+    if isinstance(error, HTTPException):
+        return None
+    return OUTCOME_FAILED
+
+
+class ProviderRouter:
+    def __init__(self, alpha: float, latency_weight: float):
+        self.alpha = alpha
+        self.latency_weight = latency_weight
+        # Ключ: (провайдер, метод оплаты)
+        self._scores: Dict[Tuple[str, str], ProviderScore] = {}
+        self.routed = 0
+        self.failovers = 0
+        self.skipped = 0
+
+
+    def score(self, provider_name: str, method: str) -> ProviderScore:
+        key = (provider_name, method)
+        score = self._scores.get(key)
+        if score is None:
+            score = self._scores[key] = ProviderScore(self.alpha, self.latency_weight)
+        return score
+
+
+    # Провайдеры в порядке убывания оценки (при равенстве - порядок регистрации)
+    def rank(self, method: str, providers: Iterable[str]) -> List[str]:
+        return sorted(providers, key=lambda provider_name: -self.score(provider_name, method).score)
+
+
+    # Вызов провайдера с учётом в его показателях (используется и при явном выборе провайдера)
+    async def call(self, provider_name: str, method: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        score = self.score(provider_name, method)
+        started = time.monotonic()
+        try:
+            response = await call()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            outcome = _outcome(e)
+            # Время прерванной или отклонённой попытки - не задержка провайдера
+            if outcome is not None:
+                score.record(time.monotonic() - started, outcome)
+            raise
+
+        score.record(time.monotonic() - started, OUTCOME_APPROVED)
+        return response
+
+
+    # Перебор провайдеров по оценке; результат - (выбранный провайдер, ответ).
+    # Переход к следующему - только по ответу провайдера "нет реквизита" (404/400);
+    # локальные отказы (маршрут, банк, breaker, лимитер) возвращаются клиенту.
+    # check - предварительная проверка провайдера (лимиты): её отказ - пропуск провайдера
+    # без обращения к нему
+    async def route(self,
+                    method: str,
+                    handlers: Dict[str, Callable[[Any], Awaitable[Any]]],
+                    request: Any,
+                    check: Optional[Callable[[str], None]] = None) -> Tuple[str, Any]:
+        self.routed += 1
+        error = HTTPException(
+            status_code=404,
+            detail={
+                "code": "404",
+                "message": "Объявление, по заданным параметрам, не было найдено"
+            }
+        )
+
+        attempted = False
+        for provider_name in self.rank(method, handlers):
+            if check is not None:
+                try:
+                    check(provider_name)
+                except HTTPException as e:
+                    self.skipped += 1
+                    error = e
+                    continue
+
+            if attempted:
+                # На переход к следующему провайдеру не хватает времени
+                if not deadline.allows_fallback():
+                    break
+                self.failovers += 1
+                logger.info("Failover to provider: %s via method: %s", provider_name, method)
+            attempted = True
+
+            handler = handlers[provider_name]
+            try:
+                return provider_name, await self.call(provider_name, method, lambda: handler(request))
+            except ProviderError as e:
+                if e.status_code not in NO_OFFER_STATUSES:
+                    raise
+                error = e
+
+        raise error
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "scores": {f"{provider}/{method}": score.stats() for (provider, method), score in self._scores.items()},
+            "routed": self.routed,
+            "failovers": self.failovers,
+            "skipped": self.skipped
+        }
+
+
+# Создание объекта класса ProviderRouter
+provider_router = ProviderRouter(
+    alpha=settings.provider_score_alpha,
+    latency_weight=settings.provider_latency_weight
+)
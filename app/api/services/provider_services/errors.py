@@ -0,0 +1,10 @@
+# ОШИБКИ ОБРАЩЕНИЯ К ПРОВАЙДЕРУ
+from fastapi import HTTPException
+
+
+class ProviderError(HTTPException):
+    """Отказ, пришедший от провайдера: статус или некорректный ответ, таймаут попытки.
+
+    Отличается от локальных отказов шлюза (валидация, лимитер, circuit breaker, срок
+    запроса): только такие ошибки учитываются в оценках методов и провайдеров.
+    """
@@ -0,0 +1,220 @@
+# КАТАЛОГ БАНКОВ ПРОВАЙДЕРА GAREX
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.api.resources.garex_resources.bank_resources import bank_res
+from app.api.resources.paygatecore_resources.bank_resources import bank_res as our_bank_res
+from app.api.resources.garex_resources.transaction_resources import transactions_res
+
+
+# Регионы каталога: список банков провайдера -> страна
+REGION_RUS = "RUS"
+REGION_TJS = "TJS"
+REGION_ABH = "ABH"
+REGION_AZN = "AZN"
+
+COUNTRIES: Dict[str, str] = {
+    REGION_RUS: "РФ",
+    REGION_TJS: "Таджикистан",
+    REGION_ABH: "Абхазия",
+    REGION_AZN: "Азербайджан",
+}
+
+# Порядок важности региона при определении страны: зарубежные банки есть и в списке РФ
+_COUNTRY_PRIORITY = (REGION_TJS, REGION_ABH, REGION_AZN, REGION_RUS)
+
+# Методы, доступные банкам региона
+_REGION_METHODS: Dict[str, Tuple[str, ...]] = {
+    REGION_RUS: tuple(transactions_res.PAYMENT_METHODS_SBP),
+    REGION_TJS: ("m2tjs_c2c", "m2tjs_sbp"),
+    REGION_ABH: ("m2abh_c2c", "m2abh_sbp"),
+    REGION_AZN: (),
+}
+
+# Написания стран в названиях банков ("ВТБ Беларусь", "Амра-банк (Абхазия)")
+_COUNTRY_SPELLINGS: Dict[str, Tuple[str, ...]] = {
+    "РФ": ("рф", "россия", "russia"),
+    "Таджикистан": ("таджикистан", "tajikistan"),
+    "Абхазия": ("абхазия", "abkhazia"),
+    "Азербайджан": ("азербайджан", "azerbaijan"),
+    "Беларусь": ("беларусь", "белоруссия", "belarus"),
+    "Казахстан": ("казахстан", "kazakhstan"),
+    "Узбекистан": ("узбекистан", "uzbekistan"),
+    "Кыргызстан": ("кыргызстан", "киргизия", "kyrgyzstan"),
+    "Армения": ("армения", "armenia"),
+    "Грузия": ("грузия", "georgia"),
+}
+_COUNTRY_WORDS: Dict[str, str] = {
+    spelling: country for country, spellings in _COUNTRY_SPELLINGS.items() for spelling in spellings
+}
+
+# Окончание слова, после которого префикс всё ещё считается целым названием ("Сбер|банк")
+_GENERIC_SUFFIXES = ("банк", "bank")
+
+_SEPARATORS = re.compile(r"[\W_]+")  # Пунктуация и пробелы
+_PARENTHESES = re.compile(r"\(([^)]*)\)")
+
+# Минимальная длина совпадающего префикса для нестрогого поиска
+_MIN_PREFIX = 3
+
+
+class Bank(NamedTuple):
+    code: str  # Код банка у провайдера
+    name: str  # Название банка
+    country: str  # Страна банка
+    regions: FrozenSet[str]  # Списки провайдера, в которых есть банк
+    methods: FrozenSet[str]  # Поддерживаемые методы оплаты
+
+
+# Слова названия без регистра, "ё", пунктуации и пробелов
+def _words(name: str) -> List[str]:
+    return [word for word in _SEPARATORS.split(name.casefold().replace("ё", "е")) if word]
+
+
+# Ключ поиска: регистр, "ё", пунктуация и пробелы не учитываются ("Т-банк" -> "тбанк")
+def normalize(name: str) -> str:
+    return "".join(_words(name))
+
+
+# Варианты написания: полное название, без уточнения в скобках и само уточнение ("ПСБ"),
+# если это не название страны
+def _aliases(name: str) -> Iterable[str]:
+    yield name
+    yield _PARENTHESES.sub(" ", name)
+    for qualifier in _PARENTHESES.findall(name):
+        if normalize(qualifier) not in _COUNTRY_WORDS:
+            yield qualifier
+
+
+# Индекс первого слова запроса после префикса key[:end]; None - префикс обрывает слово
+def _rest_words(key: str, end: int, boundaries: Dict[int, int]) -> Optional[int]:
+    if end in boundaries:
+        return boundaries[end]
+    for suffix in _GENERIC_SUFFIXES:
+        if key.startswith(suffix, end) and end + len(suffix) in boundaries:
+            return boundaries[end + len(suffix)]
+    return None
+
+
+# В остатке запроса указана другая страна ("Альфа-Банк Казахстан")
+def _conflicts(bank: Bank, words: List[str]) -> bool:
+    return any(_COUNTRY_WORDS.get(word, bank.country) != bank.country for word in words)
+
+
+class BankCatalog:
+    """Индексы по банкам, построенные один раз при старте.
+
+    Поиск по названию: точное совпадение нормализованного ключа, затем самый длинный
+    известный ключ, с которого начинается запрос и который заканчивается на границе
+    слова ("ВТБ 24" -> "ВТБ", "Сбербанк" -> "Сбер"), если в остатке запроса нет другой
+    страны ("ВТБ Беларусь" - не найден), затем единственный ключ, который начинается
+    с запроса ("промсвязь" -> "Промсвязьбанк").
+    """
+
+    def __init__(self, regions: Dict[str, Dict[str, str]], bank_ids: Dict[int, str]):
+        names: Dict[str, str] = {}
+        code_regions: Dict[str, Set[str]] = {}
+        index: Dict[str, str] = {}
+        for region, banks in regions.items():
+            for name, code in banks.items():
+                names.setdefault(code, name)
+                code_regions.setdefault(code, set()).add(region)
+                for alias in _aliases(name):
+                    key = normalize(alias)
+                    if key:
+                        index.setdefault(key, code)
+
+        self._by_code: Dict[str, Bank] = {}
+        for code, bank_regions in code_regions.items():
+            country_region = next(region for region in _COUNTRY_PRIORITY if region in bank_regions)
+            methods = {method for region in bank_regions for method in _REGION_METHODS.get(region, ())}
+            if code in transactions_res.PAYMENT_METHODS_CARD_ITERNAL:
+                methods.add(transactions_res.PAYMENT_METHODS_CARD_ITERNAL[code])
+            self._by_code[code] = Bank(
+                code=code,
+                name=names[code],
+                country=COUNTRIES[country_region],
+                regions=frozenset(bank_regions),
+                methods=frozenset(methods)
+            )
+
+        self._by_key: Dict[str, Bank] = {key: self._by_code[code] for key, code in index.items()}
+        self._sorted_keys: List[str] = sorted(self._by_key)
+        # Выплаты по СБП без банков или с кодами, которых нет у провайдера, - ошибка конфигурации:
+        # не стартуем, а не отвечаем 404 на каждую выплату
+        unknown = sorted({code for code in bank_ids.values() if code not in self._by_code})
+        if unknown:
+            raise ValueError(f"bank_ids: unknown provider bank codes: {', '.join(unknown)}")
+        if not bank_ids:
+            raise ValueError("bank_ids: no banks for SBP payouts")
+        self._by_id: Dict[int, Bank] = {bank_id: self._by_code[code] for bank_id, code in bank_ids.items()}
+        self.find = lru_cache(maxsize=4096)(self._find)
+
+
+    def __len__(self) -> int:
+        return len(self._by_code)
+
+
+    def __iter__(self) -> Iterator[Bank]:
+        return iter(self._by_code.values())
+
+
+    def by_id(self, bank_id: int) -> Optional[Bank]:
+        return self._by_id.get(bank_id)
+
+
+    # Страна по коду банка; None - банк неизвестен
+    def country(self, code: str) -> Optional[str]:
+        bank = self._by_code.get(code)
+        return bank.country if bank is not None else None
+
+
+    # Банк по названию (с нестрогим совпадением); None - не найден
+    def _find(self, name: str) -> Optional[Bank]:
+        words = _words(name)
+        key = "".join(words)
+        bank = self._by_key.get(key)
+        if bank is not None or len(key) < _MIN_PREFIX:
+            return bank
+
+        # Позиция конца слова в ключе -> индекс следующего слова
+        boundaries: Dict[int, int] = {}
+        position = 0
+        for index, word in enumerate(words):
+            position += len(word)
+            boundaries[position] = index + 1
+
+        # Самый длинный известный ключ - префикс запроса
+        for end in range(len(key) - 1, _MIN_PREFIX - 1, -1):
+            bank = self._by_key.get(key[:end])
+            if bank is None:
+                continue
+            rest = _rest_words(key, end, boundaries)
+            if rest is not None and not _conflicts(bank, words[rest:]):
+                return bank
+
+        # Запрос - префикс ключей одного банка
+        position = bisect_left(self._sorted_keys, key)
+        found: Optional[Bank] = None
+        while position < len(self._sorted_keys) and self._sorted_keys[position].startswith(key):
+            candidate = self._by_key[self._sorted_keys[position]]
+            if found is not None and candidate.code != found.code:
+                return None
+            found = candidate
+            position += 1
+        return found
+
+
+# Создание объекта класса BankCatalog
+bank_catalog = BankCatalog(
+    regions={
+        REGION_RUS: bank_res.BANKS_RUS,
+        REGION_TJS: bank_res.BANKS_TJS,
+        REGION_ABH: bank_res.BANKS_ABH,
+        REGION_AZN: bank_res.BANKS_AZN,
+    },
+    bank_ids={**our_bank_res.SBP_BANK_IDS, **settings.bank_ids}
+)
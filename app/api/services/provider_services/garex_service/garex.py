@@ -1,30 +1,49 @@
 # СЕРВИС ПРОВАЙДЕРА GAREX
+import asyncio
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Type
+
 import httpx
 from fastapi import HTTPException
+from pydantic import BaseModel
 
+from app.api.services.provider_services.errors import ProviderError
 from app.api.services.provider_services.garex_service import tools
+from app.api.services.provider_services.garex_service.tools import ResponseT
+from app.core import deadline
 from app.core.config import settings
+from app.core.http_clients import http_clients
+from app.api.services.circuit_breaker import circuit_breakers
+from app.api.services.method_selector import method_selector
+from app.api.services.rate_limiter import provider_limiters
 from app.models.paygatecore.pay_in_bank_model import (
     PayInBankResponse,
     PayInBankRequest,
     PayInBankResponse2
 )
 from app.models.paygatecore.pay_in_model import PayInRequest, PayInResponse, PayInResponse2
-from app.api.resources.garex_resources.bank_resources import bank_res
-from app.api.resources.garex_resources.transaction_resources import transactions_res
+from app.api.services.provider_services.garex_service.bank_catalog import (
+    REGION_AZN,
+    REGION_RUS,
+    bank_catalog
+)
+from app.api.services.provider_services.garex_service.routing import routing_table
 from app.models.paygatecore.pay_out_model import PayOutRequest, PayOutResponse, PayOutRequest2
 from app.models.paygatecore.pay_in_sim_model import PayInSimResponse
-
-
-HEADERS = {
-        "Authorization": f"Bearer {settings.providers["garex"]["api_key"]}",
-        "Content-Type": "application/json"
-    }
+from app.models.garex.transaction_model import (
+    BankRequisiteResponse,
+    PaymentResponse,
+    RequisiteResponse,
+    TransactionResponse
+)
 
 
 def _handle_provider_status(status_code):
-    if status_code == 422:
-        raise HTTPException(
+    if 200 <= status_code < 300:
+        return
+
+    elif status_code == 422:
+        raise ProviderError(
             status_code=status_code,
             detail={
                 "code": "422",
@@ -33,7 +52,7 @@ def _handle_provider_status(status_code):
         )
 
     elif status_code == 404:
-        raise HTTPException(
+        raise ProviderError(
             status_code=status_code,
             detail={
                 "code": "404",
@@ -42,7 +61,7 @@ def _handle_provider_status(status_code):
         )
 
     elif status_code == 400:
-        raise HTTPException(
+        raise ProviderError(
             status_code=status_code,
             detail={
                 "code": "400",
@@ -51,7 +70,7 @@ def _handle_provider_status(status_code):
         )
 
     elif status_code == 500:
-        raise HTTPException(
+        raise ProviderError(
             status_code=status_code,
             detail={
                 "code": "500",
@@ -60,7 +79,7 @@ def _handle_provider_status(status_code):
         )
 
     else:
-        raise HTTPException(
+        raise ProviderError(
             status_code=status_code,
             detail={
                 "code": f"{status_code}",
@@ -69,292 +88,281 @@ def _handle_provider_status(status_code):
         )
 
 
-class GarexService:
-    def __init__(self):
-        self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(30.0, connect=5.0),
-            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
-        )
-
-
-    async def pay_in_card(self, request: PayInRequest) -> PayInResponse:
-        try:
-            method = transactions_res.PAYMENT_METHODS_CARD[0]
-            provider_payload = tools.transform_to_provider_format(request, method)
-            response = await self.client.post(
-                f"{settings.providers["garex"]["base_url"]}/api/merchant/payments/payin",
-                headers=HEADERS,
-                json=provider_payload
-            )
-            _handle_provider_status(response.status_code)
-            response.raise_for_status()
-            provider_response = response.json()
-
-            return tools.transform_from_provider_format(provider_response)
-
-        except HTTPException as e:
-            raise HTTPException(
-                status_code=e.status_code,
-                detail=e.detail
-            )
+# Списки банков, для которых доступны внутрибанковские переводы по карте
+INTERNAL_CARD_REGIONS = frozenset((REGION_RUS, REGION_AZN))
+
+
+UNSUPPORTED_METHOD = "Провайдер не поддерживает данный вид оплаты: {}"
+
+
+class Operation(NamedTuple):
+    endpoint: str  # Эндпоинт провайдера (payin/payout)
+    schema: Type[BaseModel]  # Схема ответа провайдера
+    build: Callable[[Any, str, Optional[str]], BaseModel]  # (запрос, метод, код банка) -> тело запроса
+    convert: Callable[[Any], BaseModel]  # Ответ провайдера -> ответ шлюза
+    unsupported_status: int = 400  # Статус, если в таблице маршрутов нет методов
+    unsupported_message: str = UNSUPPORTED_METHOD
+
+
+def _without_bank(build: Callable[[Any, str], BaseModel]) -> Callable[[Any, str, Optional[str]], BaseModel]:
+    return lambda request, method, bank_code: build(request, method)
+
+
+# Операции по видам из таблицы маршрутов
+OPERATIONS: Dict[str, Operation] = {
+    "card": Operation(
+        "payin", PaymentResponse,
+        _without_bank(tools.transform_to_provider_format),
+        tools.transform_from_provider_format
+    ),
+    "internal-card": Operation(
+        "payin", PaymentResponse,
+        tools.transform_to_provider_format_with_bank,
+        tools.transform_from_provider_format_with_bank,
+        unsupported_message="Провайдер не поддерживает такой внутрибанк: {}"
+    ),
+    "transgran-card": Operation(
+        "payin", BankRequisiteResponse,
+        _without_bank(tools.transform_to_provider_format),
+        tools.transform_from_provider_format_2
+    ),
+    "sbp": Operation(
+        "payin", PaymentResponse,
+        _without_bank(tools.transform_to_provider_format),
+        tools.transform_from_provider_format_with_bank
+    ),
+    "internal-sbp": Operation(
+        "payin", BankRequisiteResponse,
+        tools.transform_to_provider_format_with_bank,
+        tools.transform_from_provider_format_with_bank_2,
+        unsupported_status=404,
+        unsupported_message="Банк: {} не найден в системе провайдера"
+    ),
+    "transgran-sbp": Operation(
+        "payin", BankRequisiteResponse,
+        _without_bank(tools.transform_to_provider_format),
+        tools.transform_from_provider_format_with_bank_2
+    ),
+    "sim": Operation(
+        "payin", RequisiteResponse,
+        _without_bank(tools.transform_to_provider_format),
+        tools.transform_from_provider_format_3
+    ),
+    "payout-card": Operation(
+        "payout", TransactionResponse,
+        _without_bank(tools.transform_to_provider_format_for_out),
+        tools.transform_from_provider_format_for_out
+    ),
+    "payout-sbp": Operation(
+        "payout", TransactionResponse,
+        tools.transform_to_provider_format_for_out_2,
+        tools.transform_from_provider_format_for_out,
+        unsupported_status=404,
+        unsupported_message="Банк: {} не найден в системе провайдера"
+    ),
+}
+
+
+# Отказ по таблице маршрутов (operation=None - вид операции провайдер не знает)
+def _unsupported(operation: Optional[Operation], subject) -> HTTPException:
+    if operation is None:
+        status_code, message = 400, UNSUPPORTED_METHOD
+    else:
+        status_code, message = operation.unsupported_status, operation.unsupported_message
+    return HTTPException(
+        status_code=status_code,
+        detail={
+            "code": f"{status_code}",
+            "message": message.format(subject)
+        }
+    )
+
+
+def _bank_not_found(bank) -> HTTPException:
+    return HTTPException(
+        status_code=404,
+        detail={
+            "code": "404",
+            "message": f"Банк: {bank} не найден в системе провайдера"
+        }
+    )
 
 
-    async def pay_in_internal_card(self, request: PayInBankRequest) -> PayInBankResponse:
+class GarexService:
+    def __init__(self):
+        self.base_url = settings.providers["garex"]["base_url"]
+        self.headers = {
+            "Authorization": f"Bearer {settings.providers["garex"]["api_key"]}",
+            "Content-Type": "application/json"
+        }
+
+    # Общий пул соединений к провайдеру
+    @property
+    def client(self):
+        return http_clients.get(self.base_url)
+
+
+    # Запрос к провайдеру через circuit breaker (провайдер, эндпоинт, метод)
+    # и лимитер нагрузки (провайдер, payin/payout). Не дольше method_attempt_timeout
+    # и оставшегося срока запроса мерчанта: по истечении запрос отменяется
+    # и соединение возвращается в пул
+    async def _post(self, endpoint: str, method: str, payload: BaseModel, schema: Type[ResponseT]) -> ResponseT:
+        timeout, by_deadline = deadline.attempt_timeout(settings.method_attempt_timeout)
+        breaker = circuit_breakers.get("garex", endpoint, method)
+        breaker.acquire()
+
+        started: Optional[float] = None
         try:
-            try:
-                bank_code = bank_res.BANKS_RUS[request.bank_name]
-            except KeyError:
-                try:
-                    bank_code = bank_res.BANKS_AZN[request.bank_name]
-                except KeyError:
-                    raise HTTPException(
-                        status_code=404,
-                        detail={
-                            "code": "404",
-                            "message": f"Банк: {request.bank_name} не найден в системе провайдера"
-                        }
+            async with asyncio.timeout(timeout):
+                async with provider_limiters.get("garex", endpoint).slot():
+                    started = time.monotonic()
+                    response = await self.client.post(
+                        f"{self.base_url}/api/merchant/payments/{endpoint}",
+                        headers=self.headers,
+                        content=tools.encode_payload(payload)
                     )
-
-            try:
-                method = transactions_res.PAYMENT_METHODS_CARD_ITERNAL[bank_code]
-            except KeyError:
+        except TimeoutError:
+            # Сбой провайдера - только если он не ответил за всё отведённое ему время
+            if started is None or by_deadline:
+                breaker.release()
+            else:
+                breaker.record(False, time.monotonic() - started)
+            if by_deadline:
+                raise deadline.cut_off()
+            if started is None:
                 raise HTTPException(
-                    status_code=400,
+                    status_code=504,
                     detail={
-                        "code": "400",
-                        "message": f"Провайдер не поддерживает такой внутрибанк: {request.bank_name}"}
+                        "code": "504",
+                        "message": "Превышено время ожидания очереди запросов к провайдеру"
+                    }
                 )
-
-            provider_payload = tools.transform_to_provider_format_with_bank(request, method, bank_code)
-            response = await self.client.post(
-                f"{settings.providers["garex"]["base_url"]}/api/merchant/payments/payin",
-                headers=HEADERS,
-                json=provider_payload
-            )
-            _handle_provider_status(response.status_code)
-            response.raise_for_status()
-            provider_response = response.json()
-
-            return tools.transform_from_provider_format_with_bank(provider_response)
-
-        except HTTPException as e:
-            raise HTTPException(
-                status_code=e.status_code,
-                detail=e.detail
+            raise ProviderError(
+                status_code=504,
+                detail={
+                    "code": "504",
+                    "message": "Провайдер не ответил за отведённое время"
+                }
             )
+        # Запрос не дошёл до провайдера (отмена клиентом или отказ лимитера)
+        except (asyncio.CancelledError, HTTPException):
+            breaker.release()
+            raise
+        except Exception:
+            if started is None:
+                breaker.release()
+            else:
+                breaker.record(False, time.monotonic() - started)
+            raise
+
+        # Ответы 4xx - штатный отказ провайдера, сбоем не считаются
+        breaker.record(response.status_code < 500, time.monotonic() - started)
+
+        _handle_provider_status(response.status_code)
+        return tools.decode_response(schema, response.content)
+
+
+    # Одна попытка метода
+    async def _attempt(self, operation: Operation, method: str, request, bank_code: Optional[str]) -> BaseModel:
+        payload = operation.build(request, method, bank_code)
+        return await self._post(operation.endpoint, method, payload, operation.schema)
+
+
+    # Общий исполнитель: методы из таблицы маршрутов перебираются по порядку успешности.
+    # 404/400 ("нет объявления/реквизита") - переход к следующему методу, если позволяет срок
+    # запроса; остальные ошибки (в т.ч. таймаут, после которого заявка с тем же orderId
+    # могла быть создана) - сразу клиенту
+    async def _execute(self, kind: str, request, bank_code: Optional[str] = None, subject=None) -> BaseModel:
+        methods = routing_table.resolve(kind, request.currency, bank_code)
+        # Таблица знает, что провайдер не обслужит запрос: отказ без обращения к провайдеру
+        if not methods:
+            raise _unsupported(OPERATIONS.get(kind), kind if subject is None else subject)
+
+        operation = OPERATIONS[kind]
+        if len(methods) == 1:
+            provider_response = await self._attempt(operation, methods[0], request, bank_code)
+            return operation.convert(provider_response)
+
+        amount = int(request.amount)
+        error = HTTPException(
+            status_code=404,
+            detail={
+                "code": "404",
+                "message": "Объявление, по заданным параметрам, не было найдено"
+            }
+        )
 
+        for attempt, method in enumerate(method_selector.order(methods, amount)):
+            # На фолбэк не хватает времени - отдаём последний отказ
+            if attempt and not deadline.allows_fallback():
+                break
+            # В оценку метода идут только ответы и сбои провайдера; локальные отказы
+            # (лимитер, circuit breaker, срок запроса) метод не характеризуют
+            try:
+                provider_response = await self._attempt(operation, method, request, bank_code)
+            except ProviderError as e:
+                if e.status_code == 404 or e.status_code == 400:
+                    method_selector.record_no_offer(method, amount)
+                    error = e
+                    continue
+                if e.status_code >= 500:
+                    method_selector.record_failure(method, amount)
+                raise
+            except httpx.HTTPError:
+                method_selector.record_failure(method, amount)
+                raise
 
-    async def pay_in_transgran_card(self, request: PayInRequest) -> PayInResponse2:
-        try:
-            method = transactions_res.PAYMENT_METHODS_CARD_TRANSGRAN[0]
-            provider_payload = tools.transform_to_provider_format(request, method)
-            response = await self.client.post(
-                f"{settings.providers["garex"]["base_url"]}/api/merchant/payments/payin",
-                headers=HEADERS,
-                json=provider_payload
-            )
-            _handle_provider_status(response.status_code)
-            response.raise_for_status()
-            provider_response = response.json()
-
-            return tools.transform_from_provider_format_2(provider_response)
-
-        except HTTPException as e:
-            if e.status_code == 404 or e.status_code == 400:
-                method = transactions_res.PAYMENT_METHODS_CARD_TRANSGRAN[1]
-                provider_payload = tools.transform_to_provider_format(request, method)
-                response = await self.client.post(
-                    f"{settings.providers["garex"]["base_url"]}/api/merchant/payments/payin",
-                    headers=HEADERS,
-                    json=provider_payload
-                )
-                _handle_provider_status(response.status_code)
-                response.raise_for_status()
-                provider_response = response.json()
+            method_selector.record_success(method, amount)
+            return operation.convert(provider_response)
 
-                return tools.transform_from_provider_format_2(provider_response)
+        raise error
 
-            raise HTTPException(
-                status_code=e.status_code,
-                detail=e.detail
-            )
 
+    async def pay_in_card(self, request: PayInRequest) -> PayInResponse:
+        return await self._execute("card", request)
 
-    async def pay_in_sbp(self, request: PayInRequest) -> PayInBankResponse:
-        try:
-            method = transactions_res.PAYMENT_METHODS_SBP[0]
-            provider_payload = tools.transform_to_provider_format(request, method)
-            response = await self.client.post(
-                f"{settings.providers["garex"]["base_url"]}/api/merchant/payments/payin",
-                headers=HEADERS,
-                json=provider_payload
-            )
-            _handle_provider_status(response.status_code)
-            response.raise_for_status()
-            provider_response = response.json()
 
-            return tools.transform_from_provider_format_with_bank(provider_response)
+    async def pay_in_internal_card(self, request: PayInBankRequest) -> PayInBankResponse:
+        bank = bank_catalog.find(request.bank_name)
+        if bank is None or not bank.regions & INTERNAL_CARD_REGIONS:
+            raise _bank_not_found(request.bank_name)
+        return await self._execute("internal-card", request, bank.code, request.bank_name)
 
-        except HTTPException as e:
-            raise HTTPException(
-                status_code=e.status_code,
-                detail=e.detail
-            )
 
+    async def pay_in_transgran_card(self, request: PayInRequest) -> PayInResponse2:
+        return await self._execute("transgran-card", request)
 
-    async def pay_in_internal_sbp(self, request: PayInBankRequest) -> PayInBankResponse2:
-        try:
-            try:
-                bank_code = bank_res.BANKS_RUS[request.bank_name]
-            except KeyError:
-                raise HTTPException(
-                    status_code=404,
-                    detail={
-                        "code": "404",
-                        "message": f"Банк: {request.bank_name} не найден в системе провайдера"                        }
-                )
 
-            method = transactions_res.PAYMENT_METHODS_SBP[0]
-            provider_payload = tools.transform_to_provider_format_with_bank(request, method, bank_code)
-            response = await self.client.post(
-                f"{settings.providers["garex"]["base_url"]}/api/merchant/payments/payin",
-                headers=HEADERS,
-                json=provider_payload
-            )
-            _handle_provider_status(response.status_code)
-            response.raise_for_status()
-            provider_response = response.json()
+    async def pay_in_sbp(self, request: PayInRequest) -> PayInBankResponse:
+        return await self._execute("sbp", request)
 
-            return tools.transform_from_provider_format_with_bank_2(provider_response)
 
-        except HTTPException as e:
-            raise HTTPException(
-                status_code=e.status_code,
-                detail=e.detail
-            )
+    async def pay_in_internal_sbp(self, request: PayInBankRequest) -> PayInBankResponse2:
+        bank = bank_catalog.find(request.bank_name)
+        if bank is None:
+            raise _bank_not_found(request.bank_name)
+        return await self._execute("internal-sbp", request, bank.code, request.bank_name)
 
 
     async def pay_in_transgran_sbp(self, request: PayInRequest) -> PayInBankResponse2:
-        try:
-            method = transactions_res.PAYMENT_METHODS_SBP_TRANSGRAN[0]
-            provider_payload = tools.transform_to_provider_format(request, method)
-            response = await self.client.post(
-                f"{settings.providers["garex"]["base_url"]}/api/merchant/payments/payin",
-                headers=HEADERS,
-                json=provider_payload
-            )
-            _handle_provider_status(response.status_code)
-            response.raise_for_status()
-            provider_response = response.json()
-
-            return tools.transform_from_provider_format_with_bank_2(provider_response)
-
-        except HTTPException as e:
-            if e.status_code == 404 or e.status_code == 400:
-                method = transactions_res.PAYMENT_METHODS_SBP_TRANSGRAN[1]
-                provider_payload = tools.transform_to_provider_format(request, method)
-                response = await self.client.post(
-                    f"{settings.providers["garex"]["base_url"]}/api/merchant/payments/payin",
-                    headers=HEADERS,
-                    json=provider_payload
-                )
-                _handle_provider_status(response.status_code)
-                response.raise_for_status()
-                provider_response = response.json()
-
-                return tools.transform_from_provider_format_with_bank_2(provider_response)
+        return await self._execute("transgran-sbp", request)
 
-            raise HTTPException(
-                status_code=e.status_code,
-                detail=e.detail
-            )
 
-
-    async def pay_in_qr(self):
-        raise HTTPException(
-            status_code=400,
-            detail={
-                "code": "400",
-                "message": "Провайдер не поддерживает данный вид оплаты: qr"
-            }
-        )
+    # Для qr в таблице маршрутов нет методов
+    async def pay_in_qr(self, request: PayInRequest):
+        return await self._execute("qr", request)
 
 
     async def pay_in_sim(self, request: PayInRequest) -> PayInSimResponse:
-        try:
-            method = transactions_res.PAYMENT_METHODS_SIM[0]
-            provider_payload = tools.transform_to_provider_format(request, method)
-            response = await self.client.post(
-                f"{settings.providers["garex"]["base_url"]}/api/merchant/payments/payin",
-                headers=HEADERS,
-                json=provider_payload
-            )
-            _handle_provider_status(response.status_code)
-            response.raise_for_status()
-            provider_response = response.json()
-
-            return tools.transform_from_provider_format_3(provider_response)
-
-        except HTTPException as e:
-            raise HTTPException(
-                status_code=e.status_code,
-                detail=e.detail
-            )
+        return await self._execute("sim", request)
 
 
     async def pay_out_card(self, request: PayOutRequest) -> PayOutResponse:
-        try:
-            method = transactions_res.PAYMENT_METHODS_CARD[0]
-            provider_payload = tools.transform_to_provider_format_for_out(request, method)
-            response = await self.client.post(
-                f"{settings.providers["garex"]["base_url"]}/api/merchant/payments/payout",
-                headers=HEADERS,
-                json=provider_payload
-            )
-            _handle_provider_status(response.status_code)
-            response.raise_for_status()
-            provider_response = response.json()
-
-            return tools.transform_from_provider_format_for_out(provider_response)
-
-        except HTTPException as e:
-            raise HTTPException(
-                status_code=e.status_code,
-                detail=e.detail
-            )
+        return await self._execute("payout-card", request)
 
 
     async def pay_out_sbp(self, request: PayOutRequest2) -> PayOutResponse:
-        try:
-            try:
-                # Наши коды?
-                bank_code = "sber" # Заглушка
-            except KeyError:
-                raise HTTPException(
-                    status_code=404,
-                    detail={
-                        "code": "404",
-                        "message": f"Банк: {request.bank_name} не найден в системе провайдера"                        }
-                )
-
-            method = transactions_res.PAYMENT_METHODS_SBP[0]
-            provider_payload = tools.transform_to_provider_format_for_out_2(request, method, bank_code)
-            response = await self.client.post(
-                f"{settings.providers["garex"]["base_url"]}/api/merchant/payments/payout",
-                headers=HEADERS,
-                json=provider_payload
-            )
-            _handle_provider_status(response.status_code)
-            response.raise_for_status()
-            provider_response = response.json()
-
-            return tools.transform_from_provider_format_for_out(provider_response)
-
-        except HTTPException as e:
-            raise HTTPException(
-                status_code=e.status_code,
-                detail=e.detail
-            )
-
-
-garex = GarexService()
+        bank = bank_catalog.by_id(request.bank_id)
+        if bank is None:
+            raise _bank_not_found(request.bank_id)
+        return await self._execute("payout-sbp", request, bank.code, request.bank_id)
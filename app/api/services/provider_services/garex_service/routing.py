@@ -0,0 +1,70 @@
+# ТАБЛИЦА МАРШРУТИЗАЦИИ ПЛАТЕЖНЫХ МЕТОДОВ GAREX
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.api.resources.paygatecore_resources.valid_resources import valid_res
+from app.api.resources.garex_resources.transaction_resources import transactions_res
+from app.api.services.provider_services.garex_service.bank_catalog import REGION_RUS, bank_catalog
+
+
+# Ключ: (вид операции, валюта, код банка или None)
+RouteKey = Tuple[str, str, Optional[str]]
+
+
+class MethodRoute(NamedTuple):
+    kind: str  # Вид операции (совпадает с названием метода в TRANSACTION_ROUTES)
+    methods: Tuple[str, ...]  # Методы провайдера в порядке перебора
+    currencies: Tuple[str, ...] = tuple(valid_res.valid_currency)  # Поддерживаемые валюты
+    banks: Optional[Tuple[str, ...]] = None  # Коды банков (None - операция без банка)
+
+
+def _banks(*, region: Optional[str] = None, method: Optional[str] = None) -> Tuple[str, ...]:
+    return tuple(
+        bank.code for bank in bank_catalog
+        if (region is None or region in bank.regions) and (method is None or method in bank.methods)
+    )
+
+
+# Декларативная таблица: чего нет в таблице, то провайдер не обслуживает
+ROUTING_TABLE: List[MethodRoute] = [
+    MethodRoute("card", tuple(transactions_res.PAYMENT_METHODS_CARD)),
+    MethodRoute("transgran-card", tuple(transactions_res.PAYMENT_METHODS_CARD_TRANSGRAN)),
+    MethodRoute("sbp", tuple(transactions_res.PAYMENT_METHODS_SBP)),
+    MethodRoute("internal-sbp", tuple(transactions_res.PAYMENT_METHODS_SBP), banks=_banks(region=REGION_RUS)),
+    MethodRoute("transgran-sbp", tuple(transactions_res.PAYMENT_METHODS_SBP_TRANSGRAN)),
+    MethodRoute("sim", tuple(transactions_res.PAYMENT_METHODS_SIM)),
+    MethodRoute("payout-card", tuple(transactions_res.PAYMENT_METHODS_CARD)),
+    MethodRoute("payout-sbp", tuple(transactions_res.PAYMENT_METHODS_SBP),
+                banks=_banks(method=transactions_res.PAYMENT_METHODS_SBP[0])),
+    *(
+        MethodRoute("internal-card", (method,), banks=(code,))
+        for code, method in transactions_res.PAYMENT_METHODS_CARD_ITERNAL.items()
+    ),
+]
+
+
+class RoutingTable:
+    """Таблица, развёрнутая при старте в плоский словарь: выбор методов - один поиск по ключу."""
+
+    def __init__(self, routes: Iterable[MethodRoute]):
+        self._routes: Dict[RouteKey, Tuple[str, ...]] = {}
+        for route in routes:
+            for currency in route.currencies:
+                for bank_code in route.banks if route.banks is not None else (None,):
+                    self._routes[(route.kind, currency, bank_code)] = route.methods
+
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+
+    # Методы для операции; пусто - провайдер её не обслуживает
+    def resolve(self, kind: str, currency: str, bank_code: Optional[str] = None) -> Tuple[str, ...]:
+        return self._routes.get((kind, currency, bank_code), ())
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {"routes": len(self._routes)}
+
+
+# Создание объекта класса RoutingTable
+routing_table = RoutingTable(ROUTING_TABLE)
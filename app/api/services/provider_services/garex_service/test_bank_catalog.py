@@ -0,0 +1,57 @@
+# ТЕСТЫ КАТАЛОГА БАНКОВ ПРОВАЙДЕРА GAREX
+import unittest
+
+from app.api.services.provider_services.garex_service.bank_catalog import REGION_RUS, BankCatalog, bank_catalog
+from app.api.services.provider_services.garex_service.tools import _get_country
+
+
+class BankCatalogTest(unittest.TestCase):
+    def _code(self, name: str):
+        bank = bank_catalog.find(name)
+        return bank.code if bank is not None else None
+
+    def test_spelling_variants(self):
+        for name, code in (
+            ("Т-банк", "t-bank"),
+            ("т банк", "t-bank"),
+            ("ПСБ", "psbank"),
+            ("Амра-банк", "amra-bank"),
+            ("Амонатбанк (Таджикистан)", "amonatbank"),
+        ):
+            with self.subTest(name=name):
+                self.assertEqual(self._code(name), code)
+
+    def test_prefix_match_ends_on_word_boundary(self):
+        self.assertEqual(self._code("ВТБ 24"), "vtb")
+        self.assertEqual(self._code("Сбербанк"), "sber")
+        self.assertEqual(self._code("Промсвязь"), "psbank")
+        self.assertIsNone(self._code("Уралсибирский"))
+
+    def test_country_qualifier_must_match_bank(self):
+        self.assertIsNone(self._code("ВТБ Беларусь"))
+        self.assertIsNone(self._code("Альфа-Банк Казахстан"))
+        self.assertEqual(self._code("Сбер Россия"), "sber")
+        self.assertEqual(self._code("Алиф Банк Таджикистан"), "alif-bank")
+
+    def test_country_alone_is_not_a_bank(self):
+        self.assertIsNone(self._code("Таджикистан"))
+        self.assertIsNone(self._code("Абхазия"))
+
+    def test_unknown_code_has_empty_country(self):
+        self.assertEqual(bank_catalog.country("sber"), "РФ")
+        self.assertEqual(bank_catalog.country("amonatbank"), "Таджикистан")
+        self.assertIsNone(bank_catalog.country("unknown"))
+        with self.assertLogs("app.api.services.provider_services.garex_service.tools", "WARNING"):
+            self.assertEqual(_get_country("unknown"), "")
+
+    def test_sbp_bank_ids_are_checked_at_start(self):
+        self.assertEqual(bank_catalog.by_id(100000000111).code, "sber")
+        regions = {REGION_RUS: {"Сбер": "sber"}}
+        with self.assertRaises(ValueError):
+            BankCatalog(regions, {1: "unknown"})
+        with self.assertRaises(ValueError):
+            BankCatalog(regions, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+# ТЕСТЫ СЕРВИСА ПРОВАЙДЕРА GAREX
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+import httpx
+from fastapi import HTTPException
+
+from app.api.services.circuit_breaker import STATE_OPEN, CircuitBreakerRegistry
+from app.api.services.method_selector import MethodSelector
+from app.api.services.provider_services.errors import ProviderError
+from app.api.services.provider_services.garex_service import garex as garex_module
+from app.api.services.provider_services.garex_service.garex import GarexService
+from app.core import deadline
+from app.core.config import settings
+from app.core.http_clients import http_clients
+from app.models.garex.transaction_model import BankRequisiteResponse
+from app.models.paygatecore.pay_in_model import PayInRequest
+
+
+PROVIDER_RESPONSE = BankRequisiteResponse.model_validate({
+    "result": {
+        "id": 1,
+        "orderId": "order-1",
+        "amount": 1000,
+        "rate": 90,
+        "fee": 0.01,
+        "address": "2200700011112222",
+        "recipient": "Иван И.",
+        "bankName": "Сбер",
+        "bank": "sber"
+    }
+})
+
+NO_OFFER = ProviderError(status_code=404, detail={"code": "404", "message": "нет объявления"})
+
+
+def _request() -> PayInRequest:
+    return PayInRequest(amount="1000", currency="RUB", merchant_transaction_id="order-1")
+
+
+class GarexExecutorTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.service = GarexService()
+        self.selector = MethodSelector(bands=[10_000], alpha=0.5, negative_ttl=60)
+        patcher = mock.patch.object(garex_module, "method_selector", self.selector)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _post(self, *outcomes):
+        post = mock.AsyncMock(side_effect=list(outcomes))
+        self.service._post = post
+        return post
+
+    def _methods(self, post) -> list:
+        return [call.args[1] for call in post.await_args_list]
+
+    async def test_provider_no_offer_falls_back_to_next_method(self):
+        post = self._post(NO_OFFER, PROVIDER_RESPONSE)
+        response = await self.service.pay_in_transgran_sbp(_request())
+
+        self.assertEqual(response.id, 1)
+        self.assertEqual(self._methods(post), ["m2tjs_sbp", "m2abh_sbp"])
+        self.assertEqual(self.selector.order(["m2tjs_sbp", "m2abh_sbp"], 1000), ["m2abh_sbp"])
+
+    async def test_local_rejection_is_not_scored(self):
+        self._post(HTTPException(status_code=503, detail={"code": "503", "message": "circuit open"}))
+        with self.assertRaises(HTTPException) as error:
+            await self.service.pay_in_transgran_sbp(_request())
+
+        self.assertEqual(error.exception.status_code, 503)
+        self.assertEqual(self.selector.stats()["scores"], {})
+
+    async def test_provider_failure_is_scored_and_not_retried(self):
+        post = self._post(ProviderError(status_code=500, detail={"code": "500", "message": "сбой"}))
+        with self.assertRaises(ProviderError):
+            await self.service.pay_in_transgran_sbp(_request())
+
+        self.assertEqual(len(post.await_args_list), 1)
+        self.assertEqual(self.selector.stats()["scores"], {"m2tjs_sbp/0": 0.0})
+
+    async def test_all_methods_recently_rejected_still_calls_provider(self):
+        for method in ("m2tjs_sbp", "m2abh_sbp"):
+            self.selector.record_no_offer(method, 1000)
+        post = self._post(PROVIDER_RESPONSE)
+
+        await self.service.pay_in_transgran_sbp(_request())
+        self.assertEqual(len(post.await_args_list), 1)
+
+
+# Провайдер принимает соединение, но не отвечает
+async def _hang(request: httpx.Request) -> httpx.Response:
+    await asyncio.Event().wait()
+
+
+class GarexTimeoutTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.service = GarexService()
+        self.breakers = CircuitBreakerRegistry()
+        for target, name, value in (
+            (garex_module, "circuit_breakers", self.breakers),
+            (http_clients, "get", mock.Mock(return_value=httpx.AsyncClient(transport=httpx.MockTransport(_hang)))),
+            (settings, "method_attempt_timeout", 0.01),
+            (settings, "breaker_min_calls", 3),
+        ):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _breaker(self):
+        return self.breakers.get("garex", "payin", "c2c")
+
+    async def test_hung_provider_trips_the_breaker(self):
+        for _ in range(3):
+            with self.assertRaises(ProviderError) as error:
+                await self.service.pay_in_card(_request())
+            self.assertEqual(error.exception.status_code, 504)
+
+        self.assertEqual(self._breaker().state, STATE_OPEN)
+        with self.assertRaises(HTTPException) as error:
+            await self.service.pay_in_card(_request())
+        self.assertEqual(error.exception.status_code, 503)
+
+    async def test_merchant_deadline_is_not_a_provider_failure(self):
+        token = deadline._deadline.set(time.monotonic() + 0.005)
+        self.addCleanup(deadline._deadline.reset, token)
+        with mock.patch.object(settings, "method_attempt_timeout", 15.0):
+            with self.assertRaises(HTTPException) as error:
+                await self.service.pay_in_card(_request())
+
+        self.assertNotIsInstance(error.exception, ProviderError)
+        self.assertEqual(error.exception.status_code, 504)
+        self.assertEqual(self._breaker().stats()["calls"], 0)
+
+    async def test_cancelled_request_is_released(self):
+        task = asyncio.create_task(self.service.pay_in_card(_request()))
+        await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(self._breaker().stats()["calls"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
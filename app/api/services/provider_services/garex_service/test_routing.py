@@ -0,0 +1,31 @@
+# ТЕСТЫ ТАБЛИЦЫ МАРШРУТИЗАЦИИ GAREX
+import unittest
+
+from app.api.services.provider_services.garex_service.routing import MethodRoute, RoutingTable, routing_table
+
+
+class RoutingTableTest(unittest.TestCase):
+    def test_resolves_declared_routes(self):
+        self.assertEqual(routing_table.resolve("transgran-sbp", "RUB"), ("m2tjs_sbp", "m2abh_sbp"))
+        self.assertEqual(routing_table.resolve("internal-card", "RUB", "sber"), ("sber2sber",))
+        self.assertEqual(routing_table.resolve("internal-sbp", "RUB", "sber"), ("sbp",))
+
+    def test_unserved_operations_resolve_to_nothing(self):
+        self.assertEqual(routing_table.resolve("internal-card", "RUB", "rshb"), ())
+        self.assertEqual(routing_table.resolve("internal-sbp", "RUB", "amonatbank"), ())
+        self.assertEqual(routing_table.resolve("card", "XXX"), ())
+        self.assertEqual(routing_table.resolve("unknown", "RUB"), ())
+
+    def test_routes_expand_over_currencies_and_banks(self):
+        table = RoutingTable([
+            MethodRoute("card", ("c2c",), currencies=("RUB", "USD")),
+            MethodRoute("internal-sbp", ("sbp",), currencies=("RUB",), banks=("sber", "vtb")),
+        ])
+        self.assertEqual(len(table), 4)
+        self.assertEqual(table.resolve("card", "USD"), ("c2c",))
+        self.assertEqual(table.resolve("internal-sbp", "RUB", "vtb"), ("sbp",))
+        self.assertEqual(table.resolve("internal-sbp", "RUB"), ())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+# ТЕСТЫ ПРЕОБРАЗОВАНИЙ ЗАПРОСОВ И ОТВЕТОВ GAREX
+import json
+import unittest
+
+from app.api.services.provider_services.errors import ProviderError
+from app.api.services.provider_services.garex_service import tools
+from app.core.config import settings
+from app.models.garex.transaction_model import BankRequisiteResponse, TransactionResponse
+from app.models.paygatecore.pay_in_model import PayInRequest
+
+
+RESULT = {
+    "id": 1,
+    "orderId": "order-1",
+    "amount": 1000,
+    "rate": 90,
+    "fee": 0.01,
+    "address": "2200700011112222",
+    "recipient": "Иван И.",
+    "bankName": "Сбер",
+    "bank": "sber"
+}
+
+
+def _content(**result) -> bytes:
+    return json.dumps({"result": {**RESULT, **result}}).encode("utf-8")
+
+
+class GarexToolsTest(unittest.TestCase):
+    def test_payload_is_encoded_with_static_fields(self):
+        request = PayInRequest(amount="1000", currency="RUB", merchant_transaction_id="order-1")
+        payload = json.loads(tools.encode_payload(tools.transform_to_provider_format(request, "c2c")))
+
+        self.assertEqual(payload, {
+            "merchantId": settings.merchant_token,
+            "callbackUri": settings.webhook_base_url,
+            "orderId": "order-1",
+            "method": "c2c",
+            "amount": 1000,
+            "currency": "RUB",
+            "user_id": "??"
+        })
+
+    def test_response_is_decoded_and_converted(self):
+        response = tools.decode_response(BankRequisiteResponse, _content())
+        converted = tools.transform_from_provider_format_with_bank_2(response)
+
+        self.assertEqual(converted.merchant_transaction_id, "order-1")
+        self.assertEqual(converted.country_name, "РФ")
+
+    def test_unknown_bank_keeps_requisites(self):
+        response = tools.decode_response(BankRequisiteResponse, _content(bank="new-bank"))
+        with self.assertLogs(tools.logger, "WARNING"):
+            converted = tools.transform_from_provider_format_with_bank_2(response)
+
+        self.assertEqual(converted.country_name, "")
+        self.assertEqual(converted.phone_number, "2200700011112222")
+
+    def test_missing_and_invalid_fields_are_provider_errors(self):
+        content = json.dumps({"result": {"id": 1}}).encode("utf-8")
+        with self.assertRaises(ProviderError) as error:
+            tools.decode_response(TransactionResponse, content)
+        self.assertEqual(error.exception.status_code, 520)
+        self.assertIn("нет поля result.orderId", error.exception.detail)
+
+        with self.assertRaises(ProviderError) as error:
+            tools.decode_response(TransactionResponse, _content(id="abc"))
+        self.assertIn("некорректное поле result.id", error.exception.detail)
+
+        with self.assertRaises(ProviderError):
+            tools.decode_response(TransactionResponse, b"not json")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# ТЕСТЫ РОУТЕРА ВЕБХУКОВ ПРОВАЙДЕРА GAREX
+import json
+import unittest
+from unittest import mock
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from app.api.resources.garex_resources.transaction_resources import transactions_res
+from app.api.services.ingestion_queue import IngestionQueue
+from app.api.services.provider_services.garex_service import webhook_router
+from app.api.services.provider_services.our.signature import verify_provider_webhook
+from app.api.services.webhook_dedup_service import WebhookDeduplicator
+from app.api.services.webhook_sequencer import WebhookSequencer
+
+
+def _body(webhook_id: int, state: str) -> bytes:
+    return json.dumps({
+        "id": webhook_id,
+        "state": state,
+        "amount": 5000,
+        "rate": 90,
+        "address": "2200700011112222",
+        "bik": "044525974",
+        "recipient": "Иван Иванович И.",
+        "bank": "sber",
+        "bankName": "Сбер",
+        "sign": "0" * 64,
+        "orderId": "order-1",
+        "fee": 3
+    }).encode("utf-8")
+
+
+class WebhookOrderingTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sent = []
+        self.sequencer = WebhookSequencer(transactions_res.STATUS_TRANSITIONS, max_orders=100, ttl=60)
+        self.queue = IngestionQueue("webhooks-test", max_depth=10, workers=1, retry_after=1)
+        self.queue.start()
+
+        async def enqueue(url, payload):
+            self.sent.append(payload.status)
+
+        for name, value in (
+            ("webhook_sequencer", self.sequencer),
+            ("webhook_queue", self.queue),
+            ("webhook_dedup", WebhookDeduplicator(max_size=100, ttl=60, db_path=None, prune_interval=60)),
+        ):
+            patcher = mock.patch.object(webhook_router, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(webhook_router.callback_queue, "enqueue", enqueue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        app = FastAPI()
+        app.include_router(webhook_router.router)
+        app.dependency_overrides[verify_provider_webhook] = lambda: None
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        await self.queue.stop()
+
+    async def test_late_cancel_reaches_merchant(self):
+        statuses = []
+        for webhook_id, state in enumerate(["paid", "paid", "pending", "finished", "canceled", "dispute"]):
+            response = await self.client.post("/garex", content=_body(webhook_id, state))
+            statuses.append(response.status_code)
+
+        self.assertEqual(statuses, [200] * 6)
+        self.assertEqual(self.sent, ["paid", "finished", "canceled"])
+        stats = self.sequencer.stats()
+        self.assertEqual((stats["processed"], stats["repeated"], stats["out_of_order"]), (4, 1, 1))
+
+
+class ParseWebhookTest(unittest.TestCase):
+    def test_parsed_from_bytes_into_callback(self):
+        webhook = webhook_router.parse_webhook(_body(1, "paid"))
+        callback = webhook_router.build_callback(webhook)
+        self.assertEqual((callback.merchant_transaction_id, callback.status), ("order-1", "paid"))
+        self.assertEqual(callback.paid_amount, "5000")
+
+    def test_unpaid_status_has_no_paid_amount(self):
+        callback = webhook_router.build_callback(webhook_router.parse_webhook(_body(1, "canceled")))
+        self.assertEqual(callback.paid_amount, "0")
+
+    def test_invalid_body_is_rejected(self):
+        for body in (b"{", json.dumps({"id": 1}).encode("utf-8")):
+            with self.subTest(body=body):
+                with self.assertRaises(HTTPException) as error:
+                    webhook_router.parse_webhook(body)
+                self.assertEqual(error.exception.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
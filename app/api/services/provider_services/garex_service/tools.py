@@ -1,9 +1,13 @@
 # ИНСТРУМЕНТЫ ПРОВАЙДЕРА GAREX
+import json
+import logging
 from datetime import datetime, timedelta
-from fastapi import HTTPException
-from typing import Dict, Any
+from typing import Type, TypeVar
 
-from app.api.resources.garex_resources.bank_resources import bank_res
+from pydantic import BaseModel, ValidationError
+
+from app.api.services.provider_services.errors import ProviderError
+from app.api.services.provider_services.garex_service.bank_catalog import bank_catalog
 from app.core.config import settings
 from app.models.paygatecore.pay_in_bank_model import (
     PayInBankRequest,
@@ -17,216 +21,189 @@ from app.models.paygatecore.pay_in_model import (
 )
 from app.models.paygatecore.pay_out_model import PayOutRequest, PayOutRequest2, PayOutResponse
 from app.models.paygatecore.pay_in_sim_model import PayInSimResponse
+from app.models.garex.transaction_model import PayInPayload, PayOutPayload
+from app.utils.mapping import compile_mapping, compute, const, path
+
+
+logger = logging.getLogger(__name__)
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+# Страна банка, которого нет в каталоге
+UNKNOWN_COUNTRY = ""
 
 
+# Страна банка по коду провайдера. Поле справочное, а оффер у провайдера к этому моменту
+# уже создан - неизвестный банк не должен приводить к ошибке транзакции
 def _get_country(bank_code: str) -> str:
-    if bank_code in bank_res.BANKS_RUS:
-        return "РФ"
-    elif bank_code in bank_res.BANKS_AZN:
-        return "Азербайджан"
-    elif bank_code in bank_res.BANKS_ABH:
-        return "Абхазия"
-    else:
-        return "Таджикистан"
-
-
-def transform_to_provider_format(request: PayInRequest, method: str) -> Dict[str, Any]:
-    payload = {
-        "orderId": request.merchant_transaction_id,
-        "merchantId": settings.merchant_token,
-        "method": method,
-        "amount": int(request.amount),
-        "currency": request.currency,
-        "user_id": "??",
-        "callbackUri": settings.webhook_base_url
-    }
-    return payload
-
-
-def transform_to_provider_format_with_bank(request: PayInBankRequest, method: str, bank_code: str) -> Dict[str, Any]:
-    payload = {
-        "orderId": request.merchant_transaction_id,
-        "merchantId": settings.merchant_token,
-        "method": method,
-        "assetOrBank": bank_code,
-        "amount": int(request.amount),
-        "currency": request.currency,
-        "user_id": "??",
-        "callbackUri": settings.webhook_base_url
-    }
-    return payload
-
-
-def transform_to_provider_format_for_out(request: PayOutRequest, method: str) -> Dict[str, Any]:
-    payload = {
-        "orderId": request.merchant_transaction_id,
-        "merchantId": settings.merchant_token,
-        "method": method,
-        "assetOrBank": "??",
-        "requisiteNumber": request.card_number,
-        "requisiteRecipient": request.owner_name,
-        "amount": int(request.amount),
-        "currency": request.currency,
-        "callbackUri": settings.webhook_base_url
-    }
-    return payload
-
-
-def transform_to_provider_format_for_out_2(request: PayOutRequest2, method: str, bank_code: str) -> Dict[str, Any]:
-    payload = {
-        "orderId": request.merchant_transaction_id,
-        "merchantId": settings.merchant_token,
-        "method": method,
-        "assetOrBank": bank_code,
-        "requisiteNumber": request.phone_number,
-        "requisiteRecipient": request.owner_name,
-        "amount": int(request.amount),
-        "currency": request.currency,
-        "callbackUri": settings.webhook_base_url
-    }
-    return payload
-
-
-def transform_from_provider_format(provider_response: Dict[str, Any]) -> PayInResponse:
-    try:
-        return PayInResponse(
-            id=provider_response["result"]["id"],
-            merchant_transaction_id=provider_response["result"]["orderId"],
-            expires_at=datetime.now() + timedelta(minutes = 10),
-            amount=str(provider_response["result"]["amount"]),
-            currency="RUB",
-            currency_rate=str(provider_response["result"]["rate"]),
-            amount_in_usd=str(provider_response["result"]["amount"] / provider_response["result"]["rate"]),
-            rate="",
-            commission=str(provider_response["result"]["fee"] * provider_response["result"]["amount"]),
-            card_number=provider_response["result"]["address"],
-            owner_name=provider_response["result"]["recipient"],
-            bank_name=provider_response["result"]["bankName"],
-            country_name=_get_country(provider_response["result"]["bank"]),
-            payment_currency="RUB",
-            payment_link=provider_response["url"]
-        )
-    except KeyError:
-        raise HTTPException(
-            status_code=520,
-            detail="Неизвестная ошибка при получении ответа"
-        )
-
-
-def transform_from_provider_format_2(provider_response: Dict[str, Any]) -> PayInResponse2:
-    try:
-        return PayInResponse2(
-            id=provider_response["result"]["id"],
-            merchant_transaction_id=provider_response["result"]["orderId"],
-            expires_at=datetime.now() + timedelta(minutes=10),
-            amount=str(provider_response["result"]["amount"]),
-            currency="RUB",
-            currency_rate=str(provider_response["result"]["rate"]),
-            amount_in_usd=str(provider_response["result"]["amount"] / provider_response["result"]["rate"]),
-            rate="",
-            commission=str(provider_response["result"]["fee"] * provider_response["result"]["amount"]),
-            card_number=provider_response["result"]["address"],
-            owner_name=provider_response["result"]["recipient"],
-            bank_name=provider_response["result"]["bankName"],
-            country_name=_get_country(provider_response["result"]["bank"]),
-            payment_currency="RUB"
-        )
-    except KeyError:
-        raise HTTPException(
-            status_code=520,
-            detail="Неизвестная ошибка при получении ответа"
-        )
-
-
-def transform_from_provider_format_3(provider_response: Dict[str, Any]) -> PayInSimResponse:
-    try:
-        return PayInSimResponse(
-            id=provider_response["result"]["id"],
-            merchant_transaction_id=provider_response["result"]["orderId"],
-            expires_at=datetime.now() + timedelta(minutes = 10),
-            amount=str(provider_response["result"]["amount"]),
-            currency="RUB",
-            currency_rate=str(provider_response["result"]["rate"]),
-            amount_in_usd=str(provider_response["result"]["amount"] / provider_response["result"]["rate"]),
-            rate="",
-            commission=str(provider_response["result"]["fee"] * provider_response["result"]["amount"]),
-            phone_number=provider_response["result"]["address"],
-            owner_name=provider_response["result"]["recipient"],
-            operator=provider_response["result"]["bankName"]
-        )
-    except KeyError:
-        raise HTTPException(
-            status_code=520,
-            detail="Неизвестная ошибка при получении ответа"
-        )
-
-
-def transform_from_provider_format_with_bank(provider_response: Dict[str, Any]) -> PayInBankResponse:
-    try:
-        return PayInBankResponse(
-            id=provider_response["result"]["id"],
-            merchant_transaction_id=provider_response["result"]["orderId"],
-            expires_at=datetime.now() + timedelta(minutes = 10),
-            amount=str(provider_response["result"]["amount"]),
-            currency="RUB",
-            currency_rate=str(provider_response["result"]["rate"]),
-            amount_in_usd=str(provider_response["result"]["amount"] / provider_response["result"]["rate"]),
-            rate="",
-            commission=str(provider_response["result"]["fee"] * provider_response["result"]["amount"]),
-            phone_number=provider_response["result"]["address"],
-            owner_name=provider_response["result"]["recipient"],
-            bank_name=provider_response["result"]["bankName"],
-            country_name=_get_country(provider_response["result"]["bank"]),
-            payment_currency="RUB",
-            payment_link=provider_response["url"]
-        )
-    except KeyError:
-        raise HTTPException(
-            status_code=520,
-            detail="Неизвестная ошибка при получении ответа"
-        )
-
-
-def transform_from_provider_format_with_bank_2(provider_response: Dict[str, Any]) -> PayInBankResponse2:
-    try:
-        return PayInBankResponse2(
-            id=provider_response["result"]["id"],
-            merchant_transaction_id=provider_response["result"]["orderId"],
-            expires_at=datetime.now() + timedelta(minutes = 10),
-            amount=str(provider_response["result"]["amount"]),
-            currency="RUB",
-            currency_rate=str(provider_response["result"]["rate"]),
-            amount_in_usd=str(provider_response["result"]["amount"] / provider_response["result"]["rate"]),
-            rate="",
-            commission=str(provider_response["result"]["fee"] * provider_response["result"]["amount"]),
-            phone_number=provider_response["result"]["address"],
-            owner_name=provider_response["result"]["recipient"],
-            bank_name=provider_response["result"]["bankName"],
-            country_name=_get_country(provider_response["result"]["bank"]),
-            payment_currency="RUB"
-        )
-    except KeyError:
-        raise HTTPException(
-            status_code=520,
-            detail="Неизвестная ошибка при получении ответа"
-        )
-
-
-def transform_from_provider_format_for_out(provider_response: Dict[str, Any]) -> PayOutResponse:
+    country = bank_catalog.country(bank_code)
+    if country is None:
+        logger.warning(f"Неизвестный код банка в ответе провайдера: {bank_code}")
+        return UNKNOWN_COUNTRY
+    return country
+
+
+# Ответ провайдера без ожидаемого поля
+def _missing_field(field: str) -> ProviderError:
+    return ProviderError(
+        status_code=520,
+        detail=f"Неизвестная ошибка при получении ответа: нет поля {field}"
+    )
+
+
+def _invalid_field(field: str) -> ProviderError:
+    return ProviderError(
+        status_code=520,
+        detail=f"Неизвестная ошибка при получении ответа: некорректное поле {field}"
+    )
+
+
+# Статическая часть тела запроса, закодированная один раз: '{"merchantId":...,"callbackUri":...,'
+_STATIC_PAYLOAD = json.dumps(
+    {"merchantId": settings.merchant_token, "callbackUri": settings.webhook_base_url},
+    ensure_ascii=False,
+    separators=(",", ":")
+).encode("utf-8")[:-1] + b","
+
+
+# Тело запроса к провайдеру: статическая часть + поля транзакции
+def encode_payload(payload: BaseModel) -> bytes:
+    return _STATIC_PAYLOAD + payload.__pydantic_serializer__.to_json(payload, exclude_none=True)[1:]
+
+
+# Разбор ответа провайдера из байтов за один проход
+def decode_response(schema: Type[ResponseT], content: bytes) -> ResponseT:
     try:
-        return PayOutResponse(
-            id=provider_response["result"]["id"],
-            merchant_transaction_id=provider_response["result"]["orderId"],
-            expires_at=datetime.now() + timedelta(minutes = 10),
-            amount=str(provider_response["result"]["amount"]),
-            currency="RUB",
-            currency_rate=str(provider_response["result"]["rate"]),
-            amount_in_usd=str(provider_response["result"]["amount"] / provider_response["result"]["rate"]),
-            rate="",
-            commission=str(provider_response["result"]["fee"] * provider_response["result"]["amount"])
-        )
-    except KeyError:
-        raise HTTPException(
-            status_code=520,
-            detail="Неизвестная ошибка при получении ответа"
-        )
+        return schema.model_validate_json(content)
+    except ValidationError as e:
+        error = e.errors()[0]
+        field = ".".join(str(loc) for loc in error["loc"]) or "body"
+        raise _missing_field(field) if error["type"] == "missing" else _invalid_field(field)
+
+
+def transform_to_provider_format(request: PayInRequest, method: str) -> PayInPayload:
+    return PayInPayload(
+        orderId=request.merchant_transaction_id,
+        method=method,
+        amount=int(request.amount),
+        currency=request.currency
+    )
+
+
+def transform_to_provider_format_with_bank(request: PayInBankRequest, method: str, bank_code: str) -> PayInPayload:
+    return PayInPayload(
+        orderId=request.merchant_transaction_id,
+        method=method,
+        assetOrBank=bank_code,
+        amount=int(request.amount),
+        currency=request.currency
+    )
+
+
+def transform_to_provider_format_for_out(request: PayOutRequest, method: str) -> PayOutPayload:
+    return PayOutPayload(
+        orderId=request.merchant_transaction_id,
+        method=method,
+        assetOrBank="??",
+        requisiteNumber=request.card_number,
+        requisiteRecipient=request.owner_name,
+        amount=int(request.amount),
+        currency=request.currency
+    )
+
+
+def transform_to_provider_format_for_out_2(request: PayOutRequest2, method: str, bank_code: str) -> PayOutPayload:
+    return PayOutPayload(
+        orderId=request.merchant_transaction_id,
+        method=method,
+        assetOrBank=bank_code,
+        requisiteNumber=request.phone_number,
+        requisiteRecipient=request.owner_name,
+        amount=int(request.amount),
+        currency=request.currency
+    )
+
+
+OFFER_TTL = timedelta(minutes=10)
+
+
+def _expires_at() -> datetime:
+    return datetime.now() + OFFER_TTL
+
+
+def _amount_in_usd(amount, rate) -> str:
+    return str(amount / rate)
+
+
+def _commission(fee, amount) -> str:
+    return str(fee * amount)
+
+
+# Поля ответа провайдера
+ID = ("result", "id")
+ORDER_ID = ("result", "orderId")
+AMOUNT = ("result", "amount")
+RATE = ("result", "rate")
+FEE = ("result", "fee")
+ADDRESS = ("result", "address")
+RECIPIENT = ("result", "recipient")
+BANK = ("result", "bank")
+BANK_NAME = ("result", "bankName")
+URL = ("url",)
+
+# Поля, общие для всех ответов
+_TRANSACTION = {
+    "id": path(*ID),
+    "merchant_transaction_id": path(*ORDER_ID),
+    "expires_at": compute(_expires_at),
+    "amount": compute(str, AMOUNT),
+    "currency": const("RUB"),
+    "currency_rate": compute(str, RATE),
+    "amount_in_usd": compute(_amount_in_usd, AMOUNT, RATE),
+    "rate": const(""),
+    "commission": compute(_commission, FEE, AMOUNT)
+}
+
+# Реквизиты банка для оплаты
+_BANK_DETAILS = {
+    "owner_name": path(*RECIPIENT),
+    "bank_name": path(*BANK_NAME),
+    "country_name": compute(_get_country, BANK),
+    "payment_currency": const("RUB")
+}
+
+
+transform_from_provider_format = compile_mapping(PayInResponse, {
+    **_TRANSACTION,
+    **_BANK_DETAILS,
+    "card_number": path(*ADDRESS),
+    "payment_link": path(*URL)
+}, _missing_field, attributes=True)
+
+transform_from_provider_format_2 = compile_mapping(PayInResponse2, {
+    **_TRANSACTION,
+    **_BANK_DETAILS,
+    "card_number": path(*ADDRESS)
+}, _missing_field, attributes=True)
+
+transform_from_provider_format_3 = compile_mapping(PayInSimResponse, {
+    **_TRANSACTION,
+    "phone_number": path(*ADDRESS),
+    "owner_name": path(*RECIPIENT),
+    "operator": path(*BANK_NAME)
+}, _missing_field, attributes=True)
+
+transform_from_provider_format_with_bank = compile_mapping(PayInBankResponse, {
+    **_TRANSACTION,
+    **_BANK_DETAILS,
+    "phone_number": path(*ADDRESS),
+    "payment_link": path(*URL)
+}, _missing_field, attributes=True)
+
+transform_from_provider_format_with_bank_2 = compile_mapping(PayInBankResponse2, {
+    **_TRANSACTION,
+    **_BANK_DETAILS,
+    "phone_number": path(*ADDRESS)
+}, _missing_field, attributes=True)
+
+transform_from_provider_format_for_out = compile_mapping(PayOutResponse, _TRANSACTION, _missing_field, attributes=True)
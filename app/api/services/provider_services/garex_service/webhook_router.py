@@ -1,11 +1,17 @@
 # РОУТЕР ВЕБХУКОВ ПРОВАЙДЕРА GAREX
-import httpx
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 import logging
-from typing import Dict, Any
-import asyncio
+from typing import Dict, Tuple
+
+from pydantic import ValidationError
 
 from app.core.config import settings
+from app.core.responses import StaticJSON
+from app.api.services.callback_service import callback_queue
+from app.api.services.webhook_dedup_service import webhook_dedup
+from app.api.services.webhook_sequencer import OUT_OF_ORDER, webhook_sequencer
+from app.api.services.ingestion_queue import webhook_queue
+from app.api.services.provider_services.our.signature import verify_provider_webhook
 from app.models.garex.webhook_model import WebhookRequest as WebhookRequestFrom
 from app.models.paygatecore.other_models import WebhookRequest as WebhookRequestTo
 from app.api.resources.garex_resources.transaction_resources import transactions_res
@@ -15,93 +21,139 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-async def _send_callback(webhook_url:str, webhook_data: WebhookRequestTo):
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                webhook_url,
-                json=webhook_data,
-                headers={"Content-Type": "application/json"}
-            )
-
-            if response.status_code == 200:
-                logger.info(f"Webhook sent successfully to: {webhook_url}")
+# Статус -> (сообщение в лог, отправлять ли колбэк мерчанту)
+STATE_HANDLERS: Dict[str, Tuple[str, bool]] = {
+    transactions_res.STATUS_CREATED: ("Transaction created", False),
+    transactions_res.STATUS_PENDING: ("Transaction pending payment", False),
+    transactions_res.STATUS_PAID: ("Transaction paid", True),
+    transactions_res.STATUS_FINISHED: ("Transaction finished successfully", True),
+    transactions_res.STATUS_CANCELED: ("Transaction cancelled", True),
+    transactions_res.STATUS_DISPUTE: ("Transaction disputing", False),
+    transactions_res.STATUS_FAILED: ("Transaction failed", True),
+}
 
-    except Exception as e:
-        logger.info(f"Webhook sent failed: {str(e)}")
+# Статусы, в которых сумма считается оплаченной
+PAID_STATES = frozenset((
+    transactions_res.STATUS_PAID,
+    transactions_res.STATUS_FINISHED
+))
 
 
-def _check_paid_amount(state: str) -> bool:
-    if state in [
-        transactions_res.STATUS_PAID,
-        transactions_res.STATUS_FINISHED
-                 ]:
-        return True
-    return False
+# Подтверждение провайдеру, закодированное один раз
+WEBHOOK_ACK = StaticJSON({
+    "code": "200",
+    "message": "Webhook processed successfully"
+})
 
 
-@router.post("/garex", status_code=200)
-async def handle_transaction_webhook(
-        webhook_data_from: Dict[str, Any]
-):
+# Валидация тела вебхука за один проход (без промежуточного dict)
+def parse_webhook(body: bytes) -> WebhookRequestFrom:
     try:
-        webhook = WebhookRequestFrom(**webhook_data_from)
-        logger.info(f"New webhook: {webhook.orderId}")
-
-        if webhook.state not in transactions_res.ALL_STATUSES:
-            logger.info(f"Unknown transaction: {webhook.orderId} status: {webhook.state}")
-            raise
-
-        if webhook.state == transactions_res.STATUS_CREATED:
-            logger.info(f"Transaction created: {webhook.orderId}")
-            raise
-
-        elif webhook.state == transactions_res.STATUS_PENDING:
-            logger.info(f"Transaction pending payment: {webhook.orderId}")
-            raise
-
-        elif webhook.state == transactions_res.STATUS_PAID:
-            logger.info(f"Transaction paid: {webhook.orderId}")
-
-        elif webhook.status == transactions_res.STATUS_FINISHED:
-            logger.info(f"Transaction finished successfully: {webhook.orderId}")
-            raise
-
-        elif webhook.status == transactions_res.STATUS_CANCELED:
-            logger.info(f"Transaction cancelled: {webhook.orderId}")
-
-        elif webhook.status == transactions_res.STATUS_DISPUTE:
-            logger.info(f"Transaction disputing: {webhook.orderId}")
-            raise
-
-        elif webhook.status == transactions_res.STATUS_FAILED:
-            logger.info(f"Transaction failed: {webhook.orderId}")
-
-        webhook_data_to = WebhookRequestTo(
-            id=webhook.id,
-            merchant_transaction_id=webhook.orderId,
-            type="",
-            amount=str(webhook.amount),
-            paid_amount=str(webhook.amount) if _check_paid_amount(webhook.state) else "0",
-            currency="RUB",
-            currency_rate=str(webhook.rate),
-            amount_in_usd=str(webhook.amount / webhook.rate),
-            status=webhook.state
+        return WebhookRequestFrom.model_validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Некорректный вебхук: {e.error_count()} ошибок валидации"
         )
 
-        webhook_url = settings.webhook_base_url
-        asyncio.create_task(
-            _send_callback(webhook_url, webhook_data_to)
-        )
 
-        return {
-            "code": "200",
-            "message": "Webhook processed successfully"
-        }
+def build_callback(webhook: WebhookRequestFrom) -> WebhookRequestTo:
+    return WebhookRequestTo(
+        id=webhook.id,
+        merchant_transaction_id=webhook.orderId,
+        type="",
+        amount=str(webhook.amount),
+        paid_amount=str(webhook.amount) if webhook.state in PAID_STATES else "0",
+        currency="RUB",
+        currency_rate=str(webhook.rate),
+        amount_in_usd=str(webhook.amount / webhook.rate),
+        status=webhook.state
+    )
+
+
+async def _process_webhook(webhook: WebhookRequestFrom, state_handler: Tuple[str, bool]):
+    message, forward = state_handler
+    logger.info("%s: %s", message, webhook.orderId)
+
+    if forward:
+        try:
+            # Колбэк сохраняется до подтверждения вебхука провайдеру
+            await callback_queue.enqueue(settings.webhook_base_url, build_callback(webhook))
+        except Exception as e:
+            logger.error(f"Error with webhook: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Ошибка при обработке вебхука: {str(e)}"
+            )
 
-    except Exception as e:
-        logger.error(f"Error with webhook: {str(e)}")
+
+# Отброшенное событие заказа: повтор текущего статуса или недопустимый переход
+def _log_rejected(webhook: WebhookRequestFrom, rejection: str):
+    if rejection == OUT_OF_ORDER:
+        logger.warning("Out-of-order webhook: %s status: %s", webhook.orderId, webhook.state)
+    else:
+        logger.info("Repeated webhook: %s status: %s", webhook.orderId, webhook.state)
+
+
+# Обработка вебхука воркером очереди: события одного заказа - строго по очереди
+async def _sequence_webhook(webhook: WebhookRequestFrom, state_handler: Tuple[str, bool], dedup_key):
+    order_key = ("garex", webhook.orderId)
+    try:
+        async with webhook_sequencer.hold(order_key):
+            rejection = webhook_sequencer.rejection(order_key, webhook.state)
+            if rejection is not None:
+                _log_rejected(webhook, rejection)
+            else:
+                await _process_webhook(webhook, state_handler)
+                webhook_sequencer.advance(order_key, webhook.state)
+    except BaseException:
+        webhook_dedup.release(dedup_key)
+        raise
+
+    await webhook_dedup.commit(dedup_key)
+    return WEBHOOK_ACK.response()
+
+
+@router.post(
+    "/garex",
+    status_code=200,
+    dependencies=[Depends(verify_provider_webhook)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": WebhookRequestFrom.model_json_schema()}}
+        }
+    }
+)
+async def handle_transaction_webhook(request: Request):
+    webhook = parse_webhook(await request.body())
+
+    state_handler = STATE_HANDLERS.get(webhook.state)
+    if state_handler is None:
+        logger.info("Unknown transaction: %s status: %s", webhook.orderId, webhook.state)
         raise HTTPException(
-            status_code=500,
-            detail=f"Ошибка при обработке вебхука: {str(e)}"
+            status_code=400,
+            detail=f"Неизвестный статус транзакции: {webhook.state}"
         )
+
+    # Повторная доставка уже обработанного вебхука - подтверждаем без колбэка
+    dedup_key = ("garex", webhook.id, webhook.state)
+    if not webhook_dedup.claim(dedup_key):
+        logger.info("Duplicate webhook: %s status: %s", webhook.orderId, webhook.state)
+        return WEBHOOK_ACK.response()
+
+    # Быстрый отказ без постановки в очередь
+    rejection = webhook_sequencer.rejection(("garex", webhook.orderId), webhook.state)
+    if rejection is not None:
+        _log_rejected(webhook, rejection)
+        await webhook_dedup.commit(dedup_key)
+        return WEBHOOK_ACK.response()
+
+    # Принятый в очередь вебхук принадлежит воркеру (он же снимает захват при ошибке);
+    # при переполнении - 503, провайдер доставит вебхук повторно
+    try:
+        return await webhook_queue.submit(lambda: _sequence_webhook(webhook, state_handler, dedup_key))
+    except HTTPException as e:
+        if e.status_code == 503:
+            webhook_dedup.release(dedup_key)
+        raise
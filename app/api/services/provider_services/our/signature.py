@@ -3,22 +3,31 @@ from fastapi import Request, HTTPException
 import json
 
 from app.core.config import settings
-from app.api.services.provider_services.our.signature_service import verify_signature
+from app.api.services.provider_services.our.signature_service import verify_signature, get_raw_verifier
 
 
-async def verify_webhook_signature(request: Request):
+# Активные секреты: основной и дополнительные (на время ротации)
+def _active_secrets():
+    return tuple(secret for secret in (settings.webhook_secret_key, *settings.webhook_secret_keys) if secret)
+
+
+def _check_webhook_settings():
     if not settings.webhook_enabled:
         raise HTTPException(
             status_code=403,
             detail="Webhook now: turn off"
         )
 
-    if not settings.webhook_secret_key:
+    if not _active_secrets():
         raise HTTPException(
             status_code=500,
             detail="No secret key provided"
         )
 
+
+async def verify_webhook_signature(request: Request):
+    _check_webhook_settings()
+
     # Получение тела запроса
     try:
         body_bytes = await request.body()
@@ -40,11 +49,50 @@ async def verify_webhook_signature(request: Request):
     # Получение полного URL запроса
     full_url = str(request.url)
 
-    # Проверка подписи
-    if not verify_signature(full_url, request_body, signature_header, settings.webhook_secret_key):
+    # Проверка подписи любым активным секретом (ротация)
+    if not any(
+        verify_signature(full_url, request_body, signature_header, secret) for secret in _active_secrets()
+    ):
         raise HTTPException(
             status_code=401,
             detail="Invalid signature"
         )
 
     return request_body
+
+
+# Проверка подписи по сырому телу (без разбора и повторной сериализации JSON)
+async def verify_webhook_signature_raw(request: Request) -> bytes:
+    _check_webhook_settings()
+
+    signature_header = request.headers.get("X-Signature")
+    if not signature_header:
+        raise HTTPException(
+            status_code=401,
+            detail="No signature provided"
+        )
+
+    # Тело кэшируется в Request - обработчик вебхука прочитает его повторно бесплатно
+    body_bytes = await request.body()
+    verifier = get_raw_verifier(_active_secrets())
+    if not verifier.verify(body_bytes, request.url.path, request.url.query, signature_header):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid signature"
+        )
+
+    return body_bytes
+
+
+# Зависимость для роутов вебхуков провайдеров (режим из настроек)
+async def verify_provider_webhook(request: Request):
+    if settings.webhook_signature_mode == "raw":
+        await verify_webhook_signature_raw(request)
+    elif settings.webhook_signature_mode == "json":
+        await verify_webhook_signature(request)
+    else:
+        # Неизвестный режим не должен отключать проверку подписи
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unknown webhook signature mode: {settings.webhook_signature_mode}"
+        )
@@ -3,7 +3,8 @@ import hashlib
 import hmac
 import json
 from urllib.parse import urlparse
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
 import logging
 
 
@@ -44,3 +45,50 @@ def verify_signature(url: str, request_body: Dict[str, Any], signature_header: s
     except Exception as e:
         logger.error(f"Error with verify signature: {str(e)}")
         return False
+
+
+class RawSignatureVerifier:
+    """Подпись по сырому телу запроса: HMAC-SHA256(body + path + query).
+
+    HMAC-объекты создаются один раз на секрет, на каждую проверку - copy().
+    Несколько секретов - для ротации (подходит подпись любым из них).
+    """
+
+    def __init__(self, secrets: List[str]):
+        self._keyed = [
+            hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+            for secret in secrets
+        ]
+
+
+    @staticmethod
+    def _digest(keyed: "hmac.HMAC", body: bytes, path: bytes, query: bytes) -> str:
+        mac = keyed.copy()
+        mac.update(body)
+        mac.update(path)
+        mac.update(query)
+        return mac.hexdigest()
+
+
+    # Подпись основным (первым) секретом
+    def sign(self, body: bytes, path: str, query: str = "") -> str:
+        return self._digest(self._keyed[0], body, path.encode("utf-8"), query.encode("utf-8"))
+
+
+    def verify(self, body: bytes, path: str, query: str, signature: str) -> bool:
+        if not signature:
+            return False
+
+        signature = signature.lower()
+        path_bytes = path.encode("utf-8")
+        query_bytes = query.encode("utf-8")
+        for keyed in self._keyed:
+            if hmac.compare_digest(self._digest(keyed, body, path_bytes, query_bytes), signature):
+                return True
+        return False
+
+
+# Проверяющий объект на набор секретов (создаётся один раз)
+@lru_cache(maxsize=8)
+def get_raw_verifier(secrets: Tuple[str, ...]) -> RawSignatureVerifier:
+    return RawSignatureVerifier(list(secrets))
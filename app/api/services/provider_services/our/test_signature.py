@@ -0,0 +1,71 @@
+# ТЕСТЫ ПРОВЕРКИ ПОДПИСИ ВЕБХУКОВ
+import json
+import unittest
+from unittest import mock
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.api.services.provider_services.our.signature import verify_provider_webhook
+from app.api.services.provider_services.our.signature_service import calculate_signature, get_raw_verifier
+from app.core.config import Settings, settings
+
+
+BODY = {"id": 1, "status": "paid"}
+URL = "http://testserver/webhook?source=garex"
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+
+    @app.post("/webhook", dependencies=[Depends(verify_provider_webhook)])
+    async def webhook():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+class VerifyProviderWebhookTest(unittest.TestCase):
+    def setUp(self):
+        self.client = _client()
+
+    def _post(self, signature: str = None):
+        headers = {"X-Signature": signature} if signature else {}
+        return self.client.post(URL, content=json.dumps(BODY), headers=headers)
+
+    def test_json_mode_is_default(self):
+        self.assertEqual(Settings().webhook_signature_mode, "json")
+
+    def test_json_mode_accepts_legacy_signature(self):
+        signature = calculate_signature(URL, BODY, settings.webhook_secret_key)
+        with mock.patch.object(settings, "webhook_signature_mode", "json"):
+            self.assertEqual(self._post(signature).status_code, 200)
+            self.assertEqual(self._post("0" * 64).status_code, 401)
+
+    def test_json_mode_accepts_rotated_secret(self):
+        signature = calculate_signature(URL, BODY, "rotated_secret")
+        with mock.patch.object(settings, "webhook_signature_mode", "json"):
+            self.assertEqual(self._post(signature).status_code, 401)
+            with mock.patch.object(settings, "webhook_secret_keys", ["rotated_secret"]):
+                self.assertEqual(self._post(signature).status_code, 200)
+
+    def test_raw_mode_accepts_raw_body_signature(self):
+        signature = get_raw_verifier((settings.webhook_secret_key,)).sign(
+            json.dumps(BODY).encode("utf-8"), "/webhook", "source=garex"
+        )
+        with mock.patch.object(settings, "webhook_signature_mode", "raw"):
+            self.assertEqual(self._post(signature).status_code, 200)
+            self.assertEqual(self._post().status_code, 401)
+
+    def test_unknown_mode_does_not_skip_verification(self):
+        with mock.patch.object(settings, "webhook_signature_mode", "off"):
+            self.assertEqual(self._post().status_code, 500)
+
+    def test_unknown_mode_is_rejected_by_settings(self):
+        with self.assertRaises(ValidationError):
+            Settings(webhook_signature_mode="off")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+# ОГРАНИЧЕНИЕ НАГРУЗКИ НА ПРОВАЙДЕРОВ (BULKHEAD + TOKEN BUCKET)
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+
+def _raise_saturated(message: str):
+    raise HTTPException(
+        status_code=503,
+        detail={
+            "code": "503",
+            "message": message
+        }
+    )
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+
+    # Резервирование токена; False, если ждать дольше max_wait
+    async def acquire(self, max_wait: float) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+        if wait > max_wait:
+            return False
+
+        # Токен списывается сразу (баланс может уйти в минус) - очередь честная
+        self._tokens -= 1
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+
+class ProviderLimiter:
+    def __init__(self, name: str, concurrency: int, rate: float, burst: float, max_wait: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._bucket = TokenBucket(rate, burst)
+
+        self.in_use = 0
+        self.waiting = 0
+        self.rejected_rate = 0
+        self.rejected_concurrency = 0
+        self.total_wait = 0.0
+        self.acquired = 0
+
+
+    @asynccontextmanager
+    async def slot(self):
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            if not await self._bucket.acquire(self.max_wait):
+                self.rejected_rate += 1
+                _raise_saturated("Превышен лимит запросов к провайдеру, повторите запрос позже")
+
+            remaining = self.max_wait - (time.monotonic() - started)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=max(remaining, 0))
+            except asyncio.TimeoutError:
+                self.rejected_concurrency += 1
+                _raise_saturated("Превышен лимит одновременных запросов к провайдеру, повторите запрос позже")
+        finally:
+            self.waiting -= 1
+
+        self.in_use += 1
+        self.acquired += 1
+        self.total_wait += time.monotonic() - started
+        try:
+            yield
+        finally:
+            self.in_use -= 1
+            self._semaphore.release()
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_use": self.in_use,
+            "concurrency": self.concurrency,
+            "saturation": round(self.in_use / self.concurrency, 4),
+            "waiting": self.waiting,
+            "rejected_rate": self.rejected_rate,
+            "rejected_concurrency": self.rejected_concurrency,
+            "avg_wait": round(self.total_wait / self.acquired, 6) if self.acquired else 0.0
+        }
+
+
+class ProviderLimiterRegistry:
+    def __init__(self):
+        self._limiters: Dict[Tuple[str, str], ProviderLimiter] = {}
+
+
+    # Лимитер на (провайдер, класс метода: payin/payout)
+    def get(self, provider_name: str, method_class: str) -> ProviderLimiter:
+        key = (provider_name, method_class)
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            # Настройки провайдера перекрывают общие значения
+            config = {
+                **settings.limiter_defaults.get(method_class, {}),
+                **settings.providers.get(provider_name, {}).get("limits", {}).get(method_class, {})
+            }
+            limiter = ProviderLimiter(
+                name="/".join(key),
+                concurrency=int(config["concurrency"]),
+                rate=float(config["rate"]),
+                burst=float(config["burst"]),
+                max_wait=settings.limiter_max_wait
+            )
+            self._limiters[key] = limiter
+        return limiter
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {limiter.name: limiter.stats() for limiter in self._limiters.values()}
+
+
+# Создание объекта класса ProviderLimiterRegistry
+provider_limiters = ProviderLimiterRegistry()
@@ -0,0 +1,97 @@
+# ТЕСТЫ ОЧЕРЕДИ ДОСТАВКИ КОЛБЭКОВ
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import httpx
+from pydantic import BaseModel
+
+from app.api.services.callback_service import STATUS_DEAD, CallbackQueue
+from app.core.http_clients import http_clients
+
+
+class Payload(BaseModel):
+    id: int
+
+
+class FailingClient:
+    def __init__(self, error: Exception):
+        self.error = error
+        self.calls = 0
+
+    async def post(self, *args, **kwargs):
+        self.calls += 1
+        raise self.error
+
+
+class CallbackQueueTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, "callbacks.db")
+        self.queue = CallbackQueue(
+            db_path=self.db_path,
+            workers=1,
+            max_attempts=2,
+            backoff_base=0.01,
+            backoff_max=0.01,
+            timeout=1.0,
+            dead_retention=3_600.0,
+            prune_interval=3_600.0
+        )
+        await self.queue.start()
+
+    async def asyncTearDown(self):
+        await self.queue.stop()
+        self.directory.cleanup()
+
+    def _rows(self):
+        with sqlite3.connect(self.db_path) as db:
+            return db.execute("SELECT status, attempts, last_error FROM callbacks").fetchall()
+
+    async def _wait_for(self, condition):
+        for _ in range(200):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+        self.fail("condition was not reached")
+
+    async def test_non_http_error_is_retried_then_marked_dead(self):
+        client = FailingClient(httpx.InvalidURL("bad merchant url"))
+        with mock.patch.object(http_clients, "get", return_value=client):
+            await self.queue.enqueue("not a url", Payload(id=1))
+            await self._wait_for(lambda: self.queue.dead == 1)
+
+        self.assertEqual(client.calls, 2)
+        self.assertEqual(self.queue.retried, 1)
+        self.assertEqual(self.queue.pending, 0)
+        status, attempts, last_error = self._rows()[0]
+        self.assertEqual((status, attempts), (STATUS_DEAD, 2))
+        self.assertIn("InvalidURL", last_error)
+
+    async def test_unexpected_error_is_retried(self):
+        client = FailingClient(ValueError("not serializable"))
+        with mock.patch.object(http_clients, "get", return_value=client):
+            await self.queue.enqueue("http://merchant.local/callback", Payload(id=1))
+            await self._wait_for(lambda: self.queue.dead == 1)
+        self.assertEqual(client.calls, 2)
+
+    async def test_prune_removes_only_expired_dead_rows(self):
+        client = FailingClient(httpx.ConnectError("down"))
+        with mock.patch.object(http_clients, "get", return_value=client):
+            await self.queue.enqueue("http://merchant.local/callback", Payload(id=1))
+            await self._wait_for(lambda: self.queue.dead == 1)
+
+        self.assertEqual(await self.queue.prune(), 0)
+
+        self.queue.dead_retention = 0.0
+        await asyncio.sleep(0.01)
+        self.assertEqual(await self.queue.prune(), 1)
+        self.assertEqual(self._rows(), [])
+        self.assertEqual(self.queue.pruned, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
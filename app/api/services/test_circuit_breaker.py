@@ -0,0 +1,78 @@
+# ТЕСТЫ CIRCUIT BREAKER
+import unittest
+from unittest import mock
+
+from fastapi import HTTPException
+
+from app.api.services import circuit_breaker as breaker_module
+from app.api.services.circuit_breaker import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker
+
+
+def _breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        name="garex/payin/c2c",
+        window_size=10,
+        min_calls=4,
+        failure_rate_threshold=0.5,
+        slow_call_threshold=1.0,
+        open_duration=30.0,
+        half_open_max_calls=1
+    )
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.breaker = _breaker()
+        self.now = 1000.0
+        patcher = mock.patch.object(breaker_module.time, "monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _call(self, success: bool, duration: float = 0.1):
+        self.breaker.acquire()
+        self.breaker.record(success, duration)
+
+    def test_opens_on_failure_rate_and_rejects(self):
+        for success in (True, False, True, False):
+            self._call(success)
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+
+        with self.assertRaises(HTTPException) as error:
+            self.breaker.acquire()
+        self.assertEqual(error.exception.status_code, 503)
+        self.assertEqual(self.breaker.rejected, 1)
+
+    def test_slow_calls_count_as_failures(self):
+        for _ in range(4):
+            self._call(True, duration=2.0)
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+
+    def test_half_open_probe_closes_or_reopens(self):
+        for _ in range(4):
+            self._call(False)
+        self.now += 30.0
+
+        self.breaker.acquire()
+        self.assertEqual(self.breaker.state, STATE_HALF_OPEN)
+        with self.assertRaises(HTTPException):
+            self.breaker.acquire()
+        self.breaker.record(False, 0.1)
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+
+        self.now += 30.0
+        self._call(True)
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+
+    def test_released_probe_frees_the_slot(self):
+        for _ in range(4):
+            self._call(False)
+        self.now += 30.0
+
+        self.breaker.acquire()
+        self.breaker.release()
+        self.breaker.acquire()
+        self.assertEqual(self.breaker.state, STATE_HALF_OPEN)
+
+
+if __name__ == "__main__":
+    unittest.main()
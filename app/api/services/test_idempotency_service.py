@@ -0,0 +1,69 @@
+# ТЕСТЫ СЕРВИСА ИДЕМПОТЕНТНОСТИ СОЗДАНИЯ ТРАНЗАКЦИЙ
+import asyncio
+import unittest
+
+from fastapi import HTTPException
+
+from app.api.services.idempotency_service import IdempotencyService
+from app.models.paygatecore.pay_in_model import PayInRequest
+
+
+def _request(amount: str = "1000") -> PayInRequest:
+    return PayInRequest(amount=amount, currency="RUB", merchant_transaction_id="order-1")
+
+
+class IdempotencyServiceTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.service = IdempotencyService()
+        self.calls = 0
+
+    def _call(self, provider: str = "garex", delay: float = 0):
+        async def call():
+            self.calls += 1
+            await asyncio.sleep(delay)
+            return provider, {"call": self.calls}
+        return call
+
+    async def test_repeated_request_is_replayed(self):
+        first = await self.service.execute("m1", "garex", "pay_in_card", _request(), self._call())
+        second = await self.service.execute("m1", "garex", "pay_in_card", _request(), self._call())
+
+        self.assertIs(second, first)
+        self.assertEqual(self.calls, 1)
+
+    async def test_different_data_is_a_conflict(self):
+        await self.service.execute("m1", "garex", "pay_in_card", _request(), self._call())
+        with self.assertRaises(HTTPException) as error:
+            await self.service.execute("m1", "garex", "pay_in_card", _request("2000"), self._call())
+        self.assertEqual(error.exception.status_code, 422)
+        self.assertEqual(self.calls, 1)
+
+    async def test_auto_replays_but_other_provider_conflicts(self):
+        await self.service.execute("m1", "auto", "pay_in_card", _request(), self._call("garex"))
+
+        replay = await self.service.execute("m1", "garex", "pay_in_card", _request(), self._call())
+        self.assertEqual(replay, {"call": 1})
+        with self.assertRaises(HTTPException) as error:
+            await self.service.execute("m1", "other", "pay_in_card", _request(), self._call("other"))
+        self.assertEqual(error.exception.status_code, 422)
+        self.assertEqual(self.calls, 1)
+
+    async def test_keys_are_scoped_by_merchant_and_method(self):
+        await self.service.execute("m1", "garex", "pay_in_card", _request(), self._call())
+        await self.service.execute("m2", "garex", "pay_in_card", _request(), self._call())
+        await self.service.execute("m1", "garex", "pay_in_sbp", _request(), self._call())
+        self.assertEqual(self.calls, 3)
+
+    async def test_concurrent_duplicates_share_one_call(self):
+        results = await asyncio.gather(*(
+            self.service.execute("m1", "garex", "pay_in_card", _request(), self._call(delay=0.01))
+            for _ in range(3)
+        ))
+
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(self.service.stats()["joined"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
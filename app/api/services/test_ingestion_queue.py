@@ -0,0 +1,69 @@
+# ТЕСТЫ ОЧЕРЕДИ ОБРАБОТКИ ВХОДЯЩИХ СОБЫТИЙ
+import asyncio
+import unittest
+
+from fastapi import HTTPException
+
+from app.api.services.ingestion_queue import IngestionQueue
+
+
+class IngestionQueueTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.queue = IngestionQueue("test", max_depth=1, workers=1, retry_after=5)
+        self.queue.start()
+
+    async def asyncTearDown(self):
+        await self.queue.stop()
+
+    async def test_result_and_error_reach_the_sender(self):
+        async def ok():
+            return "done"
+
+        async def fail():
+            raise ValueError("boom")
+
+        self.assertEqual(await self.queue.submit(ok), "done")
+        with self.assertRaises(ValueError):
+            await self.queue.submit(fail)
+        self.assertEqual(self.queue.processed, 2)
+
+    async def test_full_queue_sheds_with_retry_after(self):
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+
+        running = asyncio.create_task(self.queue.submit(slow))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(self.queue.submit(slow))
+        await asyncio.sleep(0)
+
+        with self.assertRaises(HTTPException) as error:
+            await self.queue.submit(slow)
+        self.assertEqual(error.exception.status_code, 503)
+        self.assertEqual(error.exception.headers, {"Retry-After": "5"})
+        self.assertEqual(self.queue.shed, 1)
+
+        release.set()
+        await asyncio.gather(running, queued)
+
+    async def test_accepted_event_survives_sender_disconnect(self):
+        release = asyncio.Event()
+        handled = []
+
+        async def job():
+            await release.wait()
+            handled.append(True)
+
+        sender = asyncio.create_task(self.queue.submit(job))
+        await asyncio.sleep(0)
+        sender.cancel()
+        release.set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        self.assertEqual(handled, [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+# ТЕСТЫ ПРЕДВАРИТЕЛЬНОЙ ПРОВЕРКИ ЛИМИТОВ
+import unittest
+from unittest import mock
+
+from fastapi import HTTPException
+
+from app.api.services.default_provider_service import ProviderService
+from app.api.services.limits_service import LimitsService
+from app.core.config import settings
+from app.models.paygatecore.other_models import LimitItem, LimitsResponse
+
+
+PROVIDER_LIMITS = LimitsResponse(card=LimitItem(min_amount="500", max_amount="1000"))
+
+
+class LimitsServiceTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.source = ProviderService("garex")
+        self.limits = LimitsService({"garex": (self.source, ["RUB"])})
+
+    async def test_debug_stub_limits_are_not_enforced(self):
+        with mock.patch.object(settings, "debug", True):
+            await self.source.refresh_limits("RUB")
+            self.assertIsNotNone(await self.source.get_limits("RUB"))
+
+            self.limits.check_amount("garex", "card", "RUB", "50")
+
+        self.assertIsNone(self.source.peek_limits("RUB"))
+        self.assertEqual((self.limits.checked, self.limits.skipped), (0, 1))
+
+    async def test_provider_limits_are_enforced(self):
+        fetch = mock.AsyncMock(return_value=PROVIDER_LIMITS)
+        with mock.patch.object(settings, "debug", False), mock.patch.object(self.source, "_fetch_limits", fetch):
+            await self.source.refresh_limits("RUB")
+
+        self.limits.check_amount("garex", "card", "RUB", "700")
+        with self.assertRaises(HTTPException) as error:
+            self.limits.check_amount("garex", "card", "RUB", "50")
+        self.assertEqual(error.exception.status_code, 400)
+        self.assertEqual((self.limits.checked, self.limits.rejected), (2, 1))
+
+    def test_unknown_limits_leave_the_decision_to_provider(self):
+        self.limits.check_amount("garex", "card", "RUB", "50")
+        self.limits.check_amount("other", "card", "RUB", "50")
+        self.assertEqual(self.limits.skipped, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
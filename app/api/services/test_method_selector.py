@@ -0,0 +1,31 @@
+# ТЕСТЫ ВЫБОРА ПОРЯДКА ПЛАТЕЖНЫХ МЕТОДОВ
+import unittest
+
+from app.api.services.method_selector import MethodSelector
+
+
+class MethodSelectorTest(unittest.TestCase):
+    def setUp(self):
+        self.selector = MethodSelector(bands=[1_000, 10_000], alpha=0.5, negative_ttl=60)
+
+    def test_orders_by_success_within_amount_band(self):
+        self.selector.record_failure("a", 500)
+        self.selector.record_success("b", 500)
+        self.assertEqual(self.selector.order(["a", "b"], 500), ["b", "a"])
+        # Другой диапазон суммы - своя статистика
+        self.assertEqual(self.selector.order(["a", "b"], 5_000), ["a", "b"])
+
+    def test_recent_no_offer_is_skipped(self):
+        self.selector.record_no_offer("a", 500)
+        self.assertEqual(self.selector.order(["a", "b"], 500), ["b"])
+        self.assertEqual(self.selector.skipped, 1)
+
+    def test_best_method_is_kept_when_all_were_rejected(self):
+        self.selector.record_no_offer("a", 500)
+        self.selector.record_success("b", 500)
+        self.selector.record_no_offer("b", 500)
+        self.assertEqual(self.selector.order(["a", "b"], 500), ["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+# ТЕСТЫ РЕЕСТРА АДАПТЕРОВ ПРОВАЙДЕРОВ
+import unittest
+
+from app.api.services.provider_registry import ProviderRegistry
+
+
+ADAPTER = "collections:OrderedDict"
+
+
+class ProviderRegistryTest(unittest.TestCase):
+    def test_adapter_is_created_on_first_access(self):
+        registry = ProviderRegistry({"garex": {}}, {"garex": ADAPTER})
+        self.assertEqual(registry.stats(), {"enabled": ["garex"], "loaded": []})
+
+        adapter = registry.get("garex")
+        self.assertIs(registry.get("garex"), adapter)
+        self.assertEqual(registry.stats()["loaded"], ["garex"])
+
+    def test_configured_adapter_and_disabled_providers(self):
+        registry = ProviderRegistry(
+            {
+                "garex": {"adapter": "collections:Counter"},
+                "off": {"enabled": False},
+                "unknown": {}
+            },
+            {"garex": ADAPTER, "off": ADAPTER}
+        )
+        self.assertEqual(registry.names(), ["garex"])
+        self.assertEqual(type(registry.get("garex")).__name__, "Counter")
+        self.assertIsNone(registry.get("off"))
+        self.assertNotIn("unknown", registry)
+
+    def test_registered_adapter_is_used_as_is(self):
+        registry = ProviderRegistry({}, {})
+        adapter = object()
+        registry.register("standin", adapter)
+        self.assertIs(registry.get("standin"), adapter)
+        self.assertEqual(registry.names(), ["standin"])
+
+    def test_load_all_surfaces_configuration_errors(self):
+        registry = ProviderRegistry({"garex": {"adapter": "app.missing_module:Adapter"}}, {})
+        with self.assertRaises(ImportError):
+            registry.load_all()
+
+
+if __name__ == "__main__":
+    unittest.main()
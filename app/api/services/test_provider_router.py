@@ -0,0 +1,94 @@
+# ТЕСТЫ ВЫБОРА ПРОВАЙДЕРА В РЕЖИМЕ AUTO
+import unittest
+
+from fastapi import HTTPException
+
+from app.api.services.provider_router import ProviderRouter
+from app.api.services.provider_services.errors import ProviderError
+from app.core import deadline
+
+
+NO_OFFER = ProviderError(status_code=404, detail={"code": "404", "message": "нет объявления"})
+BANK_NOT_FOUND = HTTPException(status_code=404, detail={"code": "404", "message": "банк не найден"})
+
+
+class StandIn:
+    """Провайдер-заглушка: по очереди отдаёт заданные исходы."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def __call__(self, request):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+class ProviderRouterTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.router = ProviderRouter(alpha=0.5, latency_weight=0.0)
+
+    async def test_provider_no_offer_fails_over_to_next_provider(self):
+        first, second = StandIn(NO_OFFER), StandIn("offer")
+        result = await self.router.route("card", {"garex": first, "other": second}, request=None)
+
+        self.assertEqual(result, ("other", "offer"))
+        self.assertEqual((first.calls, second.calls), (1, 1))
+        self.assertEqual(self.router.failovers, 1)
+        self.assertLess(self.router.score("garex", "card").score, self.router.score("other", "card").score)
+
+    async def test_local_rejection_does_not_fail_over(self):
+        first, second = StandIn(BANK_NOT_FOUND), StandIn("offer")
+        with self.assertRaises(HTTPException) as error:
+            await self.router.route("card", {"garex": first, "other": second}, request=None)
+
+        self.assertIs(error.exception, BANK_NOT_FOUND)
+        self.assertEqual(second.calls, 0)
+
+    async def test_failed_pre_check_skips_provider(self):
+        def check(provider_name: str):
+            if provider_name == "garex":
+                raise HTTPException(status_code=400, detail={"code": "400", "message": "вне лимитов"})
+
+        first, second = StandIn("offer"), StandIn("offer")
+        result = await self.router.route("card", {"garex": first, "other": second}, request=None, check=check)
+
+        self.assertEqual(result, ("other", "offer"))
+        self.assertEqual(first.calls, 0)
+        self.assertEqual((self.router.skipped, self.router.failovers), (1, 0))
+
+    async def test_last_no_offer_is_returned_when_nobody_has_offer(self):
+        with self.assertRaises(ProviderError) as error:
+            await self.router.route("card", {"garex": StandIn(NO_OFFER), "other": StandIn(NO_OFFER)}, request=None)
+        self.assertEqual(error.exception.status_code, 404)
+
+
+class ProviderScoringTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.router = ProviderRouter(alpha=0.5, latency_weight=0.0)
+
+    async def _call(self, outcome):
+        try:
+            await self.router.call("garex", "card", lambda: StandIn(outcome)(None))
+        except HTTPException:
+            pass
+        return self.router.score("garex", "card")
+
+    async def test_merchant_deadline_is_not_scored(self):
+        score = await self._call(deadline.cut_off())
+        self.assertEqual((score.count, score.errors), (0, 0.0))
+
+    async def test_provider_timeout_is_scored_as_failure(self):
+        score = await self._call(ProviderError(status_code=504, detail={"code": "504", "message": "таймаут"}))
+        self.assertEqual((score.count, score.errors), (1, 0.5))
+
+    async def test_local_rejection_is_not_scored(self):
+        score = await self._call(HTTPException(status_code=503, detail={"code": "503", "message": "circuit open"}))
+        self.assertEqual(score.count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
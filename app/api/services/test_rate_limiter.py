@@ -0,0 +1,57 @@
+# ТЕСТЫ ОГРАНИЧЕНИЯ НАГРУЗКИ НА ПРОВАЙДЕРОВ
+import asyncio
+import unittest
+
+from fastapi import HTTPException
+
+from app.api.services.rate_limiter import ProviderLimiter, TokenBucket
+
+
+class TokenBucketTest(unittest.IsolatedAsyncioTestCase):
+    async def test_burst_then_rejects_beyond_max_wait(self):
+        bucket = TokenBucket(rate=1.0, burst=2)
+        self.assertTrue(await bucket.acquire(max_wait=0))
+        self.assertTrue(await bucket.acquire(max_wait=0))
+        self.assertFalse(await bucket.acquire(max_wait=0.5))
+
+    async def test_waits_for_next_token(self):
+        bucket = TokenBucket(rate=100.0, burst=1)
+        await bucket.acquire(max_wait=0)
+        started = asyncio.get_running_loop().time()
+        self.assertTrue(await bucket.acquire(max_wait=1.0))
+        self.assertGreaterEqual(asyncio.get_running_loop().time() - started, 0.005)
+
+
+class ProviderLimiterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrency_limit_rejects_after_max_wait(self):
+        limiter = ProviderLimiter("garex/payin", concurrency=1, rate=1000.0, burst=10, max_wait=0.01)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with self.assertRaises(HTTPException) as error:
+            async with limiter.slot():
+                pass
+        release.set()
+        await holder
+
+        self.assertEqual(error.exception.status_code, 503)
+        self.assertEqual(limiter.rejected_concurrency, 1)
+        self.assertEqual(limiter.stats()["in_use"], 0)
+
+    async def test_rate_limit_rejects_without_waiting(self):
+        limiter = ProviderLimiter("garex/payin", concurrency=10, rate=1.0, burst=1, max_wait=0.01)
+        async with limiter.slot():
+            pass
+        with self.assertRaises(HTTPException):
+            async with limiter.slot():
+                pass
+        self.assertEqual((limiter.acquired, limiter.rejected_rate), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
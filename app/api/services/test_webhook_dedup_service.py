@@ -0,0 +1,71 @@
+# ТЕСТЫ ДЕДУПЛИКАЦИИ ВХОДЯЩИХ ВЕБХУКОВ
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from app.api.services.webhook_dedup_service import WebhookDeduplicator
+
+
+KEY = ("garex", 1, "paid")
+
+
+class WebhookDeduplicatorTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, "dedup.db")
+        self.dedup = self._create()
+        await self.dedup.start()
+
+    async def asyncTearDown(self):
+        await self.dedup.stop()
+        self.directory.cleanup()
+
+    def _create(self, ttl: float = 60.0, prune_interval: float = 3_600.0) -> WebhookDeduplicator:
+        return WebhookDeduplicator(max_size=100, ttl=ttl, db_path=self.db_path, prune_interval=prune_interval)
+
+    def _rows(self) -> int:
+        with sqlite3.connect(self.db_path) as db:
+            return db.execute("SELECT COUNT(*) FROM webhooks_seen").fetchone()[0]
+
+    async def test_duplicates_are_rejected_while_processing_and_after_commit(self):
+        self.assertTrue(self.dedup.claim(KEY))
+        self.assertFalse(self.dedup.claim(KEY))
+        await self.dedup.commit(KEY)
+        self.assertFalse(self.dedup.claim(KEY))
+        self.assertEqual((self.dedup.accepted, self.dedup.duplicates), (1, 2))
+
+    async def test_released_key_can_be_claimed_again(self):
+        self.assertTrue(self.dedup.claim(KEY))
+        self.dedup.release(KEY)
+        self.assertTrue(self.dedup.claim(KEY))
+
+    async def test_committed_keys_survive_restart(self):
+        self.dedup.claim(KEY)
+        await self.dedup.commit(KEY)
+        await self.dedup.stop()
+
+        self.dedup = self._create()
+        await self.dedup.start()
+        self.assertFalse(self.dedup.claim(KEY))
+
+    async def test_expired_rows_are_pruned_periodically(self):
+        await self.dedup.stop()
+        self.dedup = self._create(ttl=0.01, prune_interval=0.01)
+        await self.dedup.start()
+
+        self.dedup.claim(KEY)
+        await self.dedup.commit(KEY)
+        self.assertEqual(self._rows(), 1)
+
+        for _ in range(200):
+            if self.dedup.pruned:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(self.dedup.pruned, 1)
+        self.assertEqual(self._rows(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# ТЕСТЫ ПОСЛЕДОВАТЕЛЬНОЙ ОБРАБОТКИ ВЕБХУКОВ
+import asyncio
+import unittest
+
+from app.api.resources.garex_resources.transaction_resources import transactions_res
+from app.api.services.webhook_sequencer import OUT_OF_ORDER, REPEATED, WebhookSequencer
+
+
+ORDER = ("garex", "order-1")
+
+
+class WebhookSequencerTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.sequencer = WebhookSequencer(transactions_res.STATUS_TRANSITIONS, max_orders=100, ttl=60)
+
+    def _apply(self, *states) -> list:
+        rejections = []
+        for state in states:
+            rejection = self.sequencer.rejection(ORDER, state)
+            if rejection is None:
+                self.sequencer.advance(ORDER, state)
+            rejections.append(rejection)
+        return rejections
+
+    def test_late_cancel_and_dispute_are_accepted(self):
+        rejections = self._apply("paid", "paid", "pending", "finished", "canceled", "dispute")
+        self.assertEqual(rejections, [None, REPEATED, OUT_OF_ORDER, None, None, None])
+        self.assertEqual(self.sequencer.stats()["processed"], 4)
+
+    def test_repeated_and_out_of_order_are_counted_separately(self):
+        self._apply("pending", "pending", "paid", "pending", "created")
+        stats = self.sequencer.stats()
+        self.assertEqual((stats["repeated"], stats["out_of_order"]), (1, 2))
+
+    def test_failed_is_final(self):
+        self.assertEqual(self._apply("failed", "paid"), [None, OUT_OF_ORDER])
+
+    def test_dispute_can_be_resolved(self):
+        self.assertEqual(self._apply("paid", "dispute", "finished"), [None, None, None])
+
+    def test_every_status_has_transitions(self):
+        self.assertEqual(set(transactions_res.STATUS_TRANSITIONS), set(transactions_res.ALL_STATUSES))
+
+    async def test_events_of_one_order_are_serialized(self):
+        active = 0
+        overlaps = 0
+
+        async def handle():
+            nonlocal active, overlaps
+            async with self.sequencer.hold(ORDER):
+                active += 1
+                overlaps += active > 1
+                await asyncio.sleep(0.001)
+                active -= 1
+
+        await asyncio.gather(*(handle() for _ in range(10)))
+        self.assertEqual(overlaps, 0)
+        self.assertEqual(self.sequencer.stats()["active"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+# ДЕДУПЛИКАЦИЯ ВХОДЯЩИХ ВЕБХУКОВ
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+
+# Ключ: (провайдер, id платежа у провайдера, статус)
+WebhookKey = Tuple[str, int, str]
+
+
+class WebhookDeduplicator:
+    def __init__(self, max_size: int, ttl: float, db_path: Optional[str], prune_interval: float):
+        self.ttl = ttl
+        self.db_path = db_path
+        self.prune_interval = prune_interval
+        self._seen = TTLCache(max_size=max_size, ttl=ttl)
+        self._processing: Set[WebhookKey] = set()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="webhook-dedup-db")
+        self._pruner: Optional[asyncio.Task] = None
+        self.duplicates = 0
+        self.accepted = 0
+        self.pruned = 0
+
+
+    async def _db_call(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_executor, func, *args)
+
+
+    def _open_db(self, max_rows: int):
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS webhooks_seen ("
+            "provider TEXT NOT NULL, "
+            "id INTEGER NOT NULL, "
+            "state TEXT NOT NULL, "
+            "seen_at REAL NOT NULL, "
+            "PRIMARY KEY (provider, id, state))"
+        )
+        self._prune_expired(time.time() - self.ttl)
+        return self._db.execute(
+            "SELECT provider, id, state, seen_at FROM webhooks_seen ORDER BY seen_at DESC LIMIT ?",
+            (max_rows,)
+        ).fetchall()
+
+
+    def _insert(self, key: WebhookKey, seen_at: float):
+        self._db.execute(
+            "INSERT OR REPLACE INTO webhooks_seen (provider, id, state, seen_at) VALUES (?, ?, ?, ?)",
+            (*key, seen_at)
+        )
+
+
+    # Удаление ключей старше времени хранения
+    def _prune_expired(self, seen_before: float) -> int:
+        cursor = self._db.execute("DELETE FROM webhooks_seen WHERE seen_at < ?", (seen_before,))
+        return cursor.rowcount
+
+
+    async def prune(self) -> int:
+        if self._db is None:
+            return 0
+        removed = await self._db_call(self._prune_expired, time.time() - self.ttl)
+        self.pruned += removed
+        if removed:
+            logger.info(f"Pruned webhook dedup keys: {removed}")
+        return removed
+
+
+    # Периодическая очистка базы (при старте устаревшие ключи удаляются в _open_db)
+    async def _prune_loop(self):
+        while True:
+            await asyncio.sleep(self.prune_interval)
+            try:
+                await self.prune()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Webhook dedup pruning error: {str(e)}")
+
+
+    # Восстановление индекса из базы (вызывается в lifespan приложения)
+    async def start(self):
+        if not self.db_path:
+            return
+
+        rows = await self._db_call(self._open_db, self._seen.max_size)
+        now = time.time()
+        # От старых к новым, чтобы LRU-порядок совпал с исходным
+        for provider, webhook_id, state, seen_at in reversed(rows):
+            self._seen.set((provider, webhook_id, state), True, ttl=self.ttl - (now - seen_at))
+        if rows:
+            logger.info(f"Restored webhook dedup index: {len(rows)}")
+        self._pruner = asyncio.create_task(self._prune_loop(), name="webhook-dedup-pruner")
+
+
+    async def stop(self):
+        if self._pruner is not None:
+            self._pruner.cancel()
+            await asyncio.gather(self._pruner, return_exceptions=True)
+            self._pruner = None
+
+        if self._db is not None:
+            await self._db_call(self._db.close)
+            self._db = None
+
+
+    # Захват вебхука на обработку; False - дубликат (уже обработан или обрабатывается)
+    def claim(self, key: WebhookKey) -> bool:
+        if key in self._processing or key in self._seen:
+            self.duplicates += 1
+            return False
+        self._processing.add(key)
+        self.accepted += 1
+        return True
+
+
+    # Вебхук обработан - повторные доставки будут отброшены
+    async def commit(self, key: WebhookKey):
+        self._processing.discard(key)
+        self._seen.set(key, True)
+        if self._db is not None:
+            try:
+                await self._db_call(self._insert, key, time.time())
+            except Exception as e:
+                logger.error(f"Error with saving webhook dedup key {key}: {str(e)}")
+
+
+    # Обработка не удалась - повторная доставка провайдером будет обработана
+    def release(self, key: WebhookKey):
+        self._processing.discard(key)
+
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.accepted + self.duplicates
+        return {
+            "size": len(self._seen),
+            "processing": len(self._processing),
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "duplicate_rate": round(self.duplicates / total, 4) if total else 0.0,
+            "pruned": self.pruned,
+            "persistent": self._db is not None
+        }
+
+
+# Создание объекта класса WebhookDeduplicator
+webhook_dedup = WebhookDeduplicator(
+    max_size=settings.webhook_dedup_max_size,
+    ttl=settings.webhook_dedup_ttl,
+    db_path=settings.webhook_dedup_db_path,
+    prune_interval=settings.webhook_dedup_prune_interval
+)
@@ -0,0 +1,73 @@
+# ПОСЛЕДОВАТЕЛЬНАЯ ОБРАБОТКА ВЕБХУКОВ ПО ЗАКАЗУ
+from contextlib import asynccontextmanager
+from typing import Any, Dict, FrozenSet, Hashable, Optional
+
+from app.core.config import settings
+from app.api.resources.garex_resources.transaction_resources import transactions_res
+from app.utils.cache import KeyedLock, TTLCache
+
+
+# Причины отбрасывания события заказа
+REPEATED = "repeated"  # заказ уже в этом статусе
+OUT_OF_ORDER = "out_of_order"  # переход из текущего статуса заказа недопустим
+
+
+class WebhookSequencer:
+    """События одного заказа обрабатываются строго по очереди, разные заказы - параллельно.
+
+    Хранится только последний обработанный статус заказа (LRU с TTL), блокировки
+    создаются на время обработки и удаляются, когда заказ никем не занят.
+    """
+
+    def __init__(self, transitions: Dict[str, FrozenSet[str]], max_orders: int, ttl: float):
+        self.transitions = transitions
+        self._locks = KeyedLock()
+        self._last_state = TTLCache(max_size=max_orders, ttl=ttl)
+        self.processed = 0
+        self.repeated = 0
+        self.out_of_order = 0
+
+
+    # Причина отбрасывания события или None, если событие нужно обработать
+    def rejection(self, order_key: Hashable, state: str) -> Optional[str]:
+        last_state = self._last_state.get(order_key)
+        if last_state is None or state in self.transitions.get(last_state, ()):
+            return None
+        if state == last_state:
+            self.repeated += 1
+            return REPEATED
+        self.out_of_order += 1
+        return OUT_OF_ORDER
+
+
+    @asynccontextmanager
+    async def hold(self, order_key: Hashable):
+        await self._locks.acquire(order_key)
+        try:
+            yield
+        finally:
+            self._locks.release(order_key)
+
+
+    # Фиксация обработанного статуса (вызывается под hold)
+    def advance(self, order_key: Hashable, state: str):
+        self._last_state.set(order_key, state)
+        self.processed += 1
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "orders": len(self._last_state),
+            "active": len(self._locks),
+            "processed": self.processed,
+            "repeated": self.repeated,
+            "out_of_order": self.out_of_order
+        }
+
+
+# Создание объекта класса WebhookSequencer
+webhook_sequencer = WebhookSequencer(
+    transitions=transactions_res.STATUS_TRANSITIONS,
+    max_orders=settings.webhook_sequencer_max_orders,
+    ttl=settings.webhook_sequencer_ttl
+)
@@ -1,5 +1,5 @@
 # КОНФИГУРАЦИЯ
-from typing import Dict, Any
+from typing import Dict, Any, List, Literal, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -10,7 +10,19 @@ class Settings(BaseSettings):
     # Токен мерчанта в нашем API
     merchant_token: str = "test_token"
 
-    # Провайдеры
+    # Мерчанты: id -> {"token_sha256": sha256 токена, "jwt_secret": секрет HS256, ...настройки мерчанта}.
+    # Пусто - единственный мерчант "default" с токеном merchant_token
+    merchants: Dict[str, Dict[str, Any]] = {}
+    jwt_leeway: float = 30.0  # Допустимое расхождение часов при проверке exp/nbf (сек)
+    jwt_cache_ttl: float = 300.0  # Время хранения проверенного JWT без exp (сек)
+    jwt_cache_max_size: int = 100_000  # Максимальное кол-во проверенных JWT в кэше
+
+    # Коды банков провайдера по id банка (выплаты по СБП): дополняют и переопределяют
+    # справочник участников СБП из paygatecore bank_resources
+    bank_ids: Dict[int, str] = {}
+
+    # Провайдеры. Необязательные ключи: "adapter" - путь "модуль:класс" адаптера
+    # (по умолчанию встроенный), "enabled" - false, чтобы не загружать провайдера
     providers: Dict[str, Dict[str, Any]] = {
         "garex": {
             "base_url": f"https://stage.garex.one/default",
@@ -18,16 +30,100 @@ class Settings(BaseSettings):
         }
     }
 
+    providers_preload: bool = True  # Загрузка адаптеров при старте приложения (False - при первом запросе)
+
     debug: bool = True
 
+    # Сериализация ответов напрямую в байты (pydantic-core / orjson, если установлен)
+    fast_json_responses: bool = False
+
     # Настройки вебхуков
     webhook_enabled: bool = True
     webhook_secret_key: str = "test_secret_key_123"
+    webhook_secret_keys: List[str] = []  # Дополнительные активные секреты (ротация)
+    # Проверка подписи вебхуков: json - подпись по URL и разобранному телу (прежняя схема),
+    # raw - по сырому телу, пути и query (включать после перехода провайдера на эту схему)
+    webhook_signature_mode: Literal["raw", "json"] = "json"
     webhook_base_url: str = f"{api_base_url}/api/v1/webhooks/transaction"
 
     # URL приложения для формирования подписи
     base_webhook_url: str = "http://localhost:8000"
 
+    # Пулы HTTP-соединений к внешним сервисам
+    http_timeout: float = 30.0  # Таймаут запроса (сек)
+    http_connect_timeout: float = 5.0  # Таймаут подключения (сек)
+    http_max_connections: int = 100  # Максимальное кол-во соединений на хост
+    http_max_keepalive_connections: int = 20  # Кол-во поддерживаемых keep-alive соединений на хост
+    http_keepalive_expiry: float = 30.0  # Время жизни простаивающего соединения (сек)
+    http2_enabled: bool = False  # HTTP/2 (требуется пакет h2)
+    # Прогрев и проверка доступности провайдера: при старте и далее периодически на base_url
+    # провайдера отправляются HEAD-запросы без авторизации; 0 - без прогрева (и /ready всегда готов)
+    http_warm_connections: int = 4  # Кол-во прогреваемых соединений к провайдеру
+    http_keepalive_ping_interval: float = 20.0  # Интервал пинга, меньше http_keepalive_expiry (сек)
+    dns_cache_ttl: float = 60.0  # Время хранения DNS-ответов (сек)
+
+    # Кэш баланса и лимитов провайдера
+    provider_cache_ttl: float = 30.0  # Время свежести значения (сек)
+    provider_cache_stale_ttl: float = 300.0  # Время, в течение которого отдаётся устаревшее значение (сек)
+    limits_refresh_interval: float = 15.0  # Интервал фонового обновления лимитов (сек)
+
+    # Circuit breaker запросов к провайдерам
+    breaker_window_size: int = 50  # Кол-во последних вызовов для расчёта доли сбоев
+    breaker_min_calls: int = 10  # Минимум вызовов в окне для размыкания
+    breaker_failure_rate: float = 0.5  # Доля сбоев для размыкания
+    breaker_slow_call_threshold: float = 10.0  # Ответ дольше этого считается сбоем (сек)
+    breaker_open_duration: float = 30.0  # Время в разомкнутом состоянии (сек)
+    breaker_half_open_max_calls: int = 1  # Кол-во пробных вызовов в полуоткрытом состоянии
+
+    # Ограничение нагрузки на провайдера по классам методов (payin/payout).
+    # Можно переопределить для провайдера: providers[<name>]["limits"][<класс>]
+    limiter_defaults: Dict[str, Dict[str, float]] = {
+        "payin": {"concurrency": 60, "rate": 50.0, "burst": 100},
+        "payout": {"concurrency": 30, "rate": 20.0, "burst": 40}
+    }
+    limiter_max_wait: float = 2.0  # Максимальное ожидание в очереди лимитера (сек)
+
+    # Порядок перебора методов с фолбэком
+    method_amount_bands: List[int] = [1_000, 5_000, 20_000, 100_000]  # Границы диапазонов суммы
+    method_score_alpha: float = 0.1  # Вес нового наблюдения в оценке успешности
+    method_negative_ttl: float = 30.0  # Время пропуска метода после отказа "нет реквизита" (сек)
+    method_attempt_timeout: float = 15.0  # Максимальное время одной попытки метода (сек)
+    deadline_min_attempt: float = 2.0  # Минимальный остаток срока запроса для фолбэка (сек)
+
+    # Выбор провайдера по оценке (заголовок Provider-data: auto)
+    provider_auto_enabled: bool = True  # Разрешён ли режим auto
+    provider_score_alpha: float = 0.05  # Вес нового наблюдения в показателях провайдера
+    provider_latency_weight: float = 0.1  # Штраф оценки за секунду задержки (среднее p50 и p95)
+
+    # Дедупликация входящих вебхуков
+    webhook_dedup_ttl: float = 86_400.0  # Время хранения ключа обработанного вебхука (сек)
+    webhook_dedup_max_size: int = 500_000  # Максимальное кол-во ключей в памяти
+    webhook_dedup_db_path: Optional[str] = "webhook_dedup.db"  # Файл SQLite (пусто - только в памяти)
+    webhook_dedup_prune_interval: float = 3_600.0  # Интервал удаления устаревших ключей из базы (сек)
+
+    # Последовательная обработка вебхуков по заказу
+    webhook_sequencer_max_orders: int = 500_000  # Кол-во заказов, для которых помним последний статус
+    webhook_sequencer_ttl: float = 86_400.0  # Время хранения последнего статуса заказа (сек)
+
+    # Очередь приёма вебхуков
+    webhook_queue_depth: int = 1000  # Максимум вебхуков в очереди, сверх - 503
+    webhook_workers: int = 32  # Кол-во воркеров обработки вебхуков
+    webhook_retry_after: int = 5  # Заголовок Retry-After при перегрузке (сек)
+
+    # Идемпотентность создания транзакций
+    idempotency_ttl: float = 600.0  # Время хранения ответа (сек), совпадает со сроком оффера
+    idempotency_max_size: int = 100_000  # Максимальное кол-во хранимых ответов
+
+    # Очередь колбэков мерчанту
+    callback_db_path: str = "callbacks.db"  # Файл SQLite с недоставленными колбэками
+    callback_workers: int = 8  # Кол-во воркеров доставки
+    callback_max_attempts: int = 10  # Максимальное кол-во попыток доставки
+    callback_backoff_base: float = 1.0  # Начальная задержка между попытками (сек)
+    callback_backoff_max: float = 300.0  # Максимальная задержка между попытками (сек)
+    callback_timeout: float = 10.0  # Таймаут запроса к мерчанту (сек)
+    callback_dead_retention: float = 7 * 86_400.0  # Время хранения недоставленных (dead) колбэков (сек)
+    callback_prune_interval: float = 3_600.0  # Интервал удаления устаревших dead-колбэков (сек)
+
 
     class Config:
         env_file = "set.env"
@@ -0,0 +1,124 @@
+# БЮДЖЕТ ВРЕМЕНИ ЗАПРОСА МЕРЧАНТА
+import math
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+
+# Заголовки: абсолютный срок (unix-время, сек) и оставшееся время ожидания (мс)
+DEADLINE_HEADER = b"x-request-deadline"
+TIMEOUT_HEADER = b"timeout-ms"
+
+# Срок текущего запроса по time.monotonic() (None - мерчант срок не передал)
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+_counters: Dict[str, int] = {
+    "requests": 0,  # запросы со сроком
+    "invalid": 0,  # некорректные значения заголовков (игнорируются)
+    "expired": 0,  # отказы без обращения к провайдеру: срок уже истёк
+    "cut_off": 0,  # попытки, прерванные по истечении срока
+    "fallbacks_skipped": 0  # фолбэки, пропущенные из-за нехватки времени
+}
+
+
+def _to_float(value: bytes) -> Optional[float]:
+    try:
+        number = float(value)
+    except ValueError:
+        _counters["invalid"] += 1
+        return None
+    if not math.isfinite(number):
+        _counters["invalid"] += 1
+        return None
+    return number
+
+
+# Срок по заголовкам запроса (ASGI scope["headers"]); при обоих заголовках - более ранний
+def from_headers(headers: Iterable[Tuple[bytes, bytes]]) -> Optional[float]:
+    deadline: Optional[float] = None
+    for name, value in headers:
+        if name == TIMEOUT_HEADER:
+            timeout_ms = _to_float(value)
+            candidate = time.monotonic() + timeout_ms / 1000 if timeout_ms is not None else None
+        elif name == DEADLINE_HEADER:
+            timestamp = _to_float(value)
+            candidate = time.monotonic() + (timestamp - time.time()) if timestamp is not None else None
+        else:
+            continue
+        if candidate is not None and (deadline is None or candidate < deadline):
+            deadline = candidate
+    return deadline
+
+
+# Оставшееся время запроса (None - без срока)
+def remaining() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _expired_error() -> HTTPException:
+    return HTTPException(
+        status_code=504,
+        detail={
+            "code": "504",
+            "message": "Истёк срок ожидания запроса"
+        }
+    )
+
+
+# Таймаут попытки: не больше default и не больше остатка срока; срок истёк - 504.
+# Второе значение - таймаут ограничен сроком запроса, а не default
+def attempt_timeout(default: float) -> Tuple[float, bool]:
+    left = remaining()
+    if left is None or left >= default:
+        return default, False
+    if left <= 0:
+        _counters["expired"] += 1
+        raise _expired_error()
+    return left, True
+
+
+# Попытка прервана по истечении срока запроса (провайдер не виноват: срок задал мерчант)
+def cut_off() -> HTTPException:
+    _counters["cut_off"] += 1
+    return _expired_error()
+
+
+# Хватает ли времени на ещё одну попытку (фолбэк)
+def allows_fallback() -> bool:
+    left = remaining()
+    if left is None or left >= settings.deadline_min_attempt:
+        return True
+    _counters["fallbacks_skipped"] += 1
+    return False
+
+
+class DeadlineMiddleware:
+    """ASGI-middleware: срок из заголовков запроса доступен всем обращениям к провайдерам."""
+
+    def __init__(self, app):
+        self.app = app
+
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        deadline = from_headers(scope["headers"])
+        if deadline is None:
+            return await self.app(scope, receive, send)
+
+        _counters["requests"] += 1
+        token = _deadline.set(deadline)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
+
+
+def stats() -> Dict[str, Any]:
+    return dict(_counters)
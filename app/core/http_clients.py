@@ -0,0 +1,256 @@
+# ОБЩИЕ ПУЛЫ HTTP-СОЕДИНЕНИЙ
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.request import getproxies
+
+import httpx
+
+from app.core.config import settings
+from app.utils.cache import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+
+# Проверка наличия поддержки HTTP/2 (пакет h2)
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+class DNSCache:
+    """Кэш DNS-ответов на заданное время. Одновременные промахи по хосту - один запрос к резолверу."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._lookups = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+
+    async def resolve(self, host: str, port: int) -> List[str]:
+        key = (host, port)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        return await self._lookups.do(key, lambda: self._lookup(host, port))
+
+
+    async def _lookup(self, host: str, port: int) -> List[str]:
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except OSError as e:
+            # Ошибка резолва - сетевая ошибка httpx, как и без кэша
+            raise httpx.ConnectError(str(e)) from e
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+
+    def invalidate(self, host: str, port: int):
+        self._cache.pop((host, port), None)
+
+
+class CachingDNSTransport(httpx.AsyncHTTPTransport):
+    """Стандартный транспорт httpx, подключающийся к адресам из кэша DNS.
+
+    Имя хоста остаётся в заголовке Host и в SNI - сертификат проверяется по имени.
+    Пул клиента обслуживает один хост (см. HttpClientRegistry), поэтому соединения
+    к одному адресу с разными именами не смешиваются.
+    """
+
+    def __init__(self, dns: DNSCache, **kwargs):
+        super().__init__(**kwargs)
+        self.dns = dns
+
+
+    # Тот же запрос, направленный на адрес из кэша
+    @staticmethod
+    def _pinned(request: httpx.Request, address: str) -> httpx.Request:
+        return httpx.Request(
+            request.method,
+            request.url.copy_with(host=address),
+            headers=request.headers,
+            stream=request.stream,
+            extensions={**request.extensions, "sni_hostname": request.url.host}
+        )
+
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if _is_ip(host):
+            return await super().handle_async_request(request)
+
+        port = request.url.port or (443 if request.url.scheme == "https" else 80)
+        addresses = await self.dns.resolve(host, port)
+        last_error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await super().handle_async_request(self._pinned(request, address))
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                last_error = e
+
+        # Адреса из кэша недоступны - при следующей попытке резолвим заново
+        self.dns.invalidate(host, port)
+        raise last_error
+
+
+# Прокси из переменных окружения (HTTP_PROXY, HTTPS_PROXY, ALL_PROXY)
+def _env_proxy_configured() -> bool:
+    proxies = getproxies()
+    return any(proxies.get(scheme) for scheme in ("http", "https", "all"))
+
+
+class HttpClientRegistry:
+    """Один keep-alive пул на каждый внешний хост. Закрывается в lifespan приложения."""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self.http2 = settings.http2_enabled and _http2_available()
+        if settings.http2_enabled and not self.http2:
+            logger.warning("HTTP/2 requested but package h2 is not installed, using HTTP/1.1")
+
+        self.dns = DNSCache(ttl=settings.dns_cache_ttl)
+
+        # Прогрев: origin -> состояние пула
+        self._warm_tasks: Dict[str, asyncio.Task] = {}
+        self._warm: Dict[str, bool] = {}
+
+
+    # Ключ пула: схема + хост + порт
+    @staticmethod
+    def _origin(url: str) -> str:
+        parsed = httpx.URL(url)
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        return f"{parsed.scheme}://{parsed.host}:{port}"
+
+
+    # С прокси из окружения - стандартный клиент httpx: имена резолвит прокси, кэш DNS
+    # не используется (в том числе для хостов из NO_PROXY)
+    def _create_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry
+        )
+        timeout = httpx.Timeout(settings.http_timeout, connect=settings.http_connect_timeout)
+        if _env_proxy_configured():
+            return httpx.AsyncClient(timeout=timeout, limits=limits, http2=self.http2)
+        return httpx.AsyncClient(
+            timeout=timeout,
+            transport=CachingDNSTransport(self.dns, limits=limits, http2=self.http2)
+        )
+
+
+    # Получение клиента для хоста (создаётся при первом обращении)
+    def get(self, url: str) -> httpx.AsyncClient:
+        origin = self._origin(url)
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = self._create_client()
+            self._clients[origin] = client
+        return client
+
+
+    # Параллельные лёгкие запросы держат открытыми сразу несколько соединений
+    async def _ping(self, url: str, connections: int) -> int:
+        client = self.get(url)
+        results = await asyncio.gather(
+            *(client.head(url, timeout=settings.http_connect_timeout) for _ in range(connections)),
+            return_exceptions=True
+        )
+        return sum(1 for result in results if isinstance(result, httpx.Response))
+
+
+    async def _keep_warm(self, origin: str, url: str):
+        connections = settings.http_warm_connections
+        while True:
+            try:
+                opened = await self._ping(url, connections)
+            except Exception as e:
+                logger.error(f"Error with warming connections to {origin}: {str(e)}")
+                opened = 0
+
+            # Состояние по последнему пингу: хост, переставший отвечать, снимает готовность
+            warm = opened > 0
+            if warm and not self._warm[origin]:
+                logger.info(f"Connection pool is warm: {origin} ({opened}/{connections})")
+            elif not warm and self._warm[origin]:
+                logger.warning(f"Connection pool lost: {origin} does not respond")
+            self._warm[origin] = warm
+
+            # Пинг чаще, чем истекает keep-alive, чтобы пул не опустошался
+            interval = settings.http_keepalive_ping_interval if self._warm[origin] else settings.http_connect_timeout
+            await asyncio.sleep(interval)
+
+
+    # Запуск прогрева пулов (вызывается в lifespan приложения)
+    def start_warming(self, urls: Iterable[str]):
+        if settings.http_warm_connections <= 0:
+            return
+
+        for url in urls:
+            origin = self._origin(url)
+            if origin in self._warm_tasks:
+                continue
+            self._warm[origin] = False
+            self._warm_tasks[origin] = asyncio.create_task(
+                self._keep_warm(origin, url), name=f"warm-{origin}"
+            )
+
+
+    # Готовность: при последнем пинге каждый прогреваемый хост ответил хотя бы на одно соединение
+    @property
+    def ready(self) -> bool:
+        return all(self._warm.values())
+
+
+    # Закрытие всех пулов при остановке приложения
+    async def close(self):
+        tasks = list(self._warm_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._warm_tasks.clear()
+        self._warm.clear()
+
+        clients = list(self._clients.items())
+        self._clients.clear()
+        for origin, client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"Error with closing HTTP client {origin}: {str(e)}")
+
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "pools": sorted(self._clients),
+            "warm": dict(self._warm),
+            "dns_cache_hits": self.dns.hits,
+            "dns_cache_misses": self.dns.misses
+        }
+
+
+# Создание объекта класса HttpClientRegistry
+http_clients = HttpClientRegistry()
@@ -1,32 +1,71 @@
 # ОСНОВНОЕ ПРИЛОЖЕНИЕ
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import status as http_status
-from fastapi.responses import JSONResponse
 from typing import Dict, List, Optional, Any
 from fastapi.exceptions import RequestValidationError
-from fastapi import FastAPI, HTTPException, Request, Depends, Header
-
-from app.api.security.auth import security
-from app.api.resources.providers_resources import providers_res
-from app.models.paygatecore.pay_in_model import PayInRequest
-from app.models.paygatecore.pay_in_bank_model import PayInBankRequest
+from fastapi import FastAPI, HTTPException, Request
+
+from app.core.config import settings
+from app.api.services.idempotency_service import idempotency_service
+from app.api.services.callback_service import callback_queue
+from app.api.services.default_provider_service import provider_service
+from app.api.services.limits_service import limits_service
+from app.api.services.circuit_breaker import circuit_breakers
+from app.api.services.method_selector import method_selector
+from app.api.services.provider_router import provider_router
+from app.api.services.provider_registry import provider_registry
+from app.api.services.rate_limiter import provider_limiters
+from app.api.services.webhook_dedup_service import webhook_dedup
+from app.api.services.webhook_sequencer import webhook_sequencer
+from app.api.services.ingestion_queue import webhook_queue
+from app.api.security.merchants import merchant_registry
+from app.core.http_clients import http_clients
+from app.core.responses import ResponseClass, StaticJSON
+from app.core import deadline, routes
 from app.api.services.provider_services.garex_service.webhook_router import router as webhook_router
-from app.models.paygatecore.pay_out_model import PayOutRequest, PayOutRequest2
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Запуск и остановка фоновых сервисов
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await callback_queue.start()
+    await webhook_dedup.start()
+    webhook_queue.start()
+    if settings.providers_preload:
+        provider_registry.load_all()
+    http_clients.start_warming(settings.providers[name]["base_url"] for name in provider_registry.names())
+    limits_service.start()
+    try:
+        yield
+    finally:
+        await limits_service.stop()
+        await webhook_queue.stop()
+        await callback_queue.stop()
+        await webhook_dedup.stop()
+        await http_clients.close()
+
+
 app = FastAPI(
     title="Payment API Gateway",
     description="Сервис трансляции API между нашей системой и провайдером",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan,
+    default_response_class=ResponseClass
 )
 
 
+# Срок запроса мерчанта (X-Request-Deadline / timeout-ms) для обращений к провайдерам
+app.add_middleware(deadline.DeadlineMiddleware)
+
+
 # Подключение роутеров
+app.include_router(routes.build_transaction_router())
 app.include_router(webhook_router, prefix="/api/v1/webhooks", tags=["webhooks"])
 
 
@@ -46,6 +85,12 @@ def _create_error_response(code: str,
     return error_response
 
 
+# Статические тела ответов, закодированные один раз
+INTERNAL_ERROR = StaticJSON(_create_error_response(code="500", message="Внутренняя ошибка сервера"))
+READY = StaticJSON({"status": "ready"})
+NOT_READY = StaticJSON({"status": "not ready"})
+
+
 # Обработчик HTTP исключений
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
@@ -60,9 +105,10 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         if isinstance(exc.detail, dict) and "code" in exc.detail:
             error_detail = exc.detail
 
-        return JSONResponse(
+        return ResponseClass(
             status_code=exc.status_code,
-            content=error_detail
+            content=error_detail,
+            headers=exc.headers
         )
     else:
         if isinstance(exc.detail, dict) and "code" in exc.detail:
@@ -75,9 +121,10 @@ async def http_exception_handler(request: Request, exc: HTTPException):
                 message=str(exc.detail)
             )
 
-        return JSONResponse(
+        return ResponseClass(
             status_code=exc.status_code,
-            content=error_detail
+            content=error_detail,
+            headers=exc.headers
         )
 
 
@@ -107,7 +154,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     if total_errors == 1:
         first_field = next(iter(errors))
         first_error = errors[first_field][0]
-        return JSONResponse(
+        return ResponseClass(
             status_code=http_status.HTTP_422_UNPROCESSABLE_ENTITY,
             content=_create_error_response(
                 code="422",
@@ -116,7 +163,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         )
     # Множественные ошибки - показываем code, message и errors
     else:
-        return JSONResponse(
+        return ResponseClass(
             status_code=http_status.HTTP_422_UNPROCESSABLE_ENTITY,
             content=_create_error_response(
                 code="422",
@@ -130,19 +177,45 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unexpected error: {str(exc)}")
-    return JSONResponse(
-        status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content=_create_error_response(
-            code="500",
-            message="Внутренняя ошибка сервера"
-        )
-    )
+    return INTERNAL_ERROR.response(status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 # Эндпоинт проверки здоровья приложения
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "degraded" if circuit_breakers.any_open else "healthy",
+        "circuit_breakers": circuit_breakers.stats()
+    }
+
+
+# Эндпоинт готовности (провайдеры отвечали на последний пинг прогрева)
+@app.get("/ready")
+async def readiness_check():
+    if not http_clients.ready:
+        return NOT_READY.response(status_code=http_status.HTTP_503_SERVICE_UNAVAILABLE)
+    return READY.response()
+
+
+# Эндпоинт метрик внутренних сервисов
+@app.get("/metrics")
+async def metrics():
+    return {
+        "idempotency": idempotency_service.stats(),
+        "callbacks": callback_queue.stats(),
+        "http": http_clients.stats(),
+        "provider_cache": provider_service.stats(),
+        "limits": limits_service.stats(),
+        "methods": method_selector.stats(),
+        "providers": {**provider_registry.stats(), **provider_router.stats()},
+        "limiters": provider_limiters.stats(),
+        "routes": routes.stats(),
+        "deadlines": deadline.stats(),
+        "webhook_dedup": webhook_dedup.stats(),
+        "webhook_sequencer": webhook_sequencer.stats(),
+        "webhook_queue": webhook_queue.stats(),
+        "auth": merchant_registry.stats()
+    }
 
 
 # Домашняя страница API
@@ -151,336 +224,6 @@ async def root():
     return {"message": "Payment API Gateway is running"}
 
 
-# PayIn | Карта
-@app.post("/api/v1/transactions/card", tags=["payin"])
-async def pay_in_card(
-        request: PayInRequest,
-        provider_name: str = Header(..., alias="Provider-data"),
-        token: str = Depends(security)
-):
-    try:
-        logger.info(f"Creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: card")
-
-        try:
-            provider = providers_res.PROVIDERS[provider_name]
-        except KeyError:
-            raise HTTPException(
-                status_code=404,
-                detail="Провайдер не найден в системе"
-            )
-
-        pay_in_provider = await provider.pay_in_card(request)
-        return pay_in_provider
-
-    except HTTPException as e:
-        logger.info(f"Error with creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: card")
-        raise HTTPException(
-            status_code=e.status_code,
-            detail=e.detail
-        )
-
-
-# PayIn | Карта (внутрибанк)
-@app.post("/api/v1/transactions/internal-card", tags=["payin"])
-async def pay_in_internal_card(
-        request: PayInBankRequest,
-        provider_name: str = Header(..., alias="Provider-data"),
-        token: str = Depends(security)
-):
-    try:
-        logger.info(f"Creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: internal-card")
-
-        try:
-            provider = providers_res.PROVIDERS[provider_name]
-        except KeyError:
-            raise HTTPException(
-                status_code=404,
-                detail="Провайдер не найден в системе"
-            )
-
-        pay_in_provider = await provider.pay_in_internal_card(request)
-        return pay_in_provider
-
-    except HTTPException as e:
-        logger.info(f"Error with creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: internal-card")
-        raise HTTPException(
-            status_code=e.status_code,
-            detail=e.detail
-        )
-
-
-# PayIn | Карта (трансгран)
-@app.post("/api/v1/transactions/transgran-card", tags=["payin"])
-async def pay_in_transgran_card(
-        request: PayInRequest,
-        provider_name: str = Header(..., alias="Provider-data"),
-        token: str = Depends(security)
-):
-    try:
-        logger.info(f"Creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: transgran-card")
-
-        try:
-            provider = providers_res.PROVIDERS[provider_name]
-        except KeyError:
-            raise HTTPException(
-                status_code=404,
-                detail="Провайдер не найден в системе"
-            )
-
-        pay_in_provider = await provider.pay_in_transgran_card(request)
-        return pay_in_provider
-
-    except HTTPException as e:
-        logger.info(f"Error with creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: transgran-card")
-        raise HTTPException(
-            status_code=e.status_code,
-            detail=e.detail
-        )
-
-
-# PayIn | СБП
-@app.post("/api/v1/transactions/sbp", tags=["payin"])
-async def pay_in_sbp(
-        request: PayInRequest,
-        provider_name: str = Header(..., alias="Provider-data"),
-        token: str = Depends(security)
-):
-    try:
-        logger.info(f"Creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: sbp")
-
-        try:
-            provider = providers_res.PROVIDERS[provider_name]
-        except KeyError:
-            raise HTTPException(
-                status_code=404,
-                detail="Провайдер не найден в системе"
-            )
-
-        pay_in_provider = await provider.pay_in_sbp(request)
-        return pay_in_provider
-
-    except HTTPException as e:
-        logger.info(f"Error with creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: sbp")
-        raise HTTPException(
-            status_code=e.status_code,
-            detail=e.detail
-        )
-
-
-# PayIn | СБП (внутрибанк)
-@app.post("/api/v1/transactions/internal-sbp", tags=["payin"])
-async def pay_in_internal_sbp(
-        request: PayInBankRequest,
-        provider_name: str = Header(..., alias="Provider-data"),
-        token: str = Depends(security)
-):
-    try:
-        logger.info(f"Creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: internal-sbp")
-
-        try:
-            provider = providers_res.PROVIDERS[provider_name]
-        except KeyError:
-            raise HTTPException(
-                status_code=404,
-                detail="Провайдер не найден в системе"
-            )
-
-        pay_in_provider = await provider.pay_in_internal_sbp(request)
-        return pay_in_provider
-
-    except HTTPException as e:
-        logger.info(f"Error with creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: internal-sbp")
-        raise HTTPException(
-            status_code=e.status_code,
-            detail=e.detail
-        )
-
-
-# PayIn | СБП (трансгран)
-@app.post("/api/v1/transactions/transgran-sbp", tags=["payin"])
-async def pay_in_transgran_sbp(
-        request: PayInRequest,
-        provider_name: str = Header(..., alias="Provider-data"),
-        token: str = Depends(security)
-):
-    try:
-        logger.info(f"Creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: transgran-sbp")
-
-        try:
-            provider = providers_res.PROVIDERS[provider_name]
-        except KeyError:
-            raise HTTPException(
-                status_code=404,
-                detail="Провайдер не найден в системе"
-            )
-
-        pay_in_provider = await provider.pay_in_transgran_sbp(request)
-        return pay_in_provider
-
-    except HTTPException as e:
-        logger.info(f"Error with creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: transgran-sbp")
-        raise HTTPException(
-            status_code=e.status_code,
-            detail=e.detail
-        )
-
-
-# PayIn | QR НСПК
-@app.post("/api/v1/transactions/qr", tags=["payin"])
-async def pay_in_qr(
-        request: PayInRequest,
-        provider_name: str = Header(..., alias="Provider-data"),
-        token: str = Depends(security)
-):
-    try:
-        logger.info(f"Creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: qr")
-
-        try:
-            provider = providers_res.PROVIDERS[provider_name]
-        except KeyError:
-            raise HTTPException(
-                status_code=404,
-                detail="Провайдер не найден в системе"
-            )
-
-        pay_in_provider = await provider.pay_in_qr(request)
-        return pay_in_provider
-
-    except HTTPException as e:
-        logger.info(f"Error with creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: qr")
-        raise HTTPException(
-            status_code=e.status_code,
-            detail=e.detail
-        )
-
-
-# PayIn | СИМ-карта
-@app.post("/api/v1/transactions/sim", tags=["payin"])
-async def pay_in_sim(
-        request: PayInRequest,
-        provider_name: str = Header(..., alias="Provider-data"),
-        token: str = Depends(security)
-):
-    try:
-        logger.info(f"Creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: sim")
-
-        try:
-            provider = providers_res.PROVIDERS[provider_name]
-        except KeyError:
-            raise HTTPException(
-                status_code=404,
-                detail="Провайдер не найден в системе"
-            )
-
-        pay_in_provider = await provider.pay_in_sim(request)
-        return pay_in_provider
-
-    except HTTPException as e:
-        logger.info(f"Error with creating transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: sim")
-        raise HTTPException(
-            status_code=e.status_code,
-            detail=e.detail
-        )
-
-
-# PayOut | Карта
-@app.post("/api/v1/transactions/payout-card", tags=["payout"])
-async def pay_out_card(
-        request: PayOutRequest,
-        provider_name: str = Header(..., alias="Provider-data"),
-        token: str = Depends(security)
-):
-    try:
-        logger.info(f"Creating out transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: card")
-
-        try:
-            provider = providers_res.PROVIDERS[provider_name]
-        except KeyError:
-            raise HTTPException(
-                status_code=404,
-                detail="Провайдер не найден в системе"
-            )
-
-        pay_in_provider = await provider.pay_out_card(request)
-        return pay_in_provider
-
-    except HTTPException as e:
-        logger.info(f"Error with creating out transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: card")
-        raise HTTPException(
-            status_code=e.status_code,
-            detail=e.detail
-        )
-
-
-# PayOut | СБП
-@app.post("/api/v1/transactions/payout-sbp", tags=["payout"])
-async def pay_out_sbp(
-        request: PayOutRequest2,
-        provider_name: str = Header(..., alias="Provider-data"),
-        token: str = Depends(security)
-):
-    try:
-        logger.info(f"Creating out transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: sbp")
-
-        try:
-            provider = providers_res.PROVIDERS[provider_name]
-        except KeyError:
-            raise HTTPException(
-                status_code=404,
-                detail="Провайдер не найден в системе"
-            )
-
-        pay_in_provider = await provider.pay_out_sbp(request)
-        return pay_in_provider
-
-    except HTTPException as e:
-        logger.info(f"Error with creating out transaction: "
-                    f"{request.merchant_transaction_id} on provider: {provider_name} "
-                    f"via method: sbp")
-        raise HTTPException(
-            status_code=e.status_code,
-            detail=e.detail
-        )
-
-
 # Запуск приложения
 if __name__ == "__main__":
     import uvicorn
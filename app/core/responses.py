@@ -0,0 +1,54 @@
+# БЫСТРАЯ СЕРИАЛИЗАЦИЯ JSON-ОТВЕТОВ
+from typing import Any, Mapping, Optional
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # Необязательная зависимость
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """Модели сериализуются pydantic-core сразу в байты, остальное - orjson (если установлен).
+
+    Модель, возвращённая эндпоинтом внутри этого ответа, не проходит повторную
+    валидацию и jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
+
+
+class StaticJSON:
+    """Тело ответа, закодированное один раз при импорте."""
+
+    def __init__(self, content: Any):
+        self.content = content
+        self.body = FastJSONResponse(content).body
+
+    def response(self, status_code: int = 200, headers: Optional[Mapping[str, str]] = None) -> Response:
+        return Response(
+            content=self.body,
+            status_code=status_code,
+            headers=headers,
+            media_type="application/json"
+        )
+
+
+# Класс ответа по умолчанию для приложения и обработчиков ошибок
+ResponseClass = FastJSONResponse if settings.fast_json_responses else JSONResponse
+
+
+# Ответ эндпоинта: в быстром режиме модель сериализуется напрямую, иначе - как обычно в FastAPI
+def model_response(model: Any) -> Any:
+    if settings.fast_json_responses:
+        return FastJSONResponse(model)
+    return model
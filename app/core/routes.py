@@ -0,0 +1,168 @@
+# РЕЕСТР ЭНДПОИНТОВ ТРАНЗАКЦИЙ
+import logging
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Type, TypeVar
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+from app.api.security.auth import security
+from app.api.resources.providers_resources import providers_res
+from app.api.services.provider_registry import provider_registry
+from app.api.services.idempotency_service import idempotency_service
+from app.api.services.limits_service import limits_service
+from app.api.services.provider_router import provider_router
+from app.core.config import settings
+from app.core.responses import model_response
+from app.models.paygatecore.pay_in_model import PayInRequest
+from app.models.paygatecore.pay_in_bank_model import PayInBankRequest
+from app.models.paygatecore.pay_out_model import PayOutRequest, PayOutRequest2
+from app.utils.metrics import LatencyRecorder
+
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class TransactionRoute(NamedTuple):
+    path: str  # Путь эндпоинта
+    request_model: Type[BaseModel]  # Модель тела запроса
+    provider_method: str  # Метод сервиса провайдера
+    tag: str  # Тег OpenAPI (payin/payout)
+    method: str  # Название метода оплаты (логи, идемпотентность, метрики)
+    limit_kind: Optional[str] = None  # Вид лимитов для предварительной проверки суммы
+
+
+# Новый метод оплаты - одна строка в этой таблице
+TRANSACTION_ROUTES: List[TransactionRoute] = [
+    TransactionRoute("/api/v1/transactions/card", PayInRequest, "pay_in_card", "payin", "card", "card"),
+    TransactionRoute("/api/v1/transactions/internal-card", PayInBankRequest, "pay_in_internal_card", "payin", "internal-card", "card"),
+    TransactionRoute("/api/v1/transactions/transgran-card", PayInRequest, "pay_in_transgran_card", "payin", "transgran-card", "card"),
+    TransactionRoute("/api/v1/transactions/sbp", PayInRequest, "pay_in_sbp", "payin", "sbp", "sbp"),
+    TransactionRoute("/api/v1/transactions/internal-sbp", PayInBankRequest, "pay_in_internal_sbp", "payin", "internal-sbp", "sbp"),
+    TransactionRoute("/api/v1/transactions/transgran-sbp", PayInRequest, "pay_in_transgran_sbp", "payin", "transgran-sbp", "sbp"),
+    TransactionRoute("/api/v1/transactions/qr", PayInRequest, "pay_in_qr", "payin", "qr", "qr"),
+    TransactionRoute("/api/v1/transactions/sim", PayInRequest, "pay_in_sim", "payin", "sim", "sim"),
+    TransactionRoute("/api/v1/transactions/payout-card", PayOutRequest, "pay_out_card", "payout", "payout-card"),
+    TransactionRoute("/api/v1/transactions/payout-sbp", PayOutRequest2, "pay_out_sbp", "payout", "payout-sbp"),
+]
+
+
+# Задержка обработки по эндпоинтам
+route_latency: Dict[str, LatencyRecorder] = {}
+
+
+def _provider_not_found():
+    raise HTTPException(
+        status_code=404,
+        detail="Провайдер не найден в системе"
+    )
+
+
+# Тело запроса -> модель за один проход; ошибки в формате валидации FastAPI
+def decode_body(model: Type[ModelT], body: bytes) -> ModelT:
+    if not body:
+        raise RequestValidationError([{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}])
+    try:
+        return model.model_validate_json(body)
+    except ValidationError as e:
+        errors = []
+        for error in e.errors(include_url=False):
+            error["loc"] = ("body", *error["loc"])
+            if error["type"] == "json_invalid":
+                error["msg"] = "JSON decode error"
+            errors.append(error)
+        raise RequestValidationError(errors)
+
+
+def _build_endpoint(route: TransactionRoute) -> Callable:
+    provider_method = route.provider_method
+
+    # Провайдер -> связанный метод; адаптер загружается реестром при первом обращении
+    # (провайдеры без такого метода в выборе не участвуют)
+    def get_handler(provider_name: str) -> Optional[Callable]:
+        provider = provider_registry.get(provider_name)
+        return getattr(provider, provider_method, None) if provider is not None else None
+
+    # Все включённые провайдеры с этим методом (режим auto) - по текущему составу реестра
+    def get_auto_handlers() -> Dict[str, Callable]:
+        auto_handlers: Dict[str, Callable] = {}
+        for provider_name in provider_registry.names():
+            handler = get_handler(provider_name)
+            if handler is not None:
+                auto_handlers[provider_name] = handler
+        return auto_handlers
+
+    latency = route_latency.setdefault(route.method, LatencyRecorder())
+    method = route.method
+    limit_kind = route.limit_kind
+    request_model = route.request_model
+
+    # Предварительная проверка суммы по лимитам провайдера
+    def check_limits(provider_name: str, request: BaseModel):
+        if limit_kind is not None:
+            limits_service.check_amount(provider_name, limit_kind, request.currency, request.amount)
+
+    async def endpoint(
+            raw_request: Request,
+            provider_name: str = Header(..., alias="Provider-data"),
+            merchant_id: str = Depends(security)
+    ) -> Any:
+        started = time.perf_counter()
+        request = decode_body(request_model, await raw_request.body())
+        logger.info("Creating transaction: %s on provider: %s via method: %s",
+                    request.merchant_transaction_id, provider_name, method)
+        try:
+            if provider_name == providers_res.AUTO and settings.provider_auto_enabled:
+                call = lambda: provider_router.route(
+                    method, get_auto_handlers(), request,
+                    lambda candidate: check_limits(candidate, request)
+                )
+            else:
+                handler = get_handler(provider_name)
+                if handler is None:
+                    _provider_not_found()
+                check_limits(provider_name, request)
+
+                async def call():
+                    return provider_name, await provider_router.call(provider_name, method, lambda: handler(request))
+
+            response = await idempotency_service.execute(merchant_id, provider_name, method, request, call)
+
+        except Exception:
+            latency.record(time.perf_counter() - started, error=True)
+            logger.info("Error with creating transaction: %s on provider: %s via method: %s",
+                        request.merchant_transaction_id, provider_name, method)
+            raise
+
+        latency.record(time.perf_counter() - started)
+        return model_response(response)
+
+    endpoint.__name__ = route.provider_method
+    return endpoint
+
+
+# Сборка роутера транзакций по таблице TRANSACTION_ROUTES
+def build_transaction_router() -> APIRouter:
+    router = APIRouter()
+    for route in TRANSACTION_ROUTES:
+        router.add_api_route(
+            route.path,
+            _build_endpoint(route),
+            methods=["POST"],
+            tags=[route.tag],
+            name=route.provider_method,
+            openapi_extra={
+                "requestBody": {
+                    "required": True,
+                    "content": {"application/json": {"schema": route.request_model.model_json_schema()}}
+                }
+            }
+        )
+    return router
+
+
+def stats() -> Dict[str, Any]:
+    return {method: recorder.stats() for method, recorder in route_latency.items()}
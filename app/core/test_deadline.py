@@ -0,0 +1,69 @@
+# ТЕСТЫ БЮДЖЕТА ВРЕМЕНИ ЗАПРОСА МЕРЧАНТА
+import time
+import unittest
+from unittest import mock
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.core import deadline
+from app.core.config import settings
+
+
+class DeadlineTest(unittest.TestCase):
+    def _set(self, seconds: float):
+        token = deadline._deadline.set(time.monotonic() + seconds)
+        self.addCleanup(deadline._deadline.reset, token)
+
+    def test_headers_earliest_deadline_wins(self):
+        now = time.monotonic()
+        found = deadline.from_headers([
+            (b"timeout-ms", b"5000"),
+            (b"x-request-deadline", str(time.time() + 2).encode("ascii")),
+        ])
+        self.assertAlmostEqual(found - now, 2, delta=0.1)
+
+    def test_invalid_headers_are_ignored(self):
+        self.assertIsNone(deadline.from_headers([(b"timeout-ms", b"abc"), (b"timeout-ms", b"inf")]))
+
+    def test_attempt_timeout_without_deadline(self):
+        self.assertEqual(deadline.attempt_timeout(15.0), (15.0, False))
+
+    def test_attempt_timeout_bound_by_deadline(self):
+        self._set(1.0)
+        timeout, by_deadline = deadline.attempt_timeout(15.0)
+        self.assertTrue(by_deadline)
+        self.assertLessEqual(timeout, 1.0)
+        self.assertEqual(deadline.attempt_timeout(0.5), (0.5, False))
+
+    def test_expired_deadline_rejects_attempt(self):
+        self._set(-1.0)
+        with self.assertRaises(HTTPException) as error:
+            deadline.attempt_timeout(15.0)
+        self.assertEqual(error.exception.status_code, 504)
+
+    def test_fallback_needs_minimum_attempt_time(self):
+        self._set(1.0)
+        with mock.patch.object(settings, "deadline_min_attempt", 2.0):
+            self.assertFalse(deadline.allows_fallback())
+        with mock.patch.object(settings, "deadline_min_attempt", 0.5):
+            self.assertTrue(deadline.allows_fallback())
+
+
+class DeadlineMiddlewareTest(unittest.TestCase):
+    def test_deadline_is_visible_inside_request_only(self):
+        app = FastAPI()
+        app.add_middleware(deadline.DeadlineMiddleware)
+
+        @app.get("/remaining")
+        async def remaining():
+            return {"remaining": deadline.remaining()}
+
+        client = TestClient(app)
+        self.assertLessEqual(client.get("/remaining", headers={"timeout-ms": "3000"}).json()["remaining"], 3.0)
+        self.assertIsNone(client.get("/remaining").json()["remaining"])
+        self.assertIsNone(deadline.remaining())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# ТЕСТЫ ПУЛОВ HTTP-СОЕДИНЕНИЙ
+import asyncio
+import os
+import socket
+import unittest
+
+from unittest import mock
+
+import httpx
+
+from app.core.config import settings
+from app.core.http_clients import HttpClientRegistry
+
+
+# Отвечает строкой запроса и заголовком Host
+async def _serve_ok(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("ascii").split("\r\n")
+    host = next(line for line in lines if line.lower().startswith("host:"))
+    body = f"{lines[0]}|{host}".encode("ascii")
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body))
+    await writer.drain()
+    writer.close()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class CachingDNSTransportTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.registry = HttpClientRegistry()
+        patcher = mock.patch.dict(os.environ, {"HTTP_PROXY": "", "HTTPS_PROXY": "", "ALL_PROXY": "",
+                                               "http_proxy": "", "https_proxy": "", "all_proxy": ""})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.registry.close()
+
+    async def test_requests_go_through_caching_dns_backend(self):
+        server = await asyncio.start_server(_serve_ok, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            url = f"http://localhost:{port}/"
+            first = await self.registry.get(url).get(url)
+            second = await self.registry.get(url).get(url)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.text, f"GET / HTTP/1.1|Host: localhost:{port}")
+        self.assertEqual(first.request.url, url)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(self.registry.dns.misses, 1)
+        self.assertEqual(self.registry.dns.hits, 1)
+
+    async def test_connection_errors_are_mapped_to_httpx(self):
+        url = f"http://localhost:{_free_port()}/"
+        with self.assertRaises(httpx.ConnectError):
+            await self.registry.get(url).get(url)
+
+
+class EnvProxyTest(unittest.IsolatedAsyncioTestCase):
+    async def test_proxy_from_environment_is_used(self):
+        proxy = await asyncio.start_server(_serve_ok, "127.0.0.1", 0)
+        proxy_url = f"http://127.0.0.1:{proxy.sockets[0].getsockname()[1]}"
+        registry = HttpClientRegistry()
+        with mock.patch.dict(os.environ, {"HTTP_PROXY": proxy_url, "http_proxy": proxy_url,
+                                          "NO_PROXY": "", "no_proxy": ""}):
+            async with proxy:
+                response = await registry.get("http://provider.invalid/").get("http://provider.invalid/pay")
+            await registry.close()
+
+        # Прокси получил запрос с полным URL - имя хоста резолвит он, а не кэш DNS
+        self.assertEqual(response.text, "GET http://provider.invalid/pay HTTP/1.1|Host: provider.invalid")
+        self.assertEqual(registry.dns.misses, 0)
+
+
+class ReadinessTest(unittest.IsolatedAsyncioTestCase):
+    async def test_ready_follows_the_last_ping(self):
+        registry = HttpClientRegistry()
+        results = iter([2, 0, 1])
+        observed = []
+        finished = asyncio.Event()
+
+        # Каждый следующий пинг видит готовность по итогам предыдущего
+        async def ping(url: str, connections: int) -> int:
+            if registry._warm:
+                observed.append(registry.ready)
+            opened = next(results, None)
+            if opened is None:
+                finished.set()
+                await asyncio.Event().wait()
+            return opened
+
+        with mock.patch.object(settings, "http_warm_connections", 2), \
+                mock.patch.object(settings, "http_keepalive_ping_interval", 0.001), \
+                mock.patch.object(settings, "http_connect_timeout", 0.001), \
+                mock.patch.object(registry, "_ping", ping):
+            registry.start_warming(["http://provider.local"])
+            await asyncio.wait_for(finished.wait(), timeout=1)
+            await registry.close()
+
+        self.assertEqual(observed, [False, True, False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+# ТЕСТЫ БЫСТРОЙ СЕРИАЛИЗАЦИИ JSON-ОТВЕТОВ
+import json
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core import responses
+from app.core.config import settings
+from app.core.responses import FastJSONResponse, StaticJSON, model_response
+
+
+class Payment(BaseModel):
+    id: int
+    amount: str
+    expires_at: datetime
+
+
+PAYMENT = Payment(id=1, amount="1000", expires_at=datetime(2026, 1, 1, 12, 0))
+
+
+class FastJSONResponseTest(unittest.TestCase):
+    def test_model_body_matches_default_encoding(self):
+        body = FastJSONResponse(PAYMENT).body
+        self.assertEqual(json.loads(body), {"id": 1, "amount": "1000", "expires_at": "2026-01-01T12:00:00"})
+
+    def test_plain_content_without_orjson(self):
+        with mock.patch.object(responses, "orjson", None):
+            body = FastJSONResponse({"code": "200", "message": "ок"}).body
+        self.assertEqual(body, JSONResponse({"code": "200", "message": "ок"}).body)
+
+    def test_static_body_is_reused(self):
+        static = StaticJSON({"code": "200"})
+        first, second = static.response(), static.response(status_code=202)
+        self.assertIs(first.body, second.body)
+        self.assertEqual(second.status_code, 202)
+        self.assertEqual(first.media_type, "application/json")
+
+    def test_model_response_follows_setting(self):
+        with mock.patch.object(settings, "fast_json_responses", False):
+            self.assertIs(model_response(PAYMENT), PAYMENT)
+        with mock.patch.object(settings, "fast_json_responses", True):
+            self.assertIsInstance(model_response(PAYMENT), FastJSONResponse)
+
+
+if __name__ == "__main__":
+    unittest.main()
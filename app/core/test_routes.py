@@ -0,0 +1,164 @@
+# ТЕСТЫ ЭНДПОИНТОВ ТРАНЗАКЦИЙ
+import json
+import unittest
+from unittest import mock
+
+import httpx
+from fastapi import FastAPI
+from fastapi.exceptions import RequestValidationError
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.api.security.auth import security
+from app.api.services.idempotency_service import IdempotencyService
+from app.api.services.provider_registry import ProviderRegistry
+from app.api.services.provider_router import ProviderRouter
+from app.api.services.provider_services.errors import ProviderError
+from app.core import routes
+from app.core.http_clients import http_clients
+from app.models.paygatecore.pay_in_model import PayInRequest
+
+
+class Offer(BaseModel):
+    provider: str
+
+
+class StandInProvider:
+    def __init__(self, name: str, has_offer: bool = True):
+        self.name = name
+        self.has_offer = has_offer
+        self.calls = 0
+
+    async def pay_in_card(self, request):
+        self.calls += 1
+        if not self.has_offer:
+            raise ProviderError(status_code=404, detail={"code": "404", "message": "нет объявления"})
+        return Offer(provider=self.name)
+
+
+BODY = {"amount": "1000", "currency": "RUB", "merchant_transaction_id": "order-1"}
+
+
+class AutoModeTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = ProviderRegistry({}, {})
+        for name, value in (
+            ("provider_registry", self.registry),
+            ("provider_router", ProviderRouter(alpha=0.5, latency_weight=0.0)),
+            ("idempotency_service", IdempotencyService()),
+        ):
+            patcher = mock.patch.object(routes, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        app = FastAPI()
+        app.include_router(routes.build_transaction_router())
+        app.dependency_overrides[security] = lambda: "merchant-1"
+        self.client = TestClient(app)
+
+    def _post(self, provider_name: str, body=None):
+        return self.client.post(
+            "/api/v1/transactions/card",
+            json=body or BODY,
+            headers={"Provider-data": provider_name}
+        )
+
+    def test_fails_over_to_provider_registered_later(self):
+        garex = StandInProvider("garex", has_offer=False)
+        self.registry.register("garex", garex)
+        self.assertEqual(self._post("auto").status_code, 404)
+
+        other = StandInProvider("other")
+        self.registry.register("other", other)
+        response = self._post("auto", {**BODY, "merchant_transaction_id": "order-2"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"provider": "other"})
+        self.assertEqual(other.calls, 1)
+
+    def test_replay_is_keyed_on_resolved_provider(self):
+        garex, other = StandInProvider("garex", has_offer=False), StandInProvider("other")
+        self.registry.register("garex", garex)
+        self.registry.register("other", other)
+        self.assertEqual(self._post("auto").json(), {"provider": "other"})
+
+        self.assertEqual(self._post("auto").json(), {"provider": "other"})
+        self.assertEqual(self._post("other").json(), {"provider": "other"})
+        self.assertEqual(self._post("garex").status_code, 422)
+        self.assertEqual((garex.calls, other.calls), (1, 1))
+
+
+class PayOutSbpTest(unittest.TestCase):
+    """Выплата по СБП через реальный адаптер garex с конфигурацией по умолчанию."""
+
+    def setUp(self):
+        self.payloads = []
+        client = httpx.AsyncClient(transport=httpx.MockTransport(self._provider))
+        for target, name, value in (
+            (routes, "idempotency_service", IdempotencyService()),
+            (http_clients, "get", mock.Mock(return_value=client)),
+        ):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        app = FastAPI()
+        app.include_router(routes.build_transaction_router())
+        app.dependency_overrides[security] = lambda: "merchant-1"
+        self.client = TestClient(app)
+
+    def _provider(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        self.payloads.append(payload)
+        return httpx.Response(200, json={
+            "result": {"id": 5, "orderId": payload["orderId"], "amount": payload["amount"], "rate": 90, "fee": 0.01}
+        })
+
+    def _post(self, bank_id: int):
+        return self.client.post(
+            "/api/v1/transactions/payout-sbp",
+            json={
+                "amount": "1000",
+                "currency": "RUB",
+                "phone_number": "79990001122",
+                "bank_id": bank_id,
+                "owner_name": "Иван И.",
+                "merchant_transaction_id": f"payout-{bank_id}"
+            },
+            headers={"Provider-data": "garex"}
+        )
+
+    def test_default_bank_ids_reach_provider(self):
+        response = self._post(100000000111)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], 5)
+        self.assertEqual(self.payloads[0]["assetOrBank"], "sber")
+
+    def test_unknown_bank_id_is_not_sent(self):
+        response = self._post(1)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.payloads, [])
+
+class DecodeBodyTest(unittest.TestCase):
+    def test_valid_body(self):
+        request = routes.decode_body(PayInRequest, b'{"amount": "1000", "currency": "RUB", "merchant_transaction_id": "o1"}')
+        self.assertEqual(request.merchant_transaction_id, "o1")
+
+    def test_errors_are_reported_like_fastapi_validation(self):
+        with self.assertRaises(RequestValidationError) as error:
+            routes.decode_body(PayInRequest, b'{"amount": "1000", "currency": "RUB"}')
+        self.assertEqual(error.exception.errors()[0]["loc"], ("body", "merchant_transaction_id"))
+
+        with self.assertRaises(RequestValidationError) as error:
+            routes.decode_body(PayInRequest, b"{")
+        self.assertEqual(error.exception.errors()[0]["msg"], "JSON decode error")
+
+        with self.assertRaises(RequestValidationError) as error:
+            routes.decode_body(PayInRequest, b"")
+        self.assertEqual(error.exception.errors()[0]["loc"], ("body",))
+
+
+if __name__ == "__main__":
+    unittest.main()
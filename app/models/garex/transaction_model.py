@@ -0,0 +1,62 @@
+# МОДЕЛИ ДАННЫХ ПРОВАЙДЕРА GAREX (PayIn | PayOut)
+from typing import Optional, Union
+
+from pydantic import BaseModel
+
+
+# Тело запроса без статических полей (merchantId, callbackUri добавляются при кодировании)
+class PayInPayload(BaseModel):
+    orderId: str  # Идентификатор платежа в системе мерчанта
+    method: str  # Метод оплаты
+    assetOrBank: Optional[str] = None  # Код банка (только для методов с банком)
+    amount: int  # Сумма транзакции
+    currency: str  # Валюта
+    user_id: str = "??"  # Идентификатор пользователя
+
+
+class PayOutPayload(BaseModel):
+    orderId: str  # Идентификатор платежа в системе мерчанта
+    method: str  # Метод выплаты
+    assetOrBank: str  # Код банка
+    requisiteNumber: str  # Номер карты или телефона получателя
+    requisiteRecipient: str  # ФИО получателя
+    amount: int  # Сумма транзакции
+    currency: str  # Валюта
+
+
+class TransactionResult(BaseModel):
+    id: int  # Идентификатор платежа в системе провайдера
+    orderId: str  # Идентификатор платежа в системе мерчанта
+    amount: Union[int, float]  # Сумма транзакции
+    rate: Union[int, float]  # Курс валюты
+    fee: Union[int, float]  # Комиссия
+
+
+class RequisiteResult(TransactionResult):
+    address: str  # Реквизит для оплаты (карта или телефон)
+    recipient: str  # Владелец реквизита
+    bankName: str  # Название банка или оператора
+
+
+class BankRequisiteResult(RequisiteResult):
+    bank: str  # Код банка
+
+
+# Ответ на создание выплаты
+class TransactionResponse(BaseModel):
+    result: TransactionResult
+
+
+# Ответ на создание платежа с реквизитом (SIM)
+class RequisiteResponse(BaseModel):
+    result: RequisiteResult
+
+
+# Ответ на создание платежа с реквизитом банка
+class BankRequisiteResponse(BaseModel):
+    result: BankRequisiteResult
+
+
+# Ответ на создание платежа со ссылкой на оплату
+class PaymentResponse(BankRequisiteResponse):
+    url: str  # Редирект на страницу оплаты
@@ -0,0 +1,39 @@
+# ОБЩИЕ ТИПЫ ПОЛЕЙ ЗАПРОСОВ
+import re
+from typing import Annotated, Optional
+
+from pydantic import AfterValidator
+
+from app.api.resources.paygatecore_resources.valid_resources import valid_res
+
+
+_AMOUNT_PATTERN = re.compile(r"[1-9][0-9]*")  # Целое положительное число без ведущих нулей
+_RATE_PATTERN = re.compile(r"[0-9]+(?:\.[0-9]+)?")  # Десятичное число
+_CURRENCIES = frozenset(valid_res.valid_currency)
+
+
+def _validate_amount(value: str) -> str:
+    if _AMOUNT_PATTERN.fullmatch(value.strip()) is None:
+        raise ValueError("Неправильный формат поля amount")
+    return value
+
+
+def _validate_currency(value: str) -> str:
+    if value not in _CURRENCIES:
+        raise ValueError("Неправильный формат поля currency")
+    return value
+
+
+def _validate_currency_rate(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return value
+    stripped = value.strip()
+    # Число больше нуля: после отбрасывания нулей и точки остаётся хотя бы одна цифра
+    if _RATE_PATTERN.fullmatch(stripped) is None or not stripped.strip("0."):
+        raise ValueError("Неправильный формат поля currency_rate")
+    return value
+
+
+Amount = Annotated[str, AfterValidator(_validate_amount)]  # Сумма заявки
+Currency = Annotated[str, AfterValidator(_validate_currency)]  # ISO код валюты
+CurrencyRate = Annotated[Optional[str], AfterValidator(_validate_currency_rate)]  # Курс валюты
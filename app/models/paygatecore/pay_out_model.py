@@ -1,75 +1,29 @@
 # МОДЕЛИ ДАННЫХ (PayOut | Карта)
-import re
 from datetime import datetime
 
-from pydantic import BaseModel, Field, field_validator
-from decimal import Decimal, InvalidOperation  # Точный десятичный тип данных
+from pydantic import BaseModel, Field
 
-from app.api.resources.paygatecore_resources.valid_resources import valid_res
+from app.models.paygatecore.constrained_types import Amount, Currency
 
 
 class PayOutRequest(BaseModel):
     # Обязательные поля
-    amount: str = Field(..., min_length=1, description="Сумма заявки")
-    currency: str = Field(..., min_length=1, description="ISO код валюты")
+    amount: Amount = Field(..., min_length=1, description="Сумма заявки")
+    currency: Currency = Field(..., min_length=1, description="ISO код валюты")
     card_number: str = Field(..., min_length=13, max_length=19, description="Номер карты")
     owner_name: str = Field(..., min_length=1, description="ФИО владельца карты")
     merchant_transaction_id: str = Field(..., min_length=1, description="Идентификатор платежа")
 
-    @field_validator("amount")  # Валидация поля amount
-    @classmethod
-    def validate_amount(csl, value: str) -> str:
-        try:
-            amount = Decimal(value)
-            if amount <= 0:
-                raise ValueError("Поле amount должно быть положительным числом")
-            if not re.match(r"^\d+$", value.strip()):
-                raise ValueError("Поле amount должно быть целым числом")
-            if value.startswith("0"):
-                raise ValueError("Неправильный формат поля amount")
-        except (ValueError, InvalidOperation):
-            raise ValueError("Неправильный формат поля amount")
-        return value
-
-    @field_validator("currency")  # Валидация поля currency
-    @classmethod
-    def validate_currency(csl, value: str) -> str:
-        if value in valid_res.valid_currency:
-            return value
-        raise ValueError("Неправильный формат поля currency")
-
 
 class PayOutRequest2(BaseModel):
     # Обязательные поля
-    amount: str = Field(..., min_length=1, description="Сумма заявки")
-    currency: str = Field(..., min_length=1, description="ISO код валюты")
+    amount: Amount = Field(..., min_length=1, description="Сумма заявки")
+    currency: Currency = Field(..., min_length=1, description="ISO код валюты")
     phone_number: str = Field(..., min_length=10, max_length=20, description="Номер карты")
     bank_id: int = Field(..., description="Номер банка")
     owner_name: str = Field(..., min_length=1, description="ФИО владельца карты")
     merchant_transaction_id: str = Field(..., min_length=1, description="Идентификатор платежа")
 
-    @field_validator("amount")  # Валидация поля amount
-    @classmethod
-    def validate_amount(csl, value: str) -> str:
-        try:
-            amount = Decimal(value)
-            if amount <= 0:
-                raise ValueError("Поле amount должно быть положительным числом")
-            if not re.match(r"^\d+$", value.strip()):
-                raise ValueError("Поле amount должно быть целым числом")
-            if value.startswith("0"):
-                raise ValueError("Неправильный формат поля amount")
-        except (ValueError, InvalidOperation):
-            raise ValueError("Неправильный формат поля amount")
-        return value
-
-    @field_validator("currency")  # Валидация поля currency
-    @classmethod
-    def validate_currency(csl, value: str) -> str:
-        if value in valid_res.valid_currency:
-            return value
-        raise ValueError("Неправильный формат поля currency")
-
 
 class PayOutResponse(BaseModel):
     id: int  # Идентификатор платежа в системе провайдера
@@ -0,0 +1,371 @@
+# МИКРОБЕНЧМАРКИ ГОРЯЧИХ ПУТЕЙ
+# Запуск из корня репозитория: python -m app.utils.benchmarks [имя ...]
+import json
+import subprocess
+import sys
+import time
+from typing import Callable, Dict
+
+
+# Кол-во операций в секунду (лучший из нескольких прогонов)
+def measure(func: Callable[[], object], number: int = 20_000, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - started)
+    return number / best
+
+
+def report(name: str, before: float, after: float):
+    print(f"{name:<40} before: {before:>12,.0f}/s  after: {after:>12,.0f}/s  x{after / before:.2f}")
+
+
+WEBHOOK_BODY = json.dumps({
+    "id": 123456,
+    "state": "paid",
+    "amount": 5000,
+    "rate": 90,
+    "address": "2200700011112222",
+    "bik": "044525974",
+    "recipient": "Иван Иванович И.",
+    "bank": "sber",
+    "bankName": "Сбер",
+    "sign": "0" * 64,
+    "orderId": "order-123456",
+    "fee": 3
+}).encode("utf-8")
+
+
+# Разбор вебхука: dict -> модель (как было) против валидации прямо из байтов
+def bench_webhooks():
+    from app.models.garex.webhook_model import WebhookRequest
+    from app.api.resources.garex_resources.transaction_resources import transactions_res
+    from app.api.services.provider_services.garex_service.webhook_router import (
+        parse_webhook,
+        build_callback,
+        STATE_HANDLERS
+    )
+
+    def before():
+        # FastAPI разбирает JSON в dict, затем модель валидируется повторно
+        webhook = WebhookRequest(**json.loads(WEBHOOK_BODY))
+        if webhook.state not in transactions_res.ALL_STATUSES:
+            raise ValueError
+        build_callback(webhook)
+
+    def after():
+        webhook = parse_webhook(WEBHOOK_BODY)
+        if STATE_HANDLERS[webhook.state][1]:
+            build_callback(webhook)
+
+    report("webhook ingestion (webhooks/sec)", measure(before), measure(after))
+
+
+# Проверка подписи: json.loads + json.dumps + новый HMAC против HMAC по сырому телу
+def bench_signatures():
+    from app.api.services.provider_services.our.signature_service import (
+        calculate_signature,
+        verify_signature,
+        get_raw_verifier
+    )
+
+    secret = "test_secret_key_123"
+    url = "http://localhost:8000/api/v1/webhooks/garex"
+    path = "/api/v1/webhooks/garex"
+    legacy_signature = calculate_signature(url, json.loads(WEBHOOK_BODY), secret)
+    # Во время ротации первым проверяется старый секрет - худший случай для нового режима
+    verifier = get_raw_verifier(("old_secret", secret))
+    raw_signature = get_raw_verifier((secret,)).sign(WEBHOOK_BODY, path)
+
+    def before():
+        assert verify_signature(url, json.loads(WEBHOOK_BODY.decode("utf-8")), legacy_signature, secret)
+
+    def after():
+        assert verifier.verify(WEBHOOK_BODY, path, "", raw_signature)
+
+    report("signature verification (verifications/sec)", measure(before), measure(after))
+
+
+# Ответ эндпоинта: jsonable_encoder + json.dumps (FastAPI по умолчанию) против модели сразу в байты
+def bench_responses():
+    from datetime import datetime, timezone
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from app.core.responses import FastJSONResponse
+    from app.models.paygatecore.pay_in_model import PayInResponse
+
+    model = PayInResponse(
+        id=123456,
+        merchant_transaction_id="order-123456",
+        expires_at=datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc),
+        amount="5000",
+        currency="RUB",
+        currency_rate="90",
+        amount_in_usd="55.56",
+        rate="3",
+        commission="150",
+        card_number="2200700011112222",
+        owner_name="Иван Иванович И.",
+        bank_name="Сбер",
+        country_name="Россия",
+        payment_currency="RUB",
+        payment_link="https://pay.example.com/123456"
+    )
+    error = {"code": "400", "message": "Сумма меньше минимальной"}
+    assert JSONResponse(jsonable_encoder(model)).body == FastJSONResponse(model).body
+
+    report("model response (responses/sec)",
+           measure(lambda: JSONResponse(jsonable_encoder(model)).body),
+           measure(lambda: FastJSONResponse(model).body))
+    report("error response (responses/sec)",
+           measure(lambda: JSONResponse(error).body),
+           measure(lambda: FastJSONResponse(error).body))
+
+
+PROVIDER_RESPONSE = {
+    "result": {
+        "id": 123456,
+        "orderId": "order-123456",
+        "amount": 5000,
+        "rate": 90,
+        "fee": 0.03,
+        "address": "2200700011112222",
+        "recipient": "Иван Иванович И.",
+        "bank": "sber",
+        "bankName": "Сбер"
+    },
+    "url": "https://pay.example.com/123456"
+}
+
+
+PROVIDER_RESPONSE_BODY = json.dumps(PROVIDER_RESPONSE).encode("utf-8")
+
+
+# Ответ провайдера (байты) -> PayInResponse: json + ручное преобразование словаря (как было)
+# против разбора в типизированную схему и скомпилированной спецификации
+def bench_mapping():
+    from datetime import datetime, timedelta
+    from app.api.services.provider_services.garex_service import tools
+    from app.models.garex.transaction_model import PaymentResponse
+    from app.models.paygatecore.pay_in_model import PayInResponse
+
+    def before():
+        provider_response = json.loads(PROVIDER_RESPONSE_BODY)
+        return PayInResponse(
+            id=provider_response["result"]["id"],
+            merchant_transaction_id=provider_response["result"]["orderId"],
+            expires_at=datetime.now() + timedelta(minutes=10),
+            amount=str(provider_response["result"]["amount"]),
+            currency="RUB",
+            currency_rate=str(provider_response["result"]["rate"]),
+            amount_in_usd=str(provider_response["result"]["amount"] / provider_response["result"]["rate"]),
+            rate="",
+            commission=str(provider_response["result"]["fee"] * provider_response["result"]["amount"]),
+            card_number=provider_response["result"]["address"],
+            owner_name=provider_response["result"]["recipient"],
+            bank_name=provider_response["result"]["bankName"],
+            country_name=tools._get_country(provider_response["result"]["bank"]),
+            payment_currency="RUB",
+            payment_link=provider_response["url"]
+        )
+
+    def after():
+        return tools.transform_from_provider_format(tools.decode_response(PaymentResponse, PROVIDER_RESPONSE_BODY))
+
+    assert before().model_dump(exclude={"expires_at"}) == after().model_dump(exclude={"expires_at"})
+    report("provider response decoding (responses/sec)", measure(before), measure(after))
+
+
+# Тело запроса к провайдеру: словарь + json.dumps (как в httpx) против модели и статической части
+def bench_payloads():
+    from app.core.config import settings
+    from app.api.services.provider_services.garex_service import tools
+    from app.models.paygatecore.pay_in_model import PayInRequest
+
+    request = PayInRequest(merchant_transaction_id="order-123456", amount="5000", currency="RUB")
+
+    def before():
+        return json.dumps({
+            "orderId": request.merchant_transaction_id,
+            "merchantId": settings.merchant_token,
+            "method": "card",
+            "amount": int(request.amount),
+            "currency": request.currency,
+            "user_id": "??",
+            "callbackUri": settings.webhook_base_url
+        }, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+    def after():
+        return tools.encode_payload(tools.transform_to_provider_format(request, "card"))
+
+    assert json.loads(before()) == json.loads(after())
+    report("provider request encoding (requests/sec)", measure(before), measure(after))
+
+
+# Валидаторы полей до общих типов (Decimal + некомпилированное регулярное выражение)
+def _legacy_request_model(model):
+    import re
+    from decimal import Decimal, InvalidOperation
+    from typing import Optional
+    from pydantic import create_model, field_validator
+    from app.api.resources.paygatecore_resources.valid_resources import valid_res
+
+    def validate_amount(cls, value: str) -> str:
+        try:
+            amount = Decimal(value)
+            if amount <= 0:
+                raise ValueError("Поле amount должно быть положительным числом")
+            if not re.match(r"^\d+$", value.strip()):
+                raise ValueError("Поле amount должно быть целым числом")
+            if value.startswith("0"):
+                raise ValueError("Неправильный формат поля amount")
+        except (ValueError, InvalidOperation):
+            raise ValueError("Неправильный формат поля amount")
+        return value
+
+    def validate_currency(cls, value: str) -> str:
+        if value in valid_res.valid_currency:
+            return value
+        raise ValueError("Неправильный формат поля currency")
+
+    def validate_currency_rate(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return value
+        try:
+            if Decimal(value) <= 0:
+                raise ValueError("Поле currency_rate должно быть положительным числом")
+        except (ValueError, InvalidOperation):
+            raise ValueError("Неправильный формат поля currency_rate")
+        return value
+
+    validators = {
+        "validate_amount": field_validator("amount")(validate_amount),
+        "validate_currency": field_validator("currency")(validate_currency)
+    }
+    fields = {}
+    for name, field in model.model_fields.items():
+        annotation = Optional[str] if name == "currency_rate" else str if name in ("amount", "currency") else field.annotation
+        fields[name] = (annotation, field)
+    if "currency_rate" in fields:
+        validators["validate_currency_rate"] = field_validator("currency_rate")(validate_currency_rate)
+    return create_model(f"Legacy{model.__name__}", __validators__=validators, **fields)
+
+
+# Тело запроса (байты) -> модель: json.loads + валидаторы на Decimal (как было) против общих типов за один проход
+def bench_validation():
+    from app.core.routes import decode_body
+    from app.models.paygatecore.pay_in_model import PayInRequest
+    from app.models.paygatecore.pay_in_bank_model import PayInBankRequest
+    from app.models.paygatecore.pay_out_model import PayOutRequest, PayOutRequest2
+
+    common = {"amount": "5000", "currency": "RUB", "merchant_transaction_id": "order-123456"}
+    bodies = {
+        PayInRequest: {**common, "currency_rate": "90.5"},
+        PayInBankRequest: {**common, "currency_rate": "90.5", "bank_name": "Сбербанк"},
+        PayOutRequest: {**common, "card_number": "2200700011112222", "owner_name": "Иван Иванович И."},
+        PayOutRequest2: {**common, "phone_number": "79990001122", "bank_id": 1, "owner_name": "Иван Иванович И."}
+    }
+    for model, body in bodies.items():
+        legacy = _legacy_request_model(model)
+        raw = json.dumps(body).encode("utf-8")
+        report(f"{model.__name__} validation (requests/sec)",
+               measure(lambda: legacy(**json.loads(raw))),
+               measure(lambda: decode_body(model, raw)))
+
+
+# Поиск банка по названию и страны по коду: словари по спискам с try/except (как было) против каталога
+def bench_banks():
+    from app.api.resources.garex_resources.bank_resources import bank_res
+    from app.api.services.provider_services.garex_service.bank_catalog import bank_catalog
+
+    names = ["Сбер", "ВТБ", "Kapital Bank", "Unibank", "Несуществующий банк"]
+
+    def before():
+        for name in names:
+            try:
+                code = bank_res.BANKS_RUS[name]
+            except KeyError:
+                try:
+                    code = bank_res.BANKS_AZN[name]
+                except KeyError:
+                    continue
+            if code in bank_res.BANKS_RUS:
+                country = "РФ"
+            elif code in bank_res.BANKS_AZN:
+                country = "Азербайджан"
+            elif code in bank_res.BANKS_ABH:
+                country = "Абхазия"
+            else:
+                country = "Таджикистан"
+
+    def after():
+        for name in names:
+            bank = bank_catalog.find(name)
+            if bank is None:
+                continue
+            country = bank_catalog.country(bank.code)
+
+    report("bank lookup, 5 names (batches/sec)", measure(before), measure(after))
+
+    # Поиск без кэша (первое обращение с новым написанием)
+    fuzzy = ["сбербанк", "Промсвязь", "т банк", "ВТБ 24", "Альфа"]
+    for title, batch in (("exact", names), ("fuzzy", fuzzy)):
+        per_second = measure(lambda: [bank_catalog._find(name) for name in batch])
+        print(f"bank {title} lookup without cache: {1e6 / per_second / len(batch):.2f} us/name")
+
+
+# Бюджет импорта приложения (мс, кумулятивно по app.core.main) и модули,
+# которые не должны импортироваться вместе с ним (адаптеры провайдеров грузятся лениво)
+IMPORT_BUDGET_MS = 1500
+LAZY_MODULES = ("app.api.services.provider_services.garex_service.garex",)
+
+
+# Кумулятивное время импорта модулей (мкс) по выводу python -X importtime
+def _import_times(module: str) -> Dict[str, int]:
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    ).stderr
+    times: Dict[str, int] = {}
+    for line in output.splitlines():
+        # "import time: <self> | <cumulative> | <отступ><модуль>"
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            times[parts[2].strip()] = int(parts[1])
+    return times
+
+
+# Проверка бюджета холодного старта: завершение с ошибкой при превышении
+def bench_imports():
+    runs = [_import_times("app.core.main") for _ in range(3)]
+    times = min(runs, key=lambda run: run["app.core.main"])
+    total = times["app.core.main"] / 1000
+    slowest = sorted((name for name in times if name.startswith("app.")), key=times.get, reverse=True)[1:6]
+    print(f"import app.core.main: {total:.0f} ms (budget {IMPORT_BUDGET_MS} ms)")
+    for name in slowest:
+        print(f"  {name:<70} {times[name] / 1000:>8.1f} ms")
+
+    eager = [name for name in LAZY_MODULES if any(run.get(name) for run in runs)]
+    if eager:
+        raise SystemExit(f"imported eagerly: {', '.join(eager)}")
+    if total > IMPORT_BUDGET_MS:
+        raise SystemExit(f"import budget exceeded: {total:.0f} ms > {IMPORT_BUDGET_MS} ms")
+
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {
+    "webhooks": bench_webhooks,
+    "signatures": bench_signatures,
+    "responses": bench_responses,
+    "mapping": bench_mapping,
+    "payloads": bench_payloads,
+    "validation": bench_validation,
+    "banks": bench_banks,
+    "imports": bench_imports,
+}
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
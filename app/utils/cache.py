@@ -0,0 +1,221 @@
+# КЭШИ И ОБЪЕДИНЕНИЕ ЗАПРОСОВ
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """LRU-кэш с ограничением по размеру и времени жизни записей."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    # Получение значения (с продлением позиции в LRU)
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    # Сохранение значения (с вытеснением самых старых записей)
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+class SingleFlight:
+    """Объединение одновременных вызовов с одинаковым ключом в один.
+
+    Вызов выполняется в отдельной задаче: отмена любого из ожидающих (в том числе
+    инициатора) не затрагивает остальных, а начатый вызов доводится до конца.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.joined = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.joined += 1
+        # shield: отмена одного ожидающего не отменяет общий вызов
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Исключение уже передано ожидающим (или их не осталось), повторно не логируем
+        if not task.cancelled():
+            task.exception()
+
+
+class AsyncLoadingCache:
+    """Кэш асинхронно загружаемых значений.
+
+    Свежее значение отдаётся сразу. Устаревшее (в пределах stale_ttl) тоже
+    отдаётся сразу, а обновление запускается в фоне. Одновременные промахи
+    по одному ключу выполняют одну загрузку.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, max_size: int = 1024):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # Хранится до конца stale-окна, свежесть проверяется отдельно
+        self._data = TTLCache(max_size=max_size, ttl=ttl + stale_ttl)
+        self._flight = SingleFlight()
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await loader()
+        self._data.set(key, (time.monotonic() + self.ttl, value))
+        return value
+
+
+    def _refresh_in_background(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._refreshing:
+            return
+
+        async def _refresh():
+            try:
+                await self._flight.do(key, lambda: self._load(key, loader))
+            except Exception:
+                # Ошибка фонового обновления: остаётся устаревшее значение
+                self.refresh_errors += 1
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(_refresh())
+
+
+    # Значение из кэша без загрузки (в том числе устаревшее)
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        return default if entry is None else entry[1]
+
+
+    # Принудительное обновление значения
+    async def refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        return await self._flight.do(key, lambda: self._load(key, loader))
+
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            fresh_until, value = entry
+            if fresh_until > time.monotonic():
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._refresh_in_background(key, loader)
+            return value
+
+        self.misses += 1
+        return await self._flight.do(key, lambda: self._load(key, loader))
+
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refresh_errors": self.refresh_errors,
+            "hit_rate": round((self.hits + self.stale_hits) / total, 4) if total else 0.0
+        }
+
+
+class KeyedLock:
+    """Взаимоисключение по ключу. Блокировка существует, только пока ключ занят или ожидается."""
+
+    def __init__(self):
+        # Ключ -> [блокировка, кол-во владельцев и ожидающих]
+        self._locks: Dict[Hashable, list] = {}
+
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+    async def acquire(self, key: Hashable):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            await entry[0].acquire()
+        except BaseException:
+            self._leave(key, entry)
+            raise
+
+
+    def release(self, key: Hashable):
+        entry = self._locks[key]
+        entry[0].release()
+        self._leave(key, entry)
+
+
+    def _leave(self, key: Hashable, entry: list):
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._locks[key]
@@ -0,0 +1,113 @@
+# ДЕКЛАРАТИВНОЕ ПРЕОБРАЗОВАНИЕ ОТВЕТОВ В МОДЕЛИ
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+
+FieldPath = Tuple[str, ...]
+
+
+class Source(NamedTuple):
+    paths: Tuple[FieldPath, ...]  # Пути к значениям в исходном словаре
+    func: Optional[Callable[..., Any]] = None  # Преобразование значений (None - значение как есть)
+    value: Any = None  # Константа (если путей нет и func не задана)
+
+
+# Значение по пути: path("result", "id") -> data["result"]["id"]
+def path(*keys: str) -> Source:
+    return Source(paths=(keys,))
+
+
+def const(value: Any) -> Source:
+    return Source(paths=(), value=value)
+
+
+# Вычисляемое значение: compute(func, ("result", "amount"), ...) -> func(amount, ...);
+# без путей func вызывается без аргументов на каждое преобразование
+def compute(func: Callable[..., Any], *paths: FieldPath) -> Source:
+    return Source(paths=paths, func=func)
+
+
+_LOOKUP_ERRORS = (KeyError, IndexError, TypeError, AttributeError)
+
+
+# Первый отсутствующий путь (вызывается только при ошибке)
+def _find_missing(data: Any, paths: List[FieldPath], attributes: bool) -> str:
+    for keys in paths:
+        value = data
+        for depth, key in enumerate(keys, 1):
+            try:
+                value = getattr(value, key) if attributes else value[key]
+            except _LOOKUP_ERRORS:
+                return ".".join(keys[:depth])
+    return "?"
+
+
+def compile_mapping(model: Type[BaseModel],
+                    spec: Dict[str, Source],
+                    on_missing: Callable[[str], Exception],
+                    attributes: bool = False) -> Callable[[Any], BaseModel]:
+    """Сборка преобразователя dict (или объекта при attributes=True) -> model по спецификации.
+
+    Спецификация компилируется в функцию без циклов: каждый путь читается один раз,
+    даже если используется в нескольких полях. При отсутствии ключа вызывается
+    on_missing с названием пути.
+    """
+    unknown = set(spec) - set(model.model_fields)
+    if unknown:
+        raise ValueError(f"{model.__name__}: неизвестные поля {sorted(unknown)}")
+    uncovered = {name for name, field in model.model_fields.items() if field.is_required()} - set(spec)
+    if uncovered:
+        raise ValueError(f"{model.__name__}: не заданы обязательные поля {sorted(uncovered)}")
+
+    # Каждый путь и каждый его префикс читаются в локальную переменную один раз
+    paths: List[FieldPath] = []
+    variables: Dict[FieldPath, str] = {(): "data"}
+    lines: List[str] = []
+    for source in spec.values():
+        for keys in source.paths:
+            if keys in variables:
+                continue
+            paths.append(keys)
+            for depth in range(1, len(keys) + 1):
+                prefix = keys[:depth]
+                if prefix not in variables:
+                    variables[prefix] = f"v{len(variables)}"
+                    parent = variables[prefix[:-1]]
+                    access = f"{parent}.{prefix[-1]}" if attributes else f"{parent}[{prefix[-1]!r}]"
+                    lines.append(f"{variables[prefix]} = {access}")
+
+    namespace: Dict[str, Any] = {
+        "model": model,
+        "on_missing": on_missing,
+        "paths": paths,
+        "attributes": attributes,
+        "lookup_errors": _LOOKUP_ERRORS,
+        "_find_missing": _find_missing
+    }
+    arguments: List[str] = []
+    for name, source in spec.items():
+        if source.func is not None:
+            namespace[f"func_{name}"] = source.func
+            values = ", ".join(variables[keys] for keys in source.paths)
+            arguments.append(f"{name}=func_{name}({values})")
+        elif source.paths:
+            arguments.append(f"{name}={variables[source.paths[0]]}")
+        else:
+            namespace[f"const_{name}"] = source.value
+            arguments.append(f"{name}=const_{name}")
+
+    body = "\n        ".join(lines) or "pass"
+    code = (
+        "def convert(data):\n"
+        "    try:\n"
+        f"        {body}\n"
+        "    except lookup_errors:\n"
+        "        raise on_missing(_find_missing(data, paths, attributes))\n"
+        f"    return model({', '.join(arguments)})\n"
+    )
+    exec(compile(code, f"<mapping {model.__name__}>", "exec"), namespace)
+
+    convert = namespace["convert"]
+    convert.__name__ = f"to_{model.__name__}"
+    return convert
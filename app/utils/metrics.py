@@ -0,0 +1,38 @@
+# МЕТРИКИ
+from collections import deque
+from typing import Any, Deque, Dict, List
+
+
+# Перцентиль по отсортированной выборке
+def percentile(sorted_values: List[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percent))
+    return sorted_values[index]
+
+
+class LatencyRecorder:
+    """Счётчики и перцентили длительности по последним N наблюдениям."""
+
+    def __init__(self, window: int = 1000):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+
+
+    def record(self, duration: float, error: bool = False):
+        self._samples.append(duration)
+        self.count += 1
+        self.errors += error
+
+
+    def stats(self) -> Dict[str, Any]:
+        samples = sorted(self._samples)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "p50": round(percentile(samples, 0.50), 6),
+            "p95": round(percentile(samples, 0.95), 6),
+            "p99": round(percentile(samples, 0.99), 6),
+            "max": round(samples[-1], 6) if samples else 0.0
+        }
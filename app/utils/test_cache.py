@@ -0,0 +1,118 @@
+# ТЕСТЫ КЭШЕЙ И ОБЪЕДИНЕНИЯ ЗАПРОСОВ
+import asyncio
+import unittest
+
+from app.utils.cache import AsyncLoadingCache, SingleFlight, TTLCache
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    async def test_joined_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(flight.do("key", load) for _ in range(5)))
+        self.assertEqual(results, ["value"] * 5)
+        self.assertEqual(calls, 1)
+        self.assertEqual(flight.joined, 4)
+        self.assertEqual(len(flight), 0)
+
+    async def test_cancelled_originator_does_not_cancel_waiters(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            return "value"
+
+        originator = asyncio.create_task(flight.do("key", load))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("key", load))
+        await asyncio.sleep(0)
+
+        originator.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        self.assertEqual(await waiter, "value")
+        self.assertTrue(originator.cancelled())
+        self.assertEqual(len(flight), 0)
+
+    async def test_error_is_delivered_to_every_waiter(self):
+        flight = SingleFlight()
+
+        async def load():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flight.do("key", load), flight.do("key", load), return_exceptions=True)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(len(flight), 0)
+
+
+class TTLCacheTest(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_expired_entry_is_missing(self):
+        cache = TTLCache(max_size=10, ttl=60)
+        cache.set("a", 1, ttl=0)
+        self.assertIsNone(cache.get("a"))
+
+
+class AsyncLoadingCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.loads = 0
+        self.fail = False
+
+    async def _loader(self):
+        self.loads += 1
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("provider is down")
+        return self.loads
+
+    async def test_fresh_value_is_served_from_cache(self):
+        cache = AsyncLoadingCache(ttl=60, stale_ttl=60)
+        values = await asyncio.gather(*(cache.get("balance", self._loader) for _ in range(3)))
+
+        self.assertEqual(values, [1, 1, 1])
+        self.assertEqual(await cache.get("balance", self._loader), 1)
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    async def test_stale_value_is_served_while_refreshing(self):
+        cache = AsyncLoadingCache(ttl=0, stale_ttl=60)
+        await cache.get("balance", self._loader)
+
+        self.assertEqual(await cache.get("balance", self._loader), 1)
+        await asyncio.sleep(0.01)
+        self.assertEqual(cache.peek("balance"), 2)
+        self.assertEqual(cache.stats()["stale_hits"], 1)
+
+    async def test_failed_refresh_keeps_stale_value(self):
+        cache = AsyncLoadingCache(ttl=0, stale_ttl=60)
+        await cache.get("balance", self._loader)
+        self.fail = True
+
+        self.assertEqual(await cache.get("balance", self._loader), 1)
+        await asyncio.sleep(0.01)
+        self.assertEqual(cache.peek("balance"), 1)
+        self.assertEqual(cache.refresh_errors, 1)
+        with self.assertRaises(RuntimeError):
+            await cache.refresh("balance", self._loader)
+
+if __name__ == "__main__":
+    unittest.main()
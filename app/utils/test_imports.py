@@ -0,0 +1,23 @@
+# ТЕСТЫ ХОЛОДНОГО СТАРТА ПРИЛОЖЕНИЯ
+import unittest
+
+from app.utils.benchmarks import IMPORT_BUDGET_MS, LAZY_MODULES, _import_times
+
+
+class ImportBudgetTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Лучший из трёх запусков: разовые задержки диска и планировщика не в счёт
+        cls.runs = [_import_times("app.core.main") for _ in range(3)]
+
+    def test_main_imports_within_budget(self):
+        total = min(run["app.core.main"] for run in self.runs) / 1000
+        self.assertLessEqual(total, IMPORT_BUDGET_MS, f"import app.core.main: {total:.0f} ms")
+
+    def test_provider_adapters_are_imported_lazily(self):
+        eager = [name for name in LAZY_MODULES if any(name in run for run in self.runs)]
+        self.assertEqual(eager, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
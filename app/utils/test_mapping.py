@@ -0,0 +1,60 @@
+# ТЕСТЫ ДЕКЛАРАТИВНОГО ПРЕОБРАЗОВАНИЯ ОТВЕТОВ
+import unittest
+from types import SimpleNamespace
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.utils.mapping import compile_mapping, compute, const, path
+
+
+class Target(BaseModel):
+    id: int
+    amount: str
+    total: str
+    currency: str
+    note: Optional[str] = None
+
+
+class MissingField(Exception):
+    pass
+
+
+SPEC = {
+    "id": path("result", "id"),
+    "amount": compute(str, ("result", "amount")),
+    "total": compute(lambda amount, fee: str(amount + fee), ("result", "amount"), ("result", "fee")),
+    "currency": const("RUB")
+}
+
+
+class CompileMappingTest(unittest.TestCase):
+    def test_converts_dict_by_spec(self):
+        convert = compile_mapping(Target, SPEC, MissingField)
+        target = convert({"result": {"id": 7, "amount": 1000, "fee": 5}})
+        self.assertEqual(target, Target(id=7, amount="1000", total="1005", currency="RUB"))
+
+    def test_converts_attributes(self):
+        convert = compile_mapping(Target, SPEC, MissingField, attributes=True)
+        target = convert(SimpleNamespace(result=SimpleNamespace(id=7, amount=1000, fee=5)))
+        self.assertEqual(target.total, "1005")
+
+    def test_missing_path_is_reported(self):
+        convert = compile_mapping(Target, SPEC, MissingField)
+        with self.assertRaises(MissingField) as error:
+            convert({"result": {"id": 7, "amount": 1000}})
+        self.assertEqual(str(error.exception), "result.fee")
+
+        with self.assertRaises(MissingField) as error:
+            convert({})
+        self.assertEqual(str(error.exception), "result")
+
+    def test_spec_is_checked_against_model(self):
+        with self.assertRaises(ValueError):
+            compile_mapping(Target, {**SPEC, "unknown": const(1)}, MissingField)
+        with self.assertRaises(ValueError):
+            compile_mapping(Target, {"id": path("id")}, MissingField)
+
+
+if __name__ == "__main__":
+    unittest.main()